@@ -0,0 +1,98 @@
+"""Add vehicle stats
+
+Revision ID: 5e9a0c27b4d1
+Revises: d8b5c3f17e20
+Create Date: 2026-10-17 18:52:07.218664
+
+vehicle_stats counts the vehicles by manufacturing year and drivability,
+statement level triggers on vehicles keep it up to date. The triggers are
+created before the counts are filled in, creating them locks out writes to
+vehicles until the migration commits, so no write is missed or counted twice.
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5e9a0c27b4d1"
+down_revision: Union[str, None] = "d8b5c3f17e20"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COUNT_VEHICLES = """
+CREATE OR REPLACE FUNCTION count_vehicles() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO vehicle_stats AS stats (manufacturing_year, is_drivable, count)
+        SELECT manufacturing_year, is_drivable, count(*) FROM new_vehicles
+        GROUP BY 1, 2 ORDER BY 1, 2
+        ON CONFLICT (manufacturing_year, is_drivable)
+        DO UPDATE SET count = stats.count + excluded.count;
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO vehicle_stats AS stats (manufacturing_year, is_drivable, count)
+        SELECT manufacturing_year, is_drivable, -count(*) FROM old_vehicles
+        GROUP BY 1, 2 ORDER BY 1, 2
+        ON CONFLICT (manufacturing_year, is_drivable)
+        DO UPDATE SET count = stats.count + excluded.count;
+    ELSE
+        INSERT INTO vehicle_stats AS stats (manufacturing_year, is_drivable, count)
+        SELECT manufacturing_year, is_drivable, sum(delta) FROM (
+            SELECT manufacturing_year, is_drivable, 1 AS delta FROM new_vehicles
+            UNION ALL
+            SELECT manufacturing_year, is_drivable, -1 AS delta FROM old_vehicles
+        ) AS changes
+        GROUP BY 1, 2 HAVING sum(delta) <> 0 ORDER BY 1, 2
+        ON CONFLICT (manufacturing_year, is_drivable)
+        DO UPDATE SET count = stats.count + excluded.count;
+    END IF;
+    RETURN NULL;
+END
+$$
+"""
+TRIGGERS = {
+    "insert": "AFTER INSERT ON vehicles REFERENCING NEW TABLE AS new_vehicles",
+    "update": (
+        "AFTER UPDATE ON vehicles "
+        "REFERENCING OLD TABLE AS old_vehicles NEW TABLE AS new_vehicles"
+    ),
+    "delete": "AFTER DELETE ON vehicles REFERENCING OLD TABLE AS old_vehicles",
+}
+
+
+def upgrade() -> None:
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.create_table(
+        "vehicle_stats",
+        sa.Column("manufacturing_year", sa.Integer(), nullable=False),
+        sa.Column("is_drivable", sa.Boolean(), nullable=True),
+        sa.Column("count", sa.BigInteger(), nullable=False),
+        sa.UniqueConstraint(
+            "manufacturing_year",
+            "is_drivable",
+            name=op.f("vehicle_stats_manufacturing_year_key"),
+        ),
+    )
+    # ### end Alembic commands ###
+    op.execute(COUNT_VEHICLES)
+    for name, trigger in TRIGGERS.items():
+        op.execute(
+            f"CREATE TRIGGER vehicles_count_{name} {trigger} "
+            "FOR EACH STATEMENT EXECUTE FUNCTION count_vehicles()"
+        )
+    op.execute(
+        "INSERT INTO vehicle_stats (manufacturing_year, is_drivable, count) "
+        "SELECT manufacturing_year, is_drivable, count(*) FROM vehicles GROUP BY 1, 2"
+    )
+
+
+def downgrade() -> None:
+    for name in TRIGGERS:
+        op.execute(f"DROP TRIGGER vehicles_count_{name} ON vehicles")
+    op.execute("DROP FUNCTION count_vehicles()")
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.drop_table("vehicle_stats")
+    # ### end Alembic commands ###
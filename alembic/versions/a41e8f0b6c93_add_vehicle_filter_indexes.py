@@ -0,0 +1,42 @@
+"""Add vehicle filter indexes
+
+Revision ID: a41e8f0b6c93
+Revises: 7c2d91e4a5b8
+Create Date: 2026-10-17 13:26:58.201874
+
+The indexes are built concurrently so the migration does not lock the
+vehicles table against writes, which requires running outside of the
+migration transaction.
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a41e8f0b6c93"
+down_revision: Union[str, None] = "7c2d91e4a5b8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = {
+    "vehicles_name_idx": ["name"],
+    "vehicles_manufacturing_year_idx": ["manufacturing_year", "is_drivable"],
+    "vehicles_is_drivable_idx": ["is_drivable", "id"],
+}
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, columns in INDEXES.items():
+            op.create_index(
+                name, "vehicles", columns, unique=False, postgresql_concurrently=True
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name in reversed(INDEXES):
+            op.drop_index(name, table_name="vehicles", postgresql_concurrently=True)
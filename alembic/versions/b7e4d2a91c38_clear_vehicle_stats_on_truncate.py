@@ -0,0 +1,51 @@
+"""Clear vehicle stats on truncate
+
+Revision ID: b7e4d2a91c38
+Revises: 5e9a0c27b4d1
+Create Date: 2026-10-17 20:41:13.508127
+
+TRUNCATE vehicles fires none of the triggers counting the vehicles, so
+vehicle_stats kept the counts of the removed vehicles. A statement level
+trigger on TRUNCATE now clears it. The counts are rebuilt, in case the
+vehicles were truncated before.
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b7e4d2a91c38"
+down_revision: Union[str, None] = "5e9a0c27b4d1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CLEAR_VEHICLE_STATS = """
+CREATE OR REPLACE FUNCTION clear_vehicle_stats() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    DELETE FROM vehicle_stats;
+    RETURN NULL;
+END
+$$
+"""
+
+
+def upgrade() -> None:
+    op.execute(CLEAR_VEHICLE_STATS)
+    op.execute(
+        "CREATE TRIGGER vehicles_count_truncate AFTER TRUNCATE ON vehicles "
+        "FOR EACH STATEMENT EXECUTE FUNCTION clear_vehicle_stats()"
+    )
+    op.execute("LOCK TABLE vehicles IN SHARE MODE")
+    op.execute("DELETE FROM vehicle_stats")
+    op.execute(
+        "INSERT INTO vehicle_stats (manufacturing_year, is_drivable, count) "
+        "SELECT manufacturing_year, is_drivable, count(*) FROM vehicles GROUP BY 1, 2"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER vehicles_count_truncate ON vehicles")
+    op.execute("DROP FUNCTION clear_vehicle_stats()")
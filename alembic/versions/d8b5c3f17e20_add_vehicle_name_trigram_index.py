@@ -0,0 +1,45 @@
+"""Add vehicle name trigram index
+
+Revision ID: d8b5c3f17e20
+Revises: a41e8f0b6c93
+Create Date: 2026-10-17 15:48:12.660394
+
+The index is built concurrently, see a41e8f0b6c93. The pg_trgm extension is
+left in place on downgrade as other objects may depend on it.
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d8b5c3f17e20"
+down_revision: Union[str, None] = "a41e8f0b6c93"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "vehicles_name_trgm_idx",
+            "vehicles",
+            ["name"],
+            unique=False,
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "vehicles_name_trgm_idx",
+            table_name="vehicles",
+            postgresql_using="gin",
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,5 @@
+"""Admin Module."""
+
+from app.admin.router import router
+
+__all__ = ["router"]
@@ -0,0 +1,58 @@
+"""FastAPI admin module."""
+
+from fastapi import APIRouter
+
+from app import logging
+from app.admin.schemas import StatementStats
+from app.cache import CacheStats
+from app.database import PoolStatus, compiled_cache_stats, engines, pool_status
+from app.logging import LogQueueStats
+from app.vehicles.schemas import DataOne
+from app.vehicles.services import statement_cache, vehicle_cache
+
+router = APIRouter(prefix="/admin", tags=["Admin"])
+
+
+@router.get("/cache")
+async def get_cache_stats() -> DataOne[CacheStats]:
+    """
+    Get the counters of the vehicle cache.
+
+    Hits, misses and evictions since the start of the process, to size the cache.
+    """
+    return DataOne(vehicle_cache.stats())
+
+
+@router.get("/statements")
+async def get_statement_stats() -> DataOne[StatementStats]:
+    """
+    Get the counters of the statement caches.
+
+    `statements` counts the pre-built vehicle statements, one per combination of filter fields,
+    `compiled` counts how often SQLAlchemy reused the compiled SQL of an executed statement.
+    """
+    return DataOne(
+        StatementStats(
+            statements=statement_cache.stats(), compiled=compiled_cache_stats()
+        )
+    )
+
+
+@router.get("/logs")
+async def get_log_stats() -> DataOne[LogQueueStats | None]:
+    """
+    Get the counters of the log queue.
+
+    Written, dropped and queued messages since the start of the process, `null` unless `LOG_ASYNC` is set.
+    """
+    return DataOne(logging.log_queue.stats() if logging.log_queue else None)
+
+
+@router.get("/pool")
+async def get_pool_status() -> DataOne[list[PoolStatus]]:
+    """
+    Get the state of the connection pools.
+
+    Size, checked in, checked out and overflow connections of each engine, to size `DATABASE_POOL_SIZE`.
+    """
+    return DataOne(pool_status(engines))
@@ -0,0 +1,10 @@
+from app.cache import CacheStats
+from app.database import CompiledCacheStats
+from app.schemas import CustomModel
+
+
+class StatementStats(CustomModel):
+    """Counters of the pre-built vehicle statements and of their compiled forms."""
+
+    statements: CacheStats
+    compiled: CompiledCacheStats
@@ -0,0 +1,134 @@
+import collections
+import dataclasses
+import threading
+import time
+from collections.abc import Callable, Hashable
+from typing import Literal, Protocol
+
+
+@dataclasses.dataclass(frozen=True)
+class CacheStats:
+    """Counters of a cache since it was created."""
+
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    size: int
+    maxsize: int
+
+
+class Cache[K: Hashable, V](Protocol):
+    """Interface of the cache backends, a shared backend has to implement it too."""
+
+    def get(self, key: K) -> V | None: ...
+
+    def set(self, key: K, value: V) -> None: ...
+
+    def delete(self, key: K) -> None: ...
+
+    def clear(self) -> None: ...
+
+    def stats(self) -> CacheStats: ...
+
+
+class LRUCache[K: Hashable, V]:
+    """
+    In-process cache with a size limit and a time to live.
+
+    The least recently used entry is evicted once `maxsize` is reached,
+    entries older than `ttl` seconds are dropped when they are read.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: collections.OrderedDict[K, tuple[float, V]] = (
+            collections.OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self._hits = self._misses = self._evictions = self._expirations = 0
+
+    def get(self, key: K) -> V | None:
+        with self._lock:
+            match self._entries.get(key):
+                case None:
+                    self._misses += 1
+                    return None
+                case (expires_at, _) if expires_at <= self._clock():
+                    del self._entries[key]
+                    self._expirations += 1
+                    self._misses += 1
+                    return None
+                case (_, value):
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return value
+
+    def set(self, key: K, value: V) -> None:
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def delete(self, key: K) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                expirations=self._expirations,
+                size=len(self._entries),
+                maxsize=self.maxsize,
+            )
+
+
+class NullCache[K: Hashable, V]:
+    """Cache backend that never stores anything."""
+
+    def __init__(self) -> None:
+        self._misses = 0
+
+    def get(self, key: K) -> V | None:
+        self._misses += 1
+        return None
+
+    def set(self, key: K, value: V) -> None:
+        return None
+
+    def delete(self, key: K) -> None:
+        return None
+
+    def clear(self) -> None:
+        return None
+
+    def stats(self) -> CacheStats:
+        return CacheStats(
+            hits=0, misses=self._misses, evictions=0, expirations=0, size=0, maxsize=0
+        )
+
+
+def create_cache[K: Hashable, V](
+    backend: Literal["memory", "none"], maxsize: int, ttl: float
+) -> Cache[K, V]:
+    match backend:
+        case "memory":
+            return LRUCache(maxsize=maxsize, ttl=ttl)
+        case "none":
+            return NullCache()
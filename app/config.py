@@ -1,5 +1,6 @@
 import functools
 import typing
+from typing import Literal
 
 from pydantic import PostgresDsn
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -13,6 +14,19 @@ class Config(BaseSettings):
     )
 
     DATABASE_URL: PostgresDsn
+    DATABASE_ASYNC: bool = False
+    DATABASE_POOL_CLASS: Literal["queue", "null"] = "queue"
+    DATABASE_POOL_SIZE: int = 10
+    DATABASE_MAX_OVERFLOW: int = 10
+    DATABASE_POOL_TIMEOUT: float = 30.0
+    DATABASE_POOL_RECYCLE: int = -1
+    DATABASE_POOL_PRE_PING: Literal["always", "idle", "never"] = "idle"
+    DATABASE_POOL_PING_IDLE_SECONDS: float = 30.0
+
+    READ_REPLICA_URLS: list[PostgresDsn] = []
+    READ_REPLICA_EJECT_SECONDS: float = 30.0
+    READ_YOUR_WRITES_SECONDS: float = 5.0
+    READ_YOUR_WRITES_MAX_KEYS: int = 100_000
 
     SITE_DOMAIN: str = "vehicle_api.test"
     SITE_NAME: str = "Vehicle API"
@@ -27,6 +41,27 @@ class Config(BaseSettings):
 
     API_PREFIX: str = "/api/v1"
 
+    BULK_INSERT_MAX_SIZE: int = 10_000
+    BULK_INSERT_BATCH_SIZE: int = 1000
+
+    EXPORT_PARTITION_SIZE: int = 1000
+    IMPORT_BATCH_SIZE: int = 10_000
+    IMPORT_MAX_ERRORS: int = 1000
+
+    CACHE_BACKEND: Literal["memory", "none"] = "memory"
+    CACHE_MAX_SIZE: int = 10_000
+    CACHE_TTL_SECONDS: float = 30.0
+
+    STATEMENT_CACHE_SIZE: int = 1000
+
+    LOG_ASYNC: bool = False
+    LOG_QUEUE_SIZE: int = 10_000
+    LOG_BATCH_SIZE: int = 500
+    LOG_SUCCESS_SAMPLE_RATE: float = 1.0
+
+    SLOW_QUERY_THRESHOLD_MS: float = 500.0
+    SLOW_QUERY_EXPLAIN_SAMPLE_RATE: float = 0.0
+
     @property
     def fastapi_kwargs(self) -> dict[str, typing.Any]:
         return {
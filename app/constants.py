@@ -8,6 +8,8 @@ DB_NAMING_CONVENTION = {
     "pk": "%(table_name)s_pkey",
 }
 
+ASYNC_DRIVERNAME = "postgresql+asyncpg"
+
 
 class Environment(StrEnum):
     LOCAL = "LOCAL"
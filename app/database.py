@@ -1,58 +1,527 @@
-from collections.abc import Generator, Sequence
+import collections
+import contextlib
+import dataclasses
+import io
+import threading
+import time
+from collections.abc import (
+    AsyncGenerator,
+    AsyncIterator,
+    Callable,
+    Generator,
+    Iterator,
+    Mapping,
+    Sequence,
+)
 from http import HTTPStatus
-from typing import Any
+from typing import Any, Concatenate
 
-from fastapi import HTTPException
+from fastapi import HTTPException, Request
+from prometheus_client import REGISTRY
 from sqlalchemy import (
     Connection,
     CursorResult,
+    Engine,
     Executable,
     Insert,
     MetaData,
+    NullPool,
+    Pool,
+    QueuePool,
     RowMapping,
     Select,
+    Table,
     Update,
     create_engine,
+    event,
+    make_url,
 )
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.engine import ExceptionContext, interfaces
+from sqlalchemy.exc import DBAPIError, DisconnectionError, SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, create_async_engine
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.compiler import SQLCompiler
+from sqlalchemy.sql.expression import ClauseElement
+from sqlalchemy.util import await_only
+from starlette.concurrency import run_in_threadpool
 
-from app.config import get_settings
-from app.constants import DB_NAMING_CONVENTION
+from app.cache import LRUCache
+from app.config import Config, get_settings
+from app.constants import ASYNC_DRIVERNAME, DB_NAMING_CONVENTION
+from app.metrics.instruments import POOL_PINGS, POOL_WAIT, PoolCollector
+from app.query_log import is_slow, log_slow_query
+from app.replicas import CONSISTENCY_KEY, ReplicaSet
+from app.timing import add_timing
 
 DATABASE_URL = str((settings := get_settings()).DATABASE_URL)
+ASYNC_DATABASE_URL = make_url(DATABASE_URL).set(drivername=ASYNC_DRIVERNAME)
+
+QUERY_START_TIME = "query_start_time"
+CHECKED_IN_AT = "checked_in_at"
+SYNC_ENGINE = "sync"
+ASYNC_ENGINE = "async"
+REPLICA_ENGINE = "replica-%d"
+ASYNC_REPLICA_ENGINE = "async-replica-%d"
+
+AnyConnection = Connection | AsyncConnection
+AnyEngine = Engine | AsyncEngine
+Parameters = dict[str, Any] | Sequence[dict[str, Any]]
+
+
+def pool_options(settings: Config) -> dict[str, Any]:
+    """Keyword arguments of `create_engine` that configure the connection pool."""
+    if settings.DATABASE_POOL_CLASS == "null":
+        return {"poolclass": NullPool}
+    return {
+        "pool_size": settings.DATABASE_POOL_SIZE,
+        "max_overflow": settings.DATABASE_MAX_OVERFLOW,
+        "pool_timeout": settings.DATABASE_POOL_TIMEOUT,
+        "pool_recycle": settings.DATABASE_POOL_RECYCLE,
+        "pool_pre_ping": settings.DATABASE_POOL_PRE_PING == "always",
+    }
+
+
+def ping_when_idle(
+    engine: Engine,
+    name: str,
+    idle_seconds: float,
+    clock: Callable[[], float] = time.monotonic,
+) -> None:
+    """
+    Ping a connection on checkout only if it sat in the pool for `idle_seconds`.
+
+    Connections handed out again right after they were returned skip the round trip.
+    A connection failing the ping is discarded by the pool, which checks out another one.
+    """
+
+    @event.listens_for(engine, "checkin")
+    def _record_checkin(dbapi_connection: Any, connection_record: Any) -> None:
+        connection_record.info[CHECKED_IN_AT] = clock()
+
+    @event.listens_for(engine, "checkout")
+    def _ping_idle_connection(
+        dbapi_connection: Any, connection_record: Any, connection_proxy: Any
+    ) -> None:
+        checked_in_at = connection_record.info.get(CHECKED_IN_AT)
+        if checked_in_at is None or clock() - checked_in_at < idle_seconds:
+            return
+        try:
+            engine.dialect.do_ping(dbapi_connection)
+        except engine.dialect.loaded_dbapi.Error as exc:
+            POOL_PINGS.labels(name, "dead").inc()
+            raise DisconnectionError from exc
+        POOL_PINGS.labels(name, "alive").inc()
+
 
 engine = create_engine(
     DATABASE_URL,
     echo=settings.ENVIRONMENT.is_debug,
-    pool_size=10,
-    pool_pre_ping=True,
     echo_pool=settings.ENVIRONMENT.is_debug,
+    **pool_options(settings),
 )
 
+async_engine: AsyncEngine | None = (
+    create_async_engine(
+        ASYNC_DATABASE_URL,
+        echo=settings.ENVIRONMENT.is_debug,
+        echo_pool=settings.ENVIRONMENT.is_debug,
+        **pool_options(settings),
+    )
+    if settings.DATABASE_ASYNC
+    else None
+)
+
+replicas: ReplicaSet[Engine] = ReplicaSet(
+    [
+        create_engine(
+            str(url),
+            echo=settings.ENVIRONMENT.is_debug,
+            echo_pool=settings.ENVIRONMENT.is_debug,
+            **pool_options(settings),
+        )
+        for url in ([] if settings.DATABASE_ASYNC else settings.READ_REPLICA_URLS)
+    ],
+    eject_seconds=settings.READ_REPLICA_EJECT_SECONDS,
+)
+
+async_replicas: ReplicaSet[AsyncEngine] = ReplicaSet(
+    [
+        create_async_engine(
+            make_url(str(url)).set(drivername=ASYNC_DRIVERNAME),
+            echo=settings.ENVIRONMENT.is_debug,
+            echo_pool=settings.ENVIRONMENT.is_debug,
+            **pool_options(settings),
+        )
+        for url in (settings.READ_REPLICA_URLS if settings.DATABASE_ASYNC else [])
+    ],
+    eject_seconds=settings.READ_REPLICA_EJECT_SECONDS,
+)
+
+recent_writes: LRUCache[str, bool] = LRUCache(
+    maxsize=settings.READ_YOUR_WRITES_MAX_KEYS, ttl=settings.READ_YOUR_WRITES_SECONDS
+)
+
+engines: dict[str, Engine] = (
+    {SYNC_ENGINE: engine}
+    | ({ASYNC_ENGINE: async_engine.sync_engine} if async_engine else {})
+    | {REPLICA_ENGINE % i: replica for i, replica in enumerate(replicas.replicas)}
+    | {
+        ASYNC_REPLICA_ENGINE % i: replica.sync_engine
+        for i, replica in enumerate(async_replicas.replicas)
+    }
+)
+
+if (
+    settings.DATABASE_POOL_CLASS == "queue"
+    and settings.DATABASE_POOL_PRE_PING == "idle"
+):
+    for name, pooled_engine in engines.items():
+        ping_when_idle(pooled_engine, name, settings.DATABASE_POOL_PING_IDLE_SECONDS)
+
+REGISTRY.register(PoolCollector(engines))
+
 metadata = MetaData(naming_convention=DB_NAMING_CONVENTION)
 
 
-def get_connection() -> Generator[Connection, None]:
+@dataclasses.dataclass(frozen=True)
+class CompiledCacheStats:
+    """Lookups in the compiled statement cache of the engines since start."""
+
+    hits: int
+    misses: int
+    uncached: int
+
+
+_compiled_cache_lookups: collections.Counter[interfaces.CacheStats] = (
+    collections.Counter()
+)
+_compiled_cache_lock = threading.Lock()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _count_compiled_cache_lookup(
+    conn: Connection,
+    cursor: Any,
+    statement: str,
+    parameters: Any,
+    context: interfaces.ExecutionContext | None,
+    executemany: bool,
+) -> None:
+    if context is None:
+        return
+    with _compiled_cache_lock:
+        _compiled_cache_lookups[context.cache_hit] += 1  # type: ignore[attr-defined]
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_query_timer(
+    conn: Connection,
+    cursor: Any,
+    statement: str,
+    parameters: Any,
+    context: interfaces.ExecutionContext | None,
+    executemany: bool,
+) -> None:
+    conn.info[QUERY_START_TIME] = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _stop_query_timer(
+    conn: Connection,
+    cursor: Any,
+    statement: str,
+    parameters: Any,
+    context: interfaces.ExecutionContext | None,
+    executemany: bool,
+) -> None:
+    duration = time.perf_counter() - conn.info.pop(QUERY_START_TIME)
+    add_timing("db", duration)
+    if is_slow(duration):
+        log_slow_query(conn, cursor, statement, parameters, executemany, duration)
+
+
+@event.listens_for(Engine, "handle_error")
+def _discard_query_timer(context: ExceptionContext) -> None:
+    if context.connection is not None:
+        context.connection.info.pop(QUERY_START_TIME, None)
+
+
+def compiled_cache_stats() -> CompiledCacheStats:
+    with _compiled_cache_lock:
+        lookups = _compiled_cache_lookups.copy()
+    hits = lookups[interfaces.CacheStats.CACHE_HIT]
+    misses = lookups[interfaces.CacheStats.CACHE_MISS]
+    return CompiledCacheStats(
+        hits=hits, misses=misses, uncached=lookups.total() - hits - misses
+    )
+
+
+@dataclasses.dataclass(frozen=True)
+class PoolStatus:
+    """State of the connection pool of an engine, the counts are null without a queue pool."""
+
+    engine: str
+    pool_class: str
+    size: int | None
+    checked_in: int | None
+    checked_out: int | None
+    overflow: int | None
+    timeout: float | None
+
+
+def pool_status(engines: Mapping[str, Engine]) -> list[PoolStatus]:
+    return [_pool_status(name, engine.pool) for name, engine in engines.items()]
+
+
+def _pool_status(name: str, pool: Pool) -> PoolStatus:
+    if not isinstance(pool, QueuePool):
+        return PoolStatus(
+            engine=name,
+            pool_class=type(pool).__name__,
+            size=None,
+            checked_in=None,
+            checked_out=None,
+            overflow=None,
+            timeout=None,
+        )
+    return PoolStatus(
+        engine=name,
+        pool_class=type(pool).__name__,
+        size=pool.size(),
+        checked_in=pool.checkedin(),
+        checked_out=pool.checkedout(),
+        overflow=max(pool.overflow(), 0),
+        timeout=pool.timeout(),
+    )
+
+
+@contextlib.contextmanager
+def _begin_primary() -> Iterator[Connection]:
     try:
+        start_time = time.perf_counter()
         with engine.begin() as conn:
+            POOL_WAIT.labels(SYNC_ENGINE).observe(time.perf_counter() - start_time)
             yield conn
     except (SQLAlchemyError, OSError) as exc:
         raise HTTPException(HTTPStatus.INTERNAL_SERVER_ERROR, detail=str(exc)) from exc
 
 
+@contextlib.asynccontextmanager
+async def _begin_async_primary() -> AsyncIterator[AsyncConnection]:
+    if async_engine is None:
+        raise RuntimeError("DATABASE_ASYNC is disabled, no async engine configured.")
+    try:
+        start_time = time.perf_counter()
+        async with async_engine.begin() as conn:
+            POOL_WAIT.labels(ASYNC_ENGINE).observe(time.perf_counter() - start_time)
+            yield conn
+    except (SQLAlchemyError, OSError) as exc:
+        raise HTTPException(HTTPStatus.INTERNAL_SERVER_ERROR, detail=str(exc)) from exc
+
+
+@contextlib.contextmanager
+def _replica_errors[E](replica_set: ReplicaSet[E], replica: E) -> Iterator[None]:
+    """Eject the replica if its connection was lost while the request used it."""
+    try:
+        yield
+    except (SQLAlchemyError, OSError) as exc:
+        if isinstance(exc, DBAPIError) and exc.connection_invalidated:
+            replica_set.eject(replica)
+        raise HTTPException(HTTPStatus.INTERNAL_SERVER_ERROR, detail=str(exc)) from exc
+
+
+def get_connection() -> Generator[Connection, None]:
+    with _begin_primary() as conn:
+        yield conn
+
+
+async def get_async_connection() -> AsyncGenerator[AsyncConnection, None]:
+    async with _begin_async_primary() as conn:
+        yield conn
+
+
+def wrote_recently(request: Request) -> bool:
+    """Whether the client wrote under its consistency key within `READ_YOUR_WRITES_SECONDS`."""
+    key = request.headers.get(CONSISTENCY_KEY)
+    return key is not None and recent_writes.get(key) is not None
+
+
+def is_replica(conn: Connection) -> bool:
+    """Whether the connection reads from a read replica, which may lag behind the primary."""
+    return conn.engine in replicas.replicas or any(
+        conn.engine is replica.sync_engine for replica in async_replicas.replicas
+    )
+
+
+def remember_write(request: Request) -> Generator[None, None]:
+    """Send the reads under the client's consistency key to the primary for a while."""
+    yield
+    if (key := request.headers.get(CONSISTENCY_KEY)) is not None:
+        recent_writes.set(key, True)
+
+
+def get_read_connection(request: Request) -> Generator[Connection, None]:
+    """
+    Open a connection to the next healthy read replica.
+
+    Replicas that can't be connected to are ejected, the primary serves the read
+    if none is left or if the client wrote recently.
+    """
+    if wrote_recently(request) or (conn := _connect_replica()) is None:
+        with _begin_primary() as conn:
+            yield conn
+        return
+    with _replica_errors(replicas, conn.engine), conn:
+        yield conn
+
+
+async def get_async_read_connection(
+    request: Request,
+) -> AsyncGenerator[AsyncConnection, None]:
+    if wrote_recently(request) or (conn := await _connect_async_replica()) is None:
+        async with _begin_async_primary() as conn:
+            yield conn
+        return
+    with _replica_errors(async_replicas, conn.engine):
+        try:
+            yield conn
+        finally:
+            await conn.close()
+
+
+def _connect_replica() -> Connection | None:
+    while (replica := replicas.choose()) is not None:
+        try:
+            return replica.connect()
+        except (SQLAlchemyError, OSError):
+            replicas.eject(replica)
+    return None
+
+
+async def _connect_async_replica() -> AsyncConnection | None:
+    while (replica := async_replicas.choose()) is not None:
+        try:
+            return await replica.connect()
+        except (SQLAlchemyError, OSError):
+            async_replicas.eject(replica)
+    return None
+
+
+connection_provider = (
+    get_async_connection if settings.DATABASE_ASYNC else get_connection
+)
+
+read_connection_provider = (
+    (get_async_read_connection if settings.DATABASE_ASYNC else get_read_connection)
+    if settings.READ_REPLICA_URLS
+    else connection_provider
+)
+
+
+def get_engine() -> Engine:
+    return engine
+
+
+def get_async_engine() -> AsyncEngine:
+    if async_engine is None:
+        raise RuntimeError("DATABASE_ASYNC is disabled, no async engine configured.")
+    return async_engine
+
+
+engine_provider = get_async_engine if settings.DATABASE_ASYNC else get_engine
+
+
+async def run_service[**P, T](
+    conn: AnyConnection,
+    service: Callable[Concatenate[Connection, P], T],
+    *args: P.args,
+    **kwargs: P.kwargs,
+) -> T:
+    """Run a connection bound service without blocking the event loop.
+
+    On an `AsyncConnection` the service runs through `run_sync`, so every
+    statement is awaited on the async driver within the event loop.
+    A blocking `Connection` is handed to the threadpool instead.
+    """
+    if isinstance(conn, AsyncConnection):
+        return await conn.run_sync(service, *args, **kwargs)
+    return await run_in_threadpool(service, conn, *args, **kwargs)
+
+
+class ExplainJson(Executable, ClauseElement):
+    """`EXPLAIN (FORMAT JSON)` of a select, its parameters are bound like the select's."""
+
+    inherit_cache = False
+
+    def __init__(self, statement: Select) -> None:
+        self.statement = statement
+
+
+@compiles(ExplainJson, "postgresql")
+def _compile_explain_json(
+    element: ExplainJson, compiler: SQLCompiler, **kw: Any
+) -> str:
+    return f"EXPLAIN (FORMAT JSON) {compiler.process(element.statement, **kw)}"
+
+
+def query_plan(
+    conn: Connection, statement: Select, parameters: dict[str, Any] | None = None
+) -> dict[str, Any]:
+    """Get the plan postgres chose for a select, without running it."""
+    [result] = conn.execute(ExplainJson(statement), parameters).scalar_one()
+    return result["Plan"]
+
+
+def estimate_rows(
+    conn: Connection, statement: Select, parameters: dict[str, Any] | None = None
+) -> int:
+    """The number of rows postgres expects a select to return, without running it."""
+    return query_plan(conn, statement, parameters)["Plan Rows"]
+
+
 def fetch_one(
-    conn: Connection, select_query: Select | Insert | Update
+    conn: Connection,
+    select_query: Select | Insert | Update,
+    parameters: Parameters | None = None,
 ) -> RowMapping | None:
-    cursor: CursorResult = conn.execute(select_query)
+    cursor: CursorResult = conn.execute(select_query, parameters)
     return cursor.mappings().one_or_none()
 
 
 def fetch_all(
-    conn: Connection, select_query: Select | Insert | Update
+    conn: Connection,
+    select_query: Select | Insert | Update,
+    parameters: Parameters | None = None,
+    execution_options: dict[str, Any] | None = None,
 ) -> Sequence[RowMapping]:
-    cursor: CursorResult = conn.execute(select_query)
+    cursor: CursorResult = conn.execute(
+        select_query, parameters, execution_options=execution_options
+    )
     return cursor.mappings().all()
 
 
-def execute(conn: Connection, select_query: Executable) -> CursorResult[Any]:
-    return conn.execute(select_query)
+def execute(
+    conn: Connection,
+    select_query: Executable,
+    parameters: Parameters | None = None,
+) -> CursorResult[Any]:
+    return conn.execute(select_query, parameters)
+
+
+def copy_from_csv(
+    conn: Connection, table: Table, columns: Sequence[str], data: bytes
+) -> None:
+    """Load csv encoded rows into a table with `COPY ... FROM STDIN`.
+
+    Only available on postgres, through either the psycopg2 or the asyncpg driver.
+    """
+    driver_connection = conn.connection.driver_connection
+    if conn.dialect.driver == "asyncpg":
+        copy = driver_connection.copy_to_table(  # type: ignore[union-attr]
+            table.name, source=io.BytesIO(data), columns=columns, format="csv"
+        )
+        await_only(copy)
+        return
+    statement = f"COPY {table.name} ({", ".join(columns)}) FROM STDIN WITH (FORMAT csv)"
+    with driver_connection.cursor() as cursor:  # type: ignore[union-attr]
+        cursor.copy_expert(statement, io.BytesIO(data))
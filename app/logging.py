@@ -1,9 +1,105 @@
+import copy
+import dataclasses
 import logging
+import queue
 import sys
+import threading
+from collections.abc import Callable
+from typing import Any
 
 from asgi_correlation_id import correlation_id
 from loguru import logger
 
+from app.config import get_settings
+
+FORMAT = "[{time}] [{correlation_id}] [{level}] - {name}:{function}:{line} :: {message}"
+LOG_FILE = "logs/app.log"
+_STOP = object()
+
+log_queue: "QueueSink | None" = None
+_log_queue_handler: int | None = None
+_log_writer: Any = None
+
+
+@dataclasses.dataclass(frozen=True)
+class LogQueueStats:
+    """Counters of the log queue since it was created."""
+
+    written: int
+    dropped: int
+    queued: int
+    maxsize: int
+
+
+class QueueSink:
+    """
+    Loguru sink handing messages to a background thread that writes them in batches.
+
+    `write` only enqueues, so logging never waits on I/O. The queue is bounded,
+    messages arriving while it is full are dropped and counted.
+    """
+
+    def __init__(
+        self,
+        emit: Callable[[Any], None],
+        flush: Callable[[], None],
+        *,
+        maxsize: int,
+        batch_size: int,
+    ) -> None:
+        self._emit = emit
+        self._flush = flush
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self._queue: queue.Queue[Any] = queue.Queue(maxsize)
+        self._lock = threading.Lock()
+        self._written = self._dropped = 0
+        self._thread = threading.Thread(
+            target=self._run, name="log-writer", daemon=True
+        )
+        self._thread.start()
+
+    def write(self, message: Any) -> None:
+        try:
+            self._queue.put_nowait(message)
+        except queue.Full:
+            with self._lock:
+                self._dropped += 1
+
+    def stop(self) -> None:
+        """Write the queued messages and stop the background thread."""
+        if not self._thread.is_alive():
+            return
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    def stats(self) -> LogQueueStats:
+        with self._lock:
+            return LogQueueStats(
+                written=self._written,
+                dropped=self._dropped,
+                queued=self._queue.qsize(),
+                maxsize=self.maxsize,
+            )
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stopped = _STOP in batch
+            messages = [message for message in batch if message is not _STOP]
+            for message in messages:
+                self._emit(message)
+            self._flush()
+            with self._lock:
+                self._written += len(messages)
+            if stopped:
+                return
+
 
 def _correlation_id_filter(record) -> bool:
     record |= {"correlation_id": correlation_id.get()}
@@ -11,18 +107,53 @@ def _correlation_id_filter(record) -> bool:
 
 
 def configure_logging() -> None:
+    global log_queue, _log_queue_handler, _log_writer
+    settings = get_settings()
+    stop_logging()
     logger.remove()
     logging.getLogger("uvicorn.error").disabled = True
     logging.getLogger("uvicorn.access").disabled = True
-    fmt = (
-        "[{time}] [{correlation_id}] [{level}] - {name}:{function}:{line} :: {message}"
+    if not settings.LOG_ASYNC:
+        _add_sinks(logger, sys.stdout, filter=_correlation_id_filter)
+        return
+    _log_writer = writer = copy.deepcopy(logger)
+    _add_sinks(writer, sys.stdout.write)
+    log_queue = QueueSink(
+        lambda message: _replay(writer, message.record),
+        sys.stdout.flush,
+        maxsize=settings.LOG_QUEUE_SIZE,
+        batch_size=settings.LOG_BATCH_SIZE,
     )
-    logger.add(sys.stdout, format=fmt, level="INFO", filter=_correlation_id_filter)
-    logger.add(
-        "logs/app.log",
+    _log_queue_handler = logger.add(
+        log_queue, format="{message}", level="INFO", filter=_correlation_id_filter
+    )
+
+
+def stop_logging() -> None:
+    """Stop logging to the log queue once it has written the messages it holds."""
+    global log_queue, _log_queue_handler, _log_writer
+    if log_queue is None:
+        return
+    logger.remove(_log_queue_handler)
+    log_queue.stop()
+    _log_writer.remove()
+    log_queue = _log_queue_handler = _log_writer = None
+
+
+def _add_sinks(target, stdout, **kwargs: Any) -> None:
+    target.add(stdout, format=FORMAT, level="INFO", **kwargs)
+    target.add(
+        LOG_FILE,
         serialize=True,
         level="INFO",
-        filter=_correlation_id_filter,
         rotation="30 MB",
         retention="7 days",
+        **kwargs,
+    )
+
+
+def _replay(writer, record: dict[str, Any]) -> None:
+    """Log a record captured on the request path again, on the writer's handlers."""
+    writer.patch(lambda patched: patched.update(record)).log(
+        record["level"].name, record["message"]
     )
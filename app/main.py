@@ -1,28 +1,36 @@
 """Vehicle api main module."""
 
+import contextlib
 import logging
+from collections.abc import AsyncIterator
 
 import fastapi
 import uuid_utils as uuid
 from asgi_correlation_id import CorrelationIdMiddleware
-from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.middleware.cors import CORSMiddleware
 
-from app import vehicles
+from app import admin, metrics, vehicles
 from app.config import get_settings
-from app.logging import configure_logging
-from app.middlewares.log import logging_middleware
-from app.middlewares.time import add_process_time_header
+from app.logging import configure_logging, stop_logging
+from app.middlewares.log import LoggingMiddleware
+from app.middlewares.metrics import MetricsMiddleware
+from app.middlewares.time import ProcessTimeMiddleware
 from app.utils.utils import is_valid_uuid7
 
 CORRELATION_HEADER = "X-Correlation-ID"
 
 
+@contextlib.asynccontextmanager
+async def lifespan(_: fastapi.FastAPI) -> AsyncIterator[None]:
+    yield
+    stop_logging()
+
+
 def get_application() -> fastapi.FastAPI:
     settings = get_settings()
     configure_logging()
 
-    application = fastapi.FastAPI(**settings.fastapi_kwargs)
+    application = fastapi.FastAPI(**settings.fastapi_kwargs, lifespan=lifespan)
 
     application.add_middleware(
         CORSMiddleware,
@@ -32,8 +40,11 @@ def get_application() -> fastapi.FastAPI:
         allow_headers=settings.CORS_HEADERS,
     )
 
-    application.add_middleware(BaseHTTPMiddleware, dispatch=add_process_time_header)
-    application.add_middleware(BaseHTTPMiddleware, dispatch=logging_middleware)
+    application.add_middleware(ProcessTimeMiddleware)
+    application.add_middleware(
+        LoggingMiddleware, sample_rate=settings.LOG_SUCCESS_SAMPLE_RATE
+    )
+    application.add_middleware(MetricsMiddleware)
     application.add_middleware(
         CorrelationIdMiddleware,
         header_name=CORRELATION_HEADER,
@@ -44,6 +55,8 @@ def get_application() -> fastapi.FastAPI:
     )
 
     application.include_router(vehicles.router)
+    application.include_router(admin.router)
+    application.include_router(metrics.router)
 
     return application
 
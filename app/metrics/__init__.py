@@ -0,0 +1,5 @@
+"""Metrics Module."""
+
+from app.metrics.router import router
+
+__all__ = ["router"]
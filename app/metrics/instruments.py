@@ -0,0 +1,52 @@
+from collections.abc import Iterator, Mapping
+
+from prometheus_client import Counter, Gauge, Histogram
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.registry import Collector
+from sqlalchemy import Engine, QueuePool
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Duration of HTTP requests until the response is sent.",
+    ["method", "route", "status"],
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress", "HTTP requests being handled.", ["method"]
+)
+POOL_WAIT = Histogram(
+    "db_pool_wait_seconds",
+    "Time a request waited to acquire a database connection from the pool.",
+    ["engine"],
+)
+POOL_PINGS = Counter(
+    "db_pool_pings",
+    "Liveness pings of connections that sat idle in the pool.",
+    ["engine", "result"],
+)
+
+
+class PoolCollector(Collector):
+    """Report the state of the connection pools of the engines when scraped."""
+
+    def __init__(self, engines: Mapping[str, Engine]) -> None:
+        self.engines = engines
+
+    def collect(self) -> Iterator[GaugeMetricFamily]:
+        size = GaugeMetricFamily(
+            "db_pool_size", "Connections the pool keeps open.", labels=["engine"]
+        )
+        checked_out = GaugeMetricFamily(
+            "db_pool_checked_out", "Connections in use.", labels=["engine"]
+        )
+        overflow = GaugeMetricFamily(
+            "db_pool_overflow",
+            "Connections opened beyond the pool size.",
+            labels=["engine"],
+        )
+        for name, engine in self.engines.items():
+            if not isinstance(pool := engine.pool, QueuePool):
+                continue
+            size.add_metric([name], pool.size())
+            checked_out.add_metric([name], pool.checkedout())
+            overflow.add_metric([name], max(pool.overflow(), 0))
+        yield from (size, checked_out, overflow)
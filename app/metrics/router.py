@@ -0,0 +1,16 @@
+"""FastAPI metrics module."""
+
+from fastapi import APIRouter, Response
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, generate_latest
+
+router = APIRouter(tags=["Metrics"])
+
+
+@router.get("/metrics", response_class=Response)
+async def get_metrics() -> Response:
+    """
+    Get the metrics of the process in the Prometheus text format.
+
+    Request latencies by route and status, requests in flight and the state of the connection pools.
+    """
+    return Response(generate_latest(REGISTRY), media_type=CONTENT_TYPE_LATEST)
@@ -1,27 +1,74 @@
-from collections.abc import Awaitable, Callable
+import random
+from collections.abc import Callable
 from http import HTTPStatus
 
-from fastapi import Request, Response
+from fastapi import Request
 from loguru import logger
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+from app.timing import SERVER_TIMING
 
-async def logging_middleware(
-    request: Request,
-    call_next: Callable[[Request], Awaitable[Response]],
-) -> Response:
-    log_request(request)
-    response = await call_next(request)
-    log_response(request, response)
-    return response
+
+class LoggingMiddleware:
+    """
+    Log every request and the status of its response once it starts.
+
+    Only a `sample_rate` share of the requests answered with a success is logged,
+    a request answered with an error or failing with an exception is always logged.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        sample_rate: float = 1.0,
+        sampler: Callable[[], float] = random.random,
+    ) -> None:
+        self.app = app
+        self.sample_rate = sample_rate
+        self._sampler = sampler
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        request = Request(scope)
+        if logged := self._sampler() < self.sample_rate:
+            log_request(request)
+        sampled = logged
+
+        async def send_with_log(message: Message) -> None:
+            nonlocal logged
+            if message["type"] == "http.response.start":
+                is_error = message["status"] >= HTTPStatus.BAD_REQUEST
+                if is_error and not logged:
+                    log_request(request)
+                    logged = True
+                if is_error or sampled:
+                    server_timing = MutableHeaders(scope=message).get(SERVER_TIMING)
+                    log_response(request, message["status"], server_timing)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_log)
+        except Exception:
+            # the exception becomes a 500 answered outside this middleware
+            if not logged:
+                log_request(request)
+            log_response(request, HTTPStatus.INTERNAL_SERVER_ERROR)
+            raise
 
 
 def log_request(request: Request) -> None:
     logger.info(create_log_message(request))
 
 
-def log_response(request: Request, response: Response) -> None:
-    log_function, status_message = get_log_strategy(response.status_code)
-    log_function(f"{create_log_message(request)}::{status_message}")
+def log_response(
+    request: Request, status_code: int, server_timing: str | None = None
+) -> None:
+    log_function, status_message = get_log_strategy(status_code)
+    timing_message = f"::[{server_timing}]" if server_timing else ""
+    log_function(f"{create_log_message(request)}::{status_message}{timing_message}")
 
 
 def create_log_message(request: Request) -> str:
@@ -0,0 +1,44 @@
+import time
+from http import HTTPStatus
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.metrics.instruments import REQUEST_DURATION, REQUESTS_IN_PROGRESS
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class MetricsMiddleware:
+    """Record the requests in flight and the request duration by route and status."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status_code = HTTPStatus.INTERNAL_SERVER_ERROR
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress = REQUESTS_IN_PROGRESS.labels(scope["method"])
+        in_progress.inc()
+        start_time = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_progress.dec()
+            REQUEST_DURATION.labels(
+                scope["method"], route_path(scope), str(int(status_code))
+            ).observe(time.perf_counter() - start_time)
+
+
+def route_path(scope: Scope) -> str:
+    """The path template of the route that handled the request, e.g. `/vehicles/{id}`."""
+    route = scope.get("route")
+    return getattr(route, "path", UNMATCHED_ROUTE)
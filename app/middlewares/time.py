@@ -1,38 +1,64 @@
 import time
-from collections.abc import Awaitable, Callable
-from functools import partial
 
-from fastapi import Request, Response
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from app import contracts
+from app.timing import (
+    SECONDS_TO_MILLISECONDS,
+    SERVER_TIMING,
+    RequestTimings,
+    request_timings,
+)
 
 NANOSECONDS_TO_MILLISECONDS_DIVIDER = 1e6
 HEADER_NAME = "X-Process-Time-Milliseconds"
 
 
-async def add_process_time_header(
-    request: Request,
-    call_next: Callable[[Request], Awaitable[Response]],
-) -> Response:
-    contracts.requires_not_null(request)
-    contracts.requires_not_null(call_next)
-    response, process_time = await measure_process_time(partial(call_next, request))
-    return add_header_to_response(response, process_time)
+class ProcessTimeMiddleware:
+    """
+    Add the time until the response started to the response headers.
 
+    `X-Process-Time-Milliseconds` holds the total, `Server-Timing` splits it into
+    database, serialization and the remaining application time.
+    """
 
-async def measure_process_time[T](
-    call_next: Callable[[], Awaitable[T]],
-) -> tuple[T, float]:
-    start_time = time.perf_counter_ns()
-    op = await call_next()
-    end_time = time.perf_counter_ns()
-    return op, calculate_process_time(start_time, end_time)
+    def __init__(self, app: ASGIApp) -> None:
+        contracts.requires_not_null(app)
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start_time = time.perf_counter_ns()
+        timings = RequestTimings()
+        token = request_timings.set(timings)
+
+        async def send_with_process_time(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                process_time = calculate_process_time(
+                    start_time, time.perf_counter_ns()
+                )
+                headers = MutableHeaders(scope=message)
+                add_header_to_response(headers, process_time)
+                headers[SERVER_TIMING] = timings.server_timing(
+                    process_time / SECONDS_TO_MILLISECONDS
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_process_time)
+        finally:
+            request_timings.reset(token)
 
 
 def calculate_process_time(start_time: int, end_time: int) -> float:
     return (end_time - start_time) / NANOSECONDS_TO_MILLISECONDS_DIVIDER
 
 
-def add_header_to_response(response: Response, process_time: float) -> Response:
-    response.headers[HEADER_NAME] = f"{process_time:.3f}"
-    return response
+def add_header_to_response(
+    headers: MutableHeaders, process_time: float
+) -> MutableHeaders:
+    headers[HEADER_NAME] = f"{process_time:.3f}"
+    return headers
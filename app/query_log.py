@@ -0,0 +1,85 @@
+import random
+import re
+from typing import Any
+
+from asgi_correlation_id import correlation_id
+from loguru import logger
+from sqlalchemy import Connection
+
+from app.config import get_settings
+
+SECONDS_TO_MILLISECONDS = 1e3
+EXPLAIN = "EXPLAIN (ANALYZE, BUFFERS) "
+EXPLAIN_SAVEPOINT = "slow_query_explain"
+SELECT_STATEMENT = re.compile(r"^\s*SELECT\b", re.IGNORECASE)
+
+settings = get_settings()
+
+
+def is_slow(duration: float) -> bool:
+    return duration * SECONDS_TO_MILLISECONDS >= settings.SLOW_QUERY_THRESHOLD_MS
+
+
+def log_slow_query(
+    conn: Connection,
+    cursor: Any,
+    statement: str,
+    parameters: Any,
+    executemany: bool,
+    duration: float,
+) -> None:
+    """
+    Log a statement that took longer than the slow query threshold.
+
+    Parameter values are redacted to their types. A sampled share of slow selects
+    on postgres is run again under `EXPLAIN (ANALYZE, BUFFERS)` to log the plan.
+    """
+    query_logger = logger.bind(
+        correlation_id=correlation_id.get(),
+        duration_ms=round(duration * SECONDS_TO_MILLISECONDS, 3),
+        rowcount=cursor.rowcount,
+    )
+    query_logger.warning(
+        f"Slow query: {duration * SECONDS_TO_MILLISECONDS:.3f} ms, "
+        f"{cursor.rowcount} rows :: {statement} :: {redact(parameters, executemany)}"
+    )
+    if (
+        conn.dialect.name == "postgresql"
+        and not executemany
+        and SELECT_STATEMENT.match(statement)
+        and random.random() < settings.SLOW_QUERY_EXPLAIN_SAMPLE_RATE
+    ):
+        query_logger.warning(
+            f"Slow query plan :: {statement}\n{explain(conn, statement, parameters)}"
+        )
+
+
+def redact(parameters: Any, executemany: bool) -> Any:
+    """Replace the parameter values by the names of their types."""
+    if executemany:
+        return f"<{len(parameters)} parameter sets>"
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    return [type(value).__name__ for value in parameters or ()]
+
+
+def explain(conn: Connection, statement: str, parameters: Any) -> str:
+    """
+    Run a statement under `EXPLAIN (ANALYZE, BUFFERS)` and return the plan.
+
+    The statement runs inside a savepoint on its own cursor, so a failing explain
+    neither aborts the transaction nor discards the results of the statement.
+    """
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute(f"SAVEPOINT {EXPLAIN_SAVEPOINT}")
+        try:
+            cursor.execute(EXPLAIN + statement, parameters)
+            plan = "\n".join(row[0] for row in cursor.fetchall())
+        except conn.dialect.loaded_dbapi.Error as exc:
+            cursor.execute(f"ROLLBACK TO SAVEPOINT {EXPLAIN_SAVEPOINT}")
+            plan = f"EXPLAIN failed: {exc}"
+        cursor.execute(f"RELEASE SAVEPOINT {EXPLAIN_SAVEPOINT}")
+        return plan
+    finally:
+        cursor.close()
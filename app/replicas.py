@@ -0,0 +1,41 @@
+import threading
+import time
+from collections.abc import Callable, Sequence
+
+CONSISTENCY_KEY = "X-Consistency-Key"
+
+
+class ReplicaSet[E]:
+    """
+    Round-robin over the read replicas, skipping the ones that failed recently.
+
+    A replica passed to `eject` is left out for `eject_seconds` and then tried again.
+    """
+
+    def __init__(
+        self,
+        replicas: Sequence[E],
+        eject_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.replicas = list(replicas)
+        self.eject_seconds = eject_seconds
+        self._clock = clock
+        self._ejected_until = [0.0] * len(self.replicas)
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def choose(self) -> E | None:
+        """Return the next healthy replica, `None` if all of them are ejected."""
+        with self._lock:
+            now = self._clock()
+            for _ in self.replicas:
+                index, self._next = self._next, (self._next + 1) % len(self.replicas)
+                if self._ejected_until[index] <= now:
+                    return self.replicas[index]
+            return None
+
+    def eject(self, replica: E) -> None:
+        with self._lock:
+            index = self.replicas.index(replica)
+            self._ejected_until[index] = self._clock() + self.eject_seconds
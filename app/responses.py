@@ -0,0 +1,21 @@
+from typing import Any
+
+import pydantic_core
+from fastapi.responses import JSONResponse
+
+from app.timing import measure
+
+
+class PydanticJSONResponse(JSONResponse):
+    """
+    JSON response encoded by pydantic-core.
+
+    Content that is already encoded, e.g. by `TypeAdapter.dump_json`, is sent as is,
+    anything else is encoded with `pydantic_core.to_json` instead of `json.dumps`.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        with measure("ser"):
+            return pydantic_core.to_json(content)
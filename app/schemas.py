@@ -1,22 +1,19 @@
 import datetime
-from typing import Any, Literal
+from typing import Annotated, Any, Literal
 
-from pydantic import BaseModel, ConfigDict, model_validator
+from pydantic import AfterValidator, BaseModel, ConfigDict
+
+
+def set_null_microseconds(value: datetime.datetime) -> datetime.datetime:
+    return value.replace(microsecond=0) if value.microsecond else value
+
+
+Datetime = Annotated[datetime.datetime, AfterValidator(set_null_microseconds)]
 
 
 class CustomModel(BaseModel):
     model_config = ConfigDict(ser_json_timedelta="iso8601", populate_by_name=True)
 
-    @model_validator(mode="before")
-    @classmethod
-    def set_null_microseconds(cls, data: dict[str, Any]) -> dict[str, Any]:
-        datetime_fields = {
-            k: v.replace(microsecond=0)
-            for k, v in data.items()
-            if isinstance(v, datetime.datetime)
-        }
-        return {**data, **datetime_fields}
-
     def serialize(self, mode: Literal["json", "python"] = "json") -> dict[str, Any]:
         """Serialize the model to a dictionary.
 
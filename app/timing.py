@@ -0,0 +1,50 @@
+import contextlib
+import dataclasses
+import time
+from collections.abc import Iterator
+from contextvars import ContextVar
+from typing import Literal
+
+SERVER_TIMING = "Server-Timing"
+SECONDS_TO_MILLISECONDS = 1e3
+
+type Stage = Literal["db", "ser"]
+
+
+@dataclasses.dataclass
+class RequestTimings:
+    """Seconds a request spent querying the database and serializing."""
+
+    db: float = 0.0
+    ser: float = 0.0
+
+    def add(self, stage: Stage, seconds: float) -> None:
+        setattr(self, stage, getattr(self, stage) + seconds)
+
+    def server_timing(self, total: float) -> str:
+        """Format the timings as `Server-Timing` header, `app` is the rest of `total`."""
+        app = max(total - self.db - self.ser, 0.0)
+        return ", ".join(
+            f"{name};dur={seconds * SECONDS_TO_MILLISECONDS:.3f}"
+            for name, seconds in (("db", self.db), ("ser", self.ser), ("app", app))
+        )
+
+
+request_timings: ContextVar[RequestTimings | None] = ContextVar(
+    "request_timings", default=None
+)
+
+
+def add_timing(stage: Stage, seconds: float) -> None:
+    """Add to the timings of the current request, if any is being timed."""
+    if (timings := request_timings.get()) is not None:
+        timings.add(stage, seconds)
+
+
+@contextlib.contextmanager
+def measure(stage: Stage) -> Iterator[None]:
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        add_timing(stage, time.perf_counter() - start_time)
@@ -0,0 +1,80 @@
+import datetime
+import email.utils
+import hashlib
+from collections.abc import Iterable, Sequence
+
+ANY_ETAG = "*"
+WEAK_PREFIX = "W/"
+ETAG_SEPARATOR = "-"
+ETAG_DIGEST_SIZE = 16
+
+
+def make_etag(*parts: object) -> str:
+    """Build a strong entity tag from the given parts."""
+    return f'"{ETAG_SEPARATOR.join(str(part) for part in parts)}"'
+
+
+def make_weak_etag(parts: Iterable[bytes]) -> str:
+    """Build a weak entity tag from a digest over the given parts."""
+    digest = hashlib.blake2b(digest_size=ETAG_DIGEST_SIZE)
+    for part in parts:
+        digest.update(part)
+    return f'{WEAK_PREFIX}"{digest.hexdigest()}"'
+
+
+def parse_etags(header: str) -> Sequence[str] | None:
+    """
+    Parse the entity tags of an `If-Match` or `If-None-Match` header.
+
+    Returns None for the `*` wildcard, otherwise the opaque tags without
+    weakness prefix and quotes.
+    """
+    if header.strip() == ANY_ETAG:
+        return None
+    return [opaque_tag(tag) for tag in header.split(",") if tag.strip()]
+
+
+def opaque_tag(etag: str) -> str:
+    """Strip the weakness prefix and quotes of an entity tag."""
+    return etag.strip().removeprefix(WEAK_PREFIX).strip('"')
+
+
+def format_http_date(value: datetime.datetime) -> str:
+    """Format a datetime as http date, naive datetimes are taken as utc."""
+    return email.utils.format_datetime(_as_utc(value), usegmt=True)
+
+
+def parse_http_date(value: str) -> datetime.datetime | None:
+    """Parse an http date, returns None if it is malformed."""
+    try:
+        return email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def is_not_modified(
+    etag: str,
+    if_none_match: str | None,
+    last_modified: datetime.datetime | None = None,
+    if_modified_since: str | None = None,
+) -> bool:
+    """
+    Evaluate the conditional request headers of a GET request.
+
+    `If-Modified-Since` is only taken into account without `If-None-Match`,
+    entity tags are compared weakly.
+    """
+    if if_none_match is not None:
+        etags = parse_etags(if_none_match)
+        return etags is None or opaque_tag(etag) in etags
+    if last_modified is None or if_modified_since is None:
+        return False
+    if (since := parse_http_date(if_modified_since)) is None:
+        return False
+    return _as_utc(last_modified).replace(microsecond=0) <= _as_utc(since)
+
+
+def _as_utc(value: datetime.datetime) -> datetime.datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=datetime.timezone.utc)
+    return value.astimezone(datetime.timezone.utc)
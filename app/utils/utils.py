@@ -1,7 +1,10 @@
+import base64
 import datetime
 
 import uuid_utils as uuid
 
+CURSOR_PADDING = "="
+
 
 def utc_now() -> datetime.datetime:
     """Returns a utc timezone aware datetime object."""
@@ -16,3 +19,22 @@ def is_valid_uuid7(value: str) -> bool:
         return bool(uuid.UUID(value, version=7))
     except ValueError:
         return False
+
+
+def encode_cursor(value: uuid.UUID) -> str:
+    """Encode an uuid into an opaque, url safe pagination cursor."""
+    return base64.urlsafe_b64encode(value.bytes).decode().rstrip(CURSOR_PADDING)
+
+
+def decode_cursor(cursor: str) -> uuid.UUID:
+    """
+    Decode a pagination cursor created by `encode_cursor`.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    padding = CURSOR_PADDING * (-len(cursor) % 4)
+    try:
+        return uuid.UUID(bytes=base64.urlsafe_b64decode(cursor + padding))
+    except ValueError as exc:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from exc
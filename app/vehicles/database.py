@@ -1,14 +1,21 @@
 from sqlalchemy import (
+    DDL,
     JSON,
+    BigInteger,
     Boolean,
     Column,
     DateTime,
+    Index,
     Integer,
+    MetaData,
     String,
     Table,
+    UniqueConstraint,
     Uuid,
+    event,
     func,
 )
+from sqlalchemy.dialects.postgresql import JSONB
 
 from app.database import metadata
 
@@ -19,7 +26,130 @@ vehicles = Table(
     Column("name", String, nullable=False),
     Column("manufacturing_year", Integer, nullable=False),
     Column("is_drivable", Boolean, nullable=True),
-    Column("body", JSON, nullable=True),
+    Column("body", JSON().with_variant(JSONB(), "postgresql"), nullable=True),
     Column("created_at", DateTime, server_default=func.now(), nullable=False),
     Column("updated_at", DateTime, onupdate=func.now()),
+    Column("version", Integer, server_default="1", nullable=False),
+    Index(None, "name"),
+    Index(None, "manufacturing_year", "is_drivable"),
+    Index(None, "is_drivable", "id"),
+    Index(
+        "vehicles_name_trgm_idx",
+        "name",
+        postgresql_using="gin",
+        postgresql_ops={"name": "gin_trgm_ops"},
+    ).ddl_if(dialect="postgresql"),
+    Index(
+        None,
+        "body",
+        postgresql_using="gin",
+        postgresql_ops={"body": "jsonb_path_ops"},
+    ).ddl_if(dialect="postgresql"),
+)
+
+event.listen(
+    vehicles,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+
+vehicle_stats = Table(
+    "vehicle_stats",
+    metadata,
+    Column("manufacturing_year", Integer, nullable=False),
+    Column("is_drivable", Boolean, nullable=True),
+    Column("count", BigInteger, nullable=False),
+    UniqueConstraint("manufacturing_year", "is_drivable"),
+)
+
+COUNT_VEHICLES = """
+CREATE OR REPLACE FUNCTION count_vehicles() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO vehicle_stats AS stats (manufacturing_year, is_drivable, count)
+        SELECT manufacturing_year, is_drivable, count(*) FROM new_vehicles
+        GROUP BY 1, 2 ORDER BY 1, 2
+        ON CONFLICT (manufacturing_year, is_drivable)
+        DO UPDATE SET count = stats.count + excluded.count;
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO vehicle_stats AS stats (manufacturing_year, is_drivable, count)
+        SELECT manufacturing_year, is_drivable, -count(*) FROM old_vehicles
+        GROUP BY 1, 2 ORDER BY 1, 2
+        ON CONFLICT (manufacturing_year, is_drivable)
+        DO UPDATE SET count = stats.count + excluded.count;
+    ELSE
+        INSERT INTO vehicle_stats AS stats (manufacturing_year, is_drivable, count)
+        SELECT manufacturing_year, is_drivable, sum(delta) FROM (
+            SELECT manufacturing_year, is_drivable, 1 AS delta FROM new_vehicles
+            UNION ALL
+            SELECT manufacturing_year, is_drivable, -1 AS delta FROM old_vehicles
+        ) AS changes
+        GROUP BY 1, 2 HAVING sum(delta) <> 0 ORDER BY 1, 2
+        ON CONFLICT (manufacturing_year, is_drivable)
+        DO UPDATE SET count = stats.count + excluded.count;
+    END IF;
+    RETURN NULL;
+END
+$$
+"""
+CLEAR_VEHICLE_STATS = """
+CREATE OR REPLACE FUNCTION clear_vehicle_stats() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    DELETE FROM vehicle_stats;
+    RETURN NULL;
+END
+$$
+"""
+COUNT_VEHICLES_TRIGGER = """
+CREATE TRIGGER vehicles_count_{name} AFTER {operation} ON vehicles
+REFERENCING {transition_tables} FOR EACH STATEMENT EXECUTE FUNCTION count_vehicles()
+"""
+COUNT_VEHICLES_TRIGGERS = {
+    "INSERT": "NEW TABLE AS new_vehicles",
+    "UPDATE": "OLD TABLE AS old_vehicles NEW TABLE AS new_vehicles",
+    "DELETE": "OLD TABLE AS old_vehicles",
+}
+# TRUNCATE fires no row level changes and has no transition tables to count
+CLEAR_VEHICLE_STATS_TRIGGER = """
+CREATE TRIGGER vehicles_count_truncate AFTER TRUNCATE ON vehicles
+FOR EACH STATEMENT EXECUTE FUNCTION clear_vehicle_stats()
+"""
+
+for definition in (COUNT_VEHICLES, CLEAR_VEHICLE_STATS):
+    event.listen(
+        vehicles, "after_create", DDL(definition).execute_if(dialect="postgresql")
+    )
+for operation, transition_tables in COUNT_VEHICLES_TRIGGERS.items():
+    trigger = COUNT_VEHICLES_TRIGGER.format(
+        name=operation.lower(),
+        operation=operation,
+        transition_tables=transition_tables,
+    )
+    event.listen(
+        vehicles, "after_create", DDL(trigger).execute_if(dialect="postgresql")
+    )
+event.listen(
+    vehicles,
+    "after_create",
+    DDL(CLEAR_VEHICLE_STATS_TRIGGER).execute_if(dialect="postgresql"),
+)
+for function in ("count_vehicles", "clear_vehicle_stats"):
+    event.listen(
+        vehicles,
+        "after_drop",
+        DDL(f"DROP FUNCTION IF EXISTS {function}()").execute_if(dialect="postgresql"),
+    )
+
+
+def _staging_column(column: Column) -> Column:
+    staged = column._copy()
+    staged.primary_key = False
+    return staged
+
+
+vehicles_import = Table(
+    "vehicles_import",
+    MetaData(),
+    *(_staging_column(column) for column in vehicles.columns),
+    prefixes=["TEMPORARY"],
 )
@@ -0,0 +1,81 @@
+"""Streaming export of the vehicles table."""
+
+import csv
+import io
+import json
+from collections.abc import AsyncIterator, Iterable, Iterator, Sequence
+from enum import StrEnum
+from typing import Any
+
+from sqlalchemy import Engine, RowMapping
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.vehicles.schemas import VEHICLES_ADAPTER, VehicleFromDatabase
+from app.vehicles.services import stream_vehicles, stream_vehicles_async
+
+CSV_COLUMNS = list(VehicleFromDatabase.model_fields)
+
+
+class ExportFormat(StrEnum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+    @property
+    def media_type(self) -> str:
+        match self:
+            case ExportFormat.NDJSON:
+                return "application/x-ndjson"
+            case ExportFormat.CSV:
+                return "text/csv"
+
+
+def render_header(export_format: ExportFormat) -> str:
+    if export_format is ExportFormat.NDJSON:
+        return ""
+    return _write_csv([CSV_COLUMNS])
+
+
+def render_rows(export_format: ExportFormat, rows: Sequence[RowMapping]) -> str:
+    vehicles = VEHICLES_ADAPTER.validate_python(rows)
+    if export_format is ExportFormat.NDJSON:
+        return "".join(f"{vehicle.model_dump_json()}\n" for vehicle in vehicles)
+    return _write_csv(_to_csv_row(vehicle.serialize()) for vehicle in vehicles)
+
+
+def iter_export(
+    engine: Engine,
+    filter_on: dict[str, Any],
+    export_format: ExportFormat,
+    partition_size: int,
+) -> Iterator[str]:
+    """Render the matching vehicles chunk by chunk on a server side cursor."""
+    yield render_header(export_format)
+    with engine.connect() as conn:
+        for rows in stream_vehicles(conn, filter_on, partition_size):
+            yield render_rows(export_format, rows)
+
+
+async def aiter_export(
+    engine: AsyncEngine,
+    filter_on: dict[str, Any],
+    export_format: ExportFormat,
+    partition_size: int,
+) -> AsyncIterator[str]:
+    """Async variant of `iter_export`."""
+    yield render_header(export_format)
+    async with engine.connect() as conn:
+        async for rows in stream_vehicles_async(conn, filter_on, partition_size):
+            yield render_rows(export_format, rows)
+
+
+def _to_csv_row(vehicle: dict[str, Any]) -> list[Any]:
+    return [
+        json.dumps(value) if isinstance(value, dict) else value
+        for value in (vehicle[column] for column in CSV_COLUMNS)
+    ]
+
+
+def _write_csv(rows: Iterable[Sequence[Any]]) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue()
@@ -0,0 +1,109 @@
+"""Parsing of streamed vehicle uploads."""
+
+import codecs
+import csv
+import json
+from collections.abc import AsyncIterator
+from typing import Any
+
+from app.vehicles.export import ExportFormat
+from app.vehicles.schemas import CreateVehicle, ImportReport, ImportRowError
+
+QUOTE = '"'
+EMPTY = ""
+STRING_FIELDS = frozenset(
+    name
+    for name, field in CreateVehicle.model_fields.items()
+    if field.annotation is str
+)
+
+
+async def iter_lines(stream: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Split a byte stream into decoded lines without buffering the whole body."""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    pending = EMPTY
+    async for chunk in stream:
+        *lines, pending = (pending + decoder.decode(chunk)).split("\n")
+        for line in lines:
+            yield line
+    if pending := pending + decoder.decode(b"", final=True):
+        yield pending
+
+
+async def iter_records(
+    stream: AsyncIterator[bytes], import_format: ExportFormat
+) -> AsyncIterator[tuple[int, str]]:
+    """Yield every record of the upload together with the line it starts on.
+
+    A csv record continues on the next line as long as one of its quotes is
+    still open, since escaped quotes inside a field always come in pairs.
+    """
+    record, start = EMPTY, 0
+    line_number = 0
+    async for line in iter_lines(stream):
+        line_number += 1
+        record, start = (f"{record}\n{line}", start) if record else (line, line_number)
+        if import_format is ExportFormat.CSV and record.count(QUOTE) % 2:
+            continue
+        if record.strip():
+            yield start, record.rstrip("\r")
+        record = EMPTY
+    if record.strip():
+        yield start, record
+
+
+def parse_record(
+    import_format: ExportFormat, header: list[str], record: str
+) -> CreateVehicle:
+    """
+    Validate a single record of the upload.
+
+    An empty csv field leaves the field unset, except for text fields where it
+    is the empty string, as the export writes both NULL and "" as empty fields.
+
+    Raises:
+        ValueError: If the record is not a valid vehicle.
+    """
+    if import_format is ExportFormat.NDJSON:
+        return CreateVehicle.model_validate_json(record)
+    [values] = csv.reader([record])
+    if len(values) != len(header):
+        raise ValueError(f"Expected {len(header)} columns, got {len(values)}.")
+    data: dict[str, Any] = {
+        k: v for k, v in zip(header, values) if v != EMPTY or k in STRING_FIELDS
+    }
+    if "body" in data:
+        data["body"] = json.loads(data["body"])
+    return CreateVehicle.model_validate(data)
+
+
+async def iter_batches(
+    stream: AsyncIterator[bytes],
+    import_format: ExportFormat,
+    batch_size: int,
+    report: ImportReport,
+    max_errors: int,
+) -> AsyncIterator[list[CreateVehicle]]:
+    """Yield the valid vehicles of an upload in batches.
+
+    Invalid records are counted as rejected and the first `max_errors` of them
+    are added to the errors of the report.
+    """
+    batch: list[CreateVehicle] = []
+    header: list[str] = []
+    async for line, record in iter_records(stream, import_format):
+        if import_format is ExportFormat.CSV and not header:
+            [header] = csv.reader([record])
+            continue
+        try:
+            batch.append(parse_record(import_format, header, record))
+        except ValueError as exc:
+            report.rejected += 1
+            if len(report.errors) < max_errors:
+                report.errors.append(ImportRowError(line=line, detail=str(exc)))
+            continue
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
@@ -1,31 +1,104 @@
 """FastAPI vehicles module."""
 
-import operator
+import itertools
+import json
 import uuid
-from typing import Annotated
+from collections.abc import Iterable, Sequence
+from typing import Annotated, Any
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import Connection
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.responses import StreamingResponse
+from sqlalchemy import RowMapping
+from sqlalchemy.ext.asyncio import AsyncEngine
 
-from app.database import get_connection
-from app.utils.utils import utc_now
-from app.vehicles import schemas
+from app.config import get_settings
+from app.database import (
+    AnyConnection,
+    AnyEngine,
+    connection_provider,
+    engine_provider,
+    read_connection_provider,
+    remember_write,
+    run_service,
+    wrote_recently,
+)
+from app.responses import PydanticJSONResponse
+from app.timing import measure
+from app.utils.http import (
+    ETAG_SEPARATOR,
+    format_http_date,
+    is_not_modified,
+    make_etag,
+    make_weak_etag,
+    parse_etags,
+)
+from app.utils.utils import decode_cursor, encode_cursor, utc_now
+from app.vehicles import export, ingest, schemas
 from app.vehicles.services import (
+    count_vehicles,
+    create_import_staging,
     delete_vehicle,
+    estimate_vehicles,
+    get_vehicle,
+    get_vehicle_stats,
     get_vehicles,
     insert_vehicle,
+    insert_vehicles,
+    merge_staged_vehicles,
+    search_vehicles,
+    stage_vehicles,
     update_vehicle,
 )
 
+settings = get_settings()
 router = APIRouter(prefix="/vehicles", tags=["Vehicles"])
 
 FILTER_ON = "filter by %s, optional."
+BODY_FILTER_PREFIX = "body."
+INVALID_BODY_FILTER = "Invalid body filter %r."
+DUPLICATE_BODY_FILTER = "Body filter %r is given more than once."
+INVALID_BODY_FILTER_VALUE = (
+    "Body filter %r must be a single value, not an object or array."
+)
+IF_MATCH = "ETags of the vehicle, the request fails if none of them is current."
+NOT_FOUND = "Vehicle not found."
+MODIFIED = "Vehicle was modified."
+IF_NONE_MATCH = "ETags the client holds, responds with 304 if one is current."
+IF_MODIFIED_SINCE = "Responds with 304 if the vehicle was not modified since."
+ETAG = "ETag"
+LAST_MODIFIED = "Last-Modified"
+TOTAL_COUNT = "X-Total-Count"
+COUNT = (
+    "How to count the matching vehicles for `X-Total-Count`, `estimated` answers from the"
+    " planner statistics in constant time and may be off by a few percent."
+)
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+DEFAULT_SEARCH_SIZE = 10
+MAX_SEARCH_SIZE = 100
+MAX_SEARCH_LENGTH = 100
+MAX_BODY_ATTRIBUTE_LENGTH = 100
+FIELDS = (
+    "Comma separated fields of the vehicles to return, all by default."
+    " `id` and `version` are always returned."
+)
+INVALID_FIELDS = "Invalid fields %s, expected some of %s."
+LAST_MODIFIED_FIELDS = frozenset({"created_at", "updated_at"})
 
 
-@router.get("/")
-def get_all(
+def filter_vehicles(
     *,
-    connection: Annotated[Connection, Depends(get_connection)],
+    request: Request,
     name: Annotated[
         str | None,
         Query(description=FILTER_ON % "name", examples=["Audi"]),
@@ -45,27 +118,262 @@ def get_all(
             examples=[True],
         ),
     ] = None,
+) -> schemas.FilterVehicle:
+    """
+    Filter on the vehicle columns and on attributes of the body.
+
+    A body attribute is filtered with `body.<attribute>=<value>`, e.g. `body.color=black`
+    or `body.engine.fuel=diesel` for nested attributes. Values are read as JSON where
+    possible, so `body.kilometer=10` matches the number 10, quote a value to match it
+    as a string, `body.plate="123"` matches the string "123".
+    """
+    return schemas.FilterVehicle(
+        name=name,
+        manufacturing_year=manufacturing_year,
+        is_drivable=is_drivable,
+        body=parse_body_filter(request.query_params.multi_items()) or None,
+    )
+
+
+def parse_body_filter(params: Iterable[tuple[str, str]]) -> dict[str, Any]:
+    """
+    Nest the body filters into the document the body has to contain.
+
+    Raises:
+        HTTPException: 422 if an attribute of the path is empty, if a filter is given
+            twice or is also the parent of another or if a value is an object or array.
+    """
+    body: dict[str, Any] = {}
+    for key, value in params:
+        if not key.startswith(BODY_FILTER_PREFIX):
+            continue
+        *parents, attribute = path = key.removeprefix(BODY_FILTER_PREFIX).split(".")
+        if not all(path):
+            raise invalid_body_filter(INVALID_BODY_FILTER % key)
+        node = body
+        for parent in parents:
+            node = node.setdefault(parent, {})
+            if not isinstance(node, dict):
+                raise invalid_body_filter(INVALID_BODY_FILTER % key)
+        if isinstance(node.get(attribute), dict):
+            raise invalid_body_filter(INVALID_BODY_FILTER % key)
+        if attribute in node:
+            raise invalid_body_filter(DUPLICATE_BODY_FILTER % key)
+        if isinstance(filter_value := parse_filter_value(value), dict | list):
+            raise invalid_body_filter(INVALID_BODY_FILTER_VALUE % key)
+        node[attribute] = filter_value
+    return body
+
+
+def invalid_body_filter(detail: str) -> HTTPException:
+    return HTTPException(status.HTTP_422_UNPROCESSABLE_ENTITY, detail=detail)
+
+
+def parse_filter_value(value: str) -> Any:
+    try:
+        return json.loads(value)
+    except ValueError:
+        return value
+
+
+def select_fields(
+    fields: Annotated[
+        str | None, Query(description=FIELDS, examples=["name,manufacturing_year"])
+    ] = None,
+) -> frozenset[str] | None:
+    """The fields of the vehicles to return, None for all of them."""
+    if fields is None:
+        return None
+    selected = frozenset(field.strip() for field in fields.split(","))
+    if invalid := selected.difference(schemas.VEHICLE_FIELDS):
+        raise HTTPException(
+            status_code=400,
+            detail=INVALID_FIELDS
+            % (", ".join(sorted(invalid)), ", ".join(schemas.VEHICLE_FIELDS)),
+        )
+    return selected | schemas.REQUIRED_FIELDS
+
+
+@router.get("/", response_class=PydanticJSONResponse)
+async def get_all(
+    *,
+    connection: Annotated[AnyConnection, Depends(read_connection_provider)],
+    filter_on: Annotated[schemas.FilterVehicle, Depends(filter_vehicles)],
+    fields: Annotated[frozenset[str] | None, Depends(select_fields)],
+    limit: Annotated[
+        int,
+        Query(ge=1, le=MAX_PAGE_SIZE, description="Maximum vehicles per page."),
+    ] = DEFAULT_PAGE_SIZE,
+    cursor: Annotated[
+        str | None,
+        Query(description="Opaque cursor of the page to fetch, see `next_cursor`."),
+    ] = None,
+    count: Annotated[
+        schemas.TotalCount, Query(description=COUNT)
+    ] = schemas.TotalCount.NONE,
+    if_none_match: Annotated[str | None, Header(description=IF_NONE_MATCH)] = None,
 ) -> schemas.DataMany[schemas.VehicleFromDatabase]:
     """
     List all vehicles.
 
-    Filters can be applied to refine results based on name, manufacturing year, and readiness for driving.
+    Filters can be applied to refine results based on name, manufacturing year, and readiness for driving,
+    attributes of the body are filtered with `body.<attribute>=<value>`, e.g. `body.color=black`.
+    Body values are read as JSON where possible, quote them to match a string, e.g. `body.plate="123"`.
+    Results are ordered by ID and paged, pass the returned `next_cursor` to fetch the next page.
+    Responds with `304 Not Modified` if the page still has the ETag given in `If-None-Match`.
+    With `count` the number of all matching vehicles is sent in `X-Total-Count`, it is not part of the ETag.
+    With `fields` only the given fields are read and returned, e.g. `fields=name` for a list of names.
     """
-    filter_on = schemas.FilterVehicle(
-        name=name, manufacturing_year=manufacturing_year, is_drivable=is_drivable
+    try:
+        after = decode_cursor(cursor) if cursor is not None else None
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail="Invalid cursor.") from exc
+    vehicles = await run_service(
+        connection,
+        get_vehicles,
+        filter_on.model_dump(exclude_none=True),
+        after=after,
+        limit=limit + 1,
+        columns=fields,
     )
-    vehicles = get_vehicles(connection, filter_on.model_dump(exclude_none=True))
-    return schemas.DataMany(
-        data=[
-            schemas.VehicleFromDatabase.model_validate(vehicle) for vehicle in vehicles
-        ]
+    page, rest = vehicles[:limit], vehicles[limit:]
+    next_cursor = encode_cursor(page[-1]["id"]) if rest else None
+    headers = {ETAG: page_etag(page, next_cursor)}
+    headers |= await total_count(connection, filter_on, count)
+    if is_not_modified(headers[ETAG], if_none_match):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return vehicle_page(page, next_cursor, fields, headers=headers)
+
+
+@router.head("/", response_class=Response)
+async def count_all(
+    *,
+    connection: Annotated[AnyConnection, Depends(read_connection_provider)],
+    filter_on: Annotated[schemas.FilterVehicle, Depends(filter_vehicles)],
+    count: Annotated[
+        schemas.TotalCount, Query(description=COUNT)
+    ] = schemas.TotalCount.EXACT,
+) -> Response:
+    """
+    Count the vehicles matching the filters without listing them.
+
+    Accepts the same filters as listing the vehicles, the number is sent in `X-Total-Count`.
+    """
+    return Response(headers=await total_count(connection, filter_on, count))
+
+
+async def total_count(
+    connection: AnyConnection,
+    filter_on: schemas.FilterVehicle,
+    count: schemas.TotalCount,
+) -> dict[str, str]:
+    match count:
+        case schemas.TotalCount.EXACT:
+            service = count_vehicles
+        case schemas.TotalCount.ESTIMATED:
+            service = estimate_vehicles
+        case schemas.TotalCount.NONE:
+            return {}
+    total = await run_service(
+        connection, service, filter_on.model_dump(exclude_none=True)
     )
+    return {TOTAL_COUNT: str(total)}
 
 
-@router.post("/", status_code=status.HTTP_201_CREATED)
-def insert(
+@router.get("/search", response_class=PydanticJSONResponse)
+async def search(
     *,
-    connection: Annotated[Connection, Depends(get_connection)],
+    connection: Annotated[AnyConnection, Depends(read_connection_provider)],
+    q: Annotated[
+        str,
+        Query(
+            min_length=1,
+            max_length=MAX_SEARCH_LENGTH,
+            description="Name or beginning of the name to search for.",
+        ),
+    ],
+    limit: Annotated[
+        int,
+        Query(ge=1, le=MAX_SEARCH_SIZE, description="Maximum vehicles returned."),
+    ] = DEFAULT_SEARCH_SIZE,
+) -> schemas.DataMany[schemas.VehicleFromDatabase]:
+    """
+    Search vehicles by name.
+
+    Vehicles whose name starts with `q` are returned first, followed by vehicles with a similar name
+    ranked by similarity. Meant for typeahead, use the `name` filter of the list for exact matches.
+    """
+    result = await run_service(connection, search_vehicles, q, limit)
+    return vehicle_page(result)
+
+
+@router.get("/stats")
+async def stats(
+    *,
+    connection: Annotated[AnyConnection, Depends(read_connection_provider)],
+    body: Annotated[
+        str | None,
+        Query(
+            min_length=1,
+            max_length=MAX_BODY_ATTRIBUTE_LENGTH,
+            description="Attribute of the body to count by as well, e.g. `color`.",
+        ),
+    ] = None,
+) -> schemas.DataMany[schemas.VehicleStats]:
+    """
+    Count the vehicles by manufacturing year and drivability.
+
+    Meant for dashboards, the counts are kept up to date as vehicles are written, so they are read
+    without scanning the vehicles. Counting by a body attribute as well groups the vehicles per request.
+    """
+    result = await run_service(connection, get_vehicle_stats, body)
+    with measure("ser"):
+        return schemas.DataMany(
+            [schemas.VehicleStats.model_validate(row) for row in result]
+        )
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_all(
+    *,
+    engine: Annotated[AnyEngine, Depends(engine_provider)],
+    filter_on: Annotated[schemas.FilterVehicle, Depends(filter_vehicles)],
+    format: Annotated[
+        export.ExportFormat, Query(description="The export file format.")
+    ] = export.ExportFormat.NDJSON,
+) -> StreamingResponse:
+    """
+    Export all vehicles as newline delimited JSON or CSV.
+
+    Accepts the same filters as listing the vehicles. Rows are streamed from a server side cursor
+    as they are read, so the export is not held in memory.
+    """
+    args = (
+        filter_on.model_dump(exclude_none=True),
+        format,
+        settings.EXPORT_PARTITION_SIZE,
+    )
+    content = (
+        export.aiter_export(engine, *args)
+        if isinstance(engine, AsyncEngine)
+        else export.iter_export(engine, *args)
+    )
+    return StreamingResponse(
+        content,
+        media_type=format.media_type,
+        headers={"Content-Disposition": f'attachment; filename="vehicles.{format}"'},
+    )
+
+
+@router.post(
+    "/",
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(remember_write)],
+)
+async def insert(
+    *,
+    connection: Annotated[AnyConnection, Depends(connection_provider)],
+    response: Response,
     to_create: schemas.CreateVehicle,
 ) -> schemas.DataOne[schemas.VehicleFromDatabase]:
     r"""
@@ -80,16 +388,97 @@ def insert(
     ready_to_drive: A boolean flag indicating whether the vehicle is ready to drive.
     Defaults to False.
     """
-    result = insert_vehicle(connection, to_create)
-    return schemas.DataOne(schemas.VehicleFromDatabase.model_validate(result))
+    vehicle = await run_service(connection, insert_vehicle, to_create)
+    with measure("ser"):
+        result = schemas.VehicleFromDatabase.model_validate(vehicle)
+    response.headers[ETAG] = vehicle_etag(result.id, result.version)
+    return schemas.DataOne(result)
+
+
+@router.post(
+    "/bulk",
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(remember_write)],
+    response_class=PydanticJSONResponse,
+)
+async def insert_many(
+    *,
+    connection: Annotated[AnyConnection, Depends(connection_provider)],
+    to_create: Annotated[
+        list[schemas.CreateVehicle],
+        Body(min_length=1, max_length=settings.BULK_INSERT_MAX_SIZE),
+    ],
+) -> schemas.DataMany[schemas.VehicleFromDatabase]:
+    """
+    Create many vehicles at once.
+
+    The vehicles are inserted in batched multi-row statements within a single transaction,
+    either all of them are created or none.
+    """
+    result = await run_service(
+        connection, insert_vehicles, to_create, settings.BULK_INSERT_BATCH_SIZE
+    )
+    return vehicle_page(result, status_code=status.HTTP_201_CREATED)
+
+
+@router.post(
+    "/import",
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(remember_write)],
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                import_format.media_type: {"schema": {"type": "string"}}
+                for import_format in export.ExportFormat
+            },
+        }
+    },
+)
+async def import_all(
+    *,
+    connection: Annotated[AnyConnection, Depends(connection_provider)],
+    request: Request,
+    format: Annotated[
+        export.ExportFormat, Query(description="The format of the uploaded file.")
+    ] = export.ExportFormat.NDJSON,
+) -> schemas.DataOne[schemas.ImportReport]:
+    """
+    Import vehicles from a newline delimited JSON or CSV upload.
+
+    The upload is read as a stream and loaded with `COPY` into a staging table, which is then merged
+    into the vehicles. Rows failing validation are reported and do not abort the import,
+    rows with an already existing ID are skipped.
+    """
+    report = schemas.ImportReport()
+    staged = 0
+    await run_service(connection, create_import_staging)
+    async for batch in ingest.iter_batches(
+        request.stream(),
+        format,
+        settings.IMPORT_BATCH_SIZE,
+        report,
+        settings.IMPORT_MAX_ERRORS,
+    ):
+        await run_service(connection, stage_vehicles, batch)
+        staged += len(batch)
+    report.imported = await run_service(connection, merge_staged_vehicles)
+    report.skipped = staged - report.imported
+    return schemas.DataOne(report)
 
 
-@router.put("/{id}", status_code=status.HTTP_204_NO_CONTENT)
-def update(
+@router.put(
+    "/{id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    dependencies=[Depends(remember_write)],
+)
+async def update(
     *,
-    connection: Annotated[Connection, Depends(get_connection)],
+    connection: Annotated[AnyConnection, Depends(connection_provider)],
+    response: Response,
     id: uuid.UUID,
     update_with: schemas.UpdateVehicle,
+    if_match: Annotated[str | None, Header(description=IF_MATCH)] = None,
 ) -> None:
     r"""
     Update a vehicle.
@@ -97,46 +486,135 @@ def update(
     Args:
     ----
     id: The ID of the vehicle to update.\
-    update_with: An instance of `schemas.VehicleUpdate` with updated information.
+    update_with: An instance of `schemas.VehicleUpdate` with updated information.\
+    if_match: Only update if the vehicle still has one of the given ETags.
     """
-    if not get_vehicles(connection, dict(id=id)):
-        raise HTTPException(status_code=404, detail="Vehicle not found.")
-    update_vehicle(connection, id, update_with)
+    versions = if_match_versions(id, if_match)
+    updated = await run_service(
+        connection, update_vehicle, id, update_with, versions=versions
+    )
+    if updated is None:
+        raise await not_found_or_modified(connection, id, if_match)
+    response.headers[ETAG] = vehicle_etag(id, updated["version"])
 
 
-@router.get("/{id}")
-def get(
+@router.get("/{id}", response_class=PydanticJSONResponse)
+async def get(
     *,
-    connection: Annotated[Connection, Depends(get_connection)],
+    connection: Annotated[AnyConnection, Depends(read_connection_provider)],
+    request: Request,
     id: uuid.UUID,
+    fields: Annotated[frozenset[str] | None, Depends(select_fields)],
+    if_none_match: Annotated[str | None, Header(description=IF_NONE_MATCH)] = None,
+    if_modified_since: Annotated[
+        str | None, Header(description=IF_MODIFIED_SINCE)
+    ] = None,
 ) -> schemas.DataOne[schemas.VehicleFromDatabase]:
-    """
+    r"""
     Get a vehicle by ID.
 
+    Responds with `304 Not Modified` if the client already holds the current vehicle.
+
     Args:
     ----
-    id: The ID of the vehicle to retrieve.
+    id: The ID of the vehicle to retrieve.\
+    fields: Comma separated fields to return, all by default.\
+    if_none_match: ETags of the vehicle the client holds.\
+    if_modified_since: Date the vehicle the client holds was last modified.
     """
-    if not (vehicle := get_vehicles(connection, dict(id=id))):
-        raise HTTPException(status_code=404, detail="Vehicle not found.")
-    return schemas.DataOne(
-        schemas.VehicleFromDatabase.model_validate(operator.getitem(vehicle, 0))
+    columns = fields | LAST_MODIFIED_FIELDS if fields is not None else None
+    vehicle = await run_service(
+        connection, get_vehicle, id, columns, fresh=wrote_recently(request)
     )
+    if not vehicle:
+        raise HTTPException(status_code=404, detail=NOT_FOUND)
+    last_modified = vehicle["updated_at"] or vehicle["created_at"]
+    headers = {
+        ETAG: vehicle_etag(id, vehicle["version"]),
+        LAST_MODIFIED: format_http_date(last_modified),
+    }
+    if is_not_modified(headers[ETAG], if_none_match, last_modified, if_modified_since):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    adapter = (
+        schemas.projected_adapter(fields)
+        if fields is not None
+        else schemas.VEHICLE_ADAPTER
+    )
+    with measure("ser"):
+        content = adapter.dump_json(adapter.validate_python({"data": vehicle}))
+    return PydanticJSONResponse(content, headers=headers)
 
 
-@router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete(
+@router.delete(
+    "/{id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    dependencies=[Depends(remember_write)],
+)
+async def delete(
     *,
-    connection: Annotated[Connection, Depends(get_connection)],
+    connection: Annotated[AnyConnection, Depends(connection_provider)],
     id: uuid.UUID,
+    if_match: Annotated[str | None, Header(description=IF_MATCH)] = None,
 ) -> None:
-    """
+    r"""
     Delete an vehicle by ID.
 
     Args:
     ----
-    id: The ID of the vehicle to delete.
+    id: The ID of the vehicle to delete.\
+    if_match: Only delete if the vehicle still has one of the given ETags.
     """
-    if not get_vehicles(connection, dict(id=id)):
-        raise HTTPException(status_code=404, detail="Vehicle not found.")
-    delete_vehicle(connection, id)
+    versions = if_match_versions(id, if_match)
+    if not await run_service(connection, delete_vehicle, id, versions=versions):
+        raise await not_found_or_modified(connection, id, if_match)
+
+
+def vehicle_page(
+    vehicles: Sequence[RowMapping],
+    next_cursor: str | None = None,
+    fields: frozenset[str] | None = None,
+    **kwargs: Any,
+) -> PydanticJSONResponse:
+    """Validate the rows of a page in one pass and encode them straight to JSON."""
+    adapter = (
+        schemas.projected_page_adapter(fields)
+        if fields is not None
+        else schemas.VEHICLE_PAGE_ADAPTER
+    )
+    with measure("ser"):
+        page = adapter.validate_python({"data": vehicles, "next_cursor": next_cursor})
+        content = adapter.dump_json(page)
+    return PydanticJSONResponse(content, **kwargs)
+
+
+def vehicle_etag(id: uuid.UUID, version: int) -> str:
+    return make_etag(id.hex, version)
+
+
+def page_etag(page: Sequence[RowMapping], next_cursor: str | None) -> str:
+    """Weak ETag of a page, changes with any vehicle on it being updated."""
+    parts = (row["id"].bytes + row["version"].to_bytes(8) for row in page)
+    return make_weak_etag(itertools.chain(parts, [str(next_cursor).encode()]))
+
+
+def if_match_versions(id: uuid.UUID, if_match: str | None) -> list[int] | None:
+    """The vehicle versions an `If-Match` header allows, None for any version."""
+    if if_match is None or (etags := parse_etags(if_match)) is None:
+        return None
+    prefix = f"{id.hex}{ETAG_SEPARATOR}"
+    return [
+        int(version)
+        for etag in etags
+        if etag.startswith(prefix) and (version := etag.removeprefix(prefix)).isdigit()
+    ]
+
+
+async def not_found_or_modified(
+    connection: AnyConnection, id: uuid.UUID, if_match: str | None
+) -> HTTPException:
+    """Tell a missing vehicle from a failed precondition after a write matched no row."""
+    if if_match is not None and await run_service(
+        connection, get_vehicles, dict(id=id)
+    ):
+        return HTTPException(status.HTTP_412_PRECONDITION_FAILED, detail=MODIFIED)
+    return HTTPException(status.HTTP_404_NOT_FOUND, detail=NOT_FOUND)
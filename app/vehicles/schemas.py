@@ -1,15 +1,15 @@
 """Pydantic models."""
 
 import dataclasses
-import datetime
+import enum
 import functools
 import typing
 import uuid
 
-import uuid_utils
-from pydantic import ConfigDict, Field, Json
+import uuid_utils.compat
+from pydantic import ConfigDict, Field, Json, TypeAdapter, create_model
 
-from app.schemas import CustomModel
+from app.schemas import CustomModel, Datetime
 from app.utils.utils import utc_now
 
 T = typing.TypeVar("T")
@@ -18,6 +18,7 @@ T = typing.TypeVar("T")
 @dataclasses.dataclass
 class DataMany(typing.Generic[T]):
     data: list[T]
+    next_cursor: str | None = None
 
 
 @dataclasses.dataclass
@@ -48,12 +49,13 @@ class FilterVehicle(CustomModel):
     name: str | None = None
     manufacturing_year: int | None = None
     is_drivable: bool | None = None
+    body: dict[str, typing.Any] | None = None
 
 
 class CreateVehicle(CustomModel):
     """Vehicle create model."""
 
-    id: uuid.UUID = Field(default_factory=uuid_utils.uuid7)
+    id: uuid.UUID = Field(default_factory=uuid_utils.compat.uuid7)
     name: str = field_name()
     manufacturing_year: int = field_year(default=utc_now().year)
     is_drivable: bool = field_drivable(default=False)
@@ -75,5 +77,72 @@ class VehicleFromDatabase(CreateVehicle):
     model_config = ConfigDict(from_attributes=True, extra="allow")
     id: uuid.UUID
     body: Json | dict
-    created_at: datetime.datetime | None = None
-    updated_at: datetime.datetime | None = None
+    created_at: Datetime | None = None
+    updated_at: Datetime | None = None
+    version: int = Field(default=1, description="Incremented on every update.")
+
+
+class VehicleStats(CustomModel):
+    """Number of vehicles sharing a manufacturing year, drivability and body attribute."""
+
+    manufacturing_year: int
+    is_drivable: bool | None
+    body_value: str | None = Field(
+        default=None, description="Value of the body attribute counted by, if any."
+    )
+    count: int
+
+
+class TotalCount(enum.StrEnum):
+    """How the total of a listing is counted for `X-Total-Count`."""
+
+    EXACT = "exact"
+    ESTIMATED = "estimated"
+    NONE = "none"
+
+
+VEHICLES_ADAPTER = TypeAdapter(list[VehicleFromDatabase])
+VEHICLE_PAGE_ADAPTER = TypeAdapter(DataMany[VehicleFromDatabase])
+VEHICLE_ADAPTER = TypeAdapter(DataOne[VehicleFromDatabase])
+VEHICLE_FIELDS = tuple(VehicleFromDatabase.model_fields)
+REQUIRED_FIELDS = frozenset({"id", "version"})
+
+
+@functools.cache
+def projected_vehicle(fields: frozenset[str]) -> type[CustomModel]:
+    """Vehicle model with only the given fields, built once per set of fields."""
+    return create_model(
+        "ProjectedVehicle",
+        __base__=CustomModel,
+        **{
+            name: (field.annotation, field)
+            for name, field in VehicleFromDatabase.model_fields.items()
+            if name in fields
+        },
+    )
+
+
+@functools.cache
+def projected_page_adapter(fields: frozenset[str]) -> TypeAdapter:
+    return TypeAdapter(DataMany[projected_vehicle(fields)])  # type: ignore[misc]
+
+
+@functools.cache
+def projected_adapter(fields: frozenset[str]) -> TypeAdapter:
+    return TypeAdapter(DataOne[projected_vehicle(fields)])  # type: ignore[misc]
+
+
+class ImportRowError(CustomModel):
+    """A row rejected by an import."""
+
+    line: int = Field(description="The line the rejected row starts on.")
+    detail: str
+
+
+class ImportReport(CustomModel):
+    """Vehicle import result model."""
+
+    imported: int = Field(default=0, description="Vehicles added to the database.")
+    skipped: int = Field(default=0, description="Valid rows with an existing ID.")
+    rejected: int = Field(default=0, description="Rows failing validation.")
+    errors: list[ImportRowError] = Field(default_factory=list)
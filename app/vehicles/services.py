@@ -1,32 +1,593 @@
+import csv
+import io
+import json
+import math
+import sys
+import threading
 import uuid
-from typing import Any, Sequence
+from collections import Counter
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Collection,
+    Hashable,
+    Iterator,
+    NamedTuple,
+    Sequence,
+)
 
-from sqlalchemy import Connection, RowMapping, delete, insert, select, update
+from sqlalchemy import (
+    BigInteger,
+    Connection,
+    Delete,
+    Executable,
+    Pool,
+    RowMapping,
+    Select,
+    String,
+    Update,
+    bindparam,
+    cast,
+    delete,
+    event,
+    func,
+    insert,
+    select,
+    text,
+    true,
+    type_coerce,
+    update,
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncConnection
 
-from app.database import execute, fetch_all, fetch_one
-from app.vehicles.database import vehicles
+from app.cache import Cache, LRUCache, create_cache
+from app.config import get_settings
+from app.database import (
+    copy_from_csv,
+    estimate_rows,
+    execute,
+    fetch_all,
+    fetch_one,
+    is_replica,
+)
+from app.vehicles.database import vehicle_stats, vehicles, vehicles_import
 from app.vehicles.schemas import CreateVehicle, UpdateVehicle
 
+PENDING_INVALIDATIONS = "vehicle_cache_invalidations"
+BODY = "body"
+LIKE_ESCAPE = "\\"
+VEHICLE_ID = "vehicle_id"
+VERSIONS = "versions"
+AFTER = "after"
+LIMIT = "limit"
+QUERY = "query"
+PREFIX = "prefix"
+UPPER_BOUND = "upper_bound"
+SURROGATES = range(0xD800, 0xE000)
+DELETE = "delete"
+UPDATE = "update"
+SEARCH = "search"
+STATS = "stats"
+BODY_ATTRIBUTE = "body_attribute"
+BODY_VALUE = "body_value"
+COUNT = "count"
+
+settings = get_settings()
+vehicle_cache: Cache[uuid.UUID, RowMapping] = create_cache(
+    settings.CACHE_BACKEND, settings.CACHE_MAX_SIZE, settings.CACHE_TTL_SECONDS
+)
+statement_cache: Cache[Hashable, Executable] = LRUCache(
+    maxsize=settings.STATEMENT_CACHE_SIZE, ttl=math.inf
+)
+
+INSERT_VEHICLE = insert(vehicles).returning(vehicles)
+INSERT_VEHICLES = insert(vehicles).returning(vehicles, sort_by_parameter_order=True)
+SELECT_VEHICLE = select(vehicles).where(vehicles.c.id == bindparam(VEHICLE_ID))
+
+_writes_lock = threading.Lock()
+_vehicle_writes: Counter[uuid.UUID] = Counter()
+_write_generation = 0
+
+
+def invalidate_vehicle(conn: Connection, id: uuid.UUID) -> None:
+    """Drop a vehicle from the cache and keep it out until the transaction ends.
+
+    The transaction only ends once its connection is back in the pool, after
+    the commit or rollback finished, see `_cache_vehicle`.
+    """
+    pending = conn.info.setdefault(PENDING_INVALIDATIONS, set())
+    if id not in pending:
+        pending.add(id)
+        with _writes_lock:
+            _vehicle_writes[id] += 1
+    vehicle_cache.delete(id)
+
+
+@event.listens_for(Pool, "checkin")
+def _invalidate_pending(dbapi_connection: Any, connection_record: Any) -> None:
+    global _write_generation
+    if connection_record is None:
+        return
+    if not (pending := connection_record.info.pop(PENDING_INVALIDATIONS, None)):
+        return
+    with _writes_lock:
+        _write_generation += 1
+        for id in pending:
+            _vehicle_writes[id] -= 1
+            if not _vehicle_writes[id]:
+                del _vehicle_writes[id]
+
+
+def _cache_vehicle(id: uuid.UUID, vehicle: RowMapping, generation: int) -> None:
+    """Cache a vehicle read while the write generation was `generation`.
+
+    A vehicle written by an open transaction is not cached, nor one read while
+    a writing transaction ended: the read may predate its commit.
+    """
+    with _writes_lock:
+        if generation == _write_generation and id not in _vehicle_writes:
+            vehicle_cache.set(id, vehicle)
+
+
+def cached_statement[T: Executable](key: Hashable, build: Callable[[], T]) -> T:
+    """Get the statement built for a key, building it on first use.
+
+    The statements take every value as a bound parameter, so one statement
+    serves all calls with the same shape and its compiled form is reused.
+    """
+    if (statement := statement_cache.get(key)) is None:
+        statement_cache.set(key, statement := build())
+    return statement  # type: ignore[return-value]
+
 
 def insert_vehicle(conn: Connection, to_create: CreateVehicle) -> RowMapping | None:
-    insert_query = insert(vehicles).values(**to_create.model_dump()).returning(vehicles)
-    return fetch_one(conn, insert_query)
+    invalidate_vehicle(conn, to_create.id)
+    return fetch_one(conn, INSERT_VEHICLE, to_create.model_dump())
+
+
+def insert_vehicles(
+    conn: Connection, to_create: Sequence[CreateVehicle], batch_size: int
+) -> Sequence[RowMapping]:
+    return fetch_all(
+        conn,
+        INSERT_VEHICLES,
+        [item.model_dump() for item in to_create],
+        {"insertmanyvalues_page_size": batch_size},
+    )
+
+
+def delete_vehicle(
+    conn: Connection, id: uuid.UUID, versions: Collection[int] | None = None
+) -> bool:
+    delete_query = cached_statement(
+        (DELETE, versions is not None),
+        lambda: _where_vehicle(delete(vehicles), versions is not None),
+    )
+    invalidate_vehicle(conn, id)
+    return execute(conn, delete_query, _vehicle_parameters(id, versions)).rowcount > 0
+
+
+def _where_vehicle[T: (Update, Delete)](statement: T, versioned: bool) -> T:
+    statement = statement.where(vehicles.c.id == bindparam(VEHICLE_ID))
+    if versioned:
+        statement = statement.where(
+            vehicles.c.version.in_(bindparam(VERSIONS, expanding=True))
+        )
+    return statement
+
+
+def _vehicle_parameters(
+    id: uuid.UUID, versions: Collection[int] | None
+) -> dict[str, Any]:
+    if versions is None:
+        return {VEHICLE_ID: id}
+    return {VEHICLE_ID: id, VERSIONS: list(versions)}
+
+
+class _SelectShape(NamedTuple):
+    dialect_name: str
+    columns: tuple[str, ...]
+    body_paths: tuple[tuple[str, ...], ...]
+    after: bool
+    limit: bool
+    projection: tuple[str, ...] | None
+
+
+def select_vehicles(
+    dialect_name: str,
+    filter_on: dict[str, Any],
+    *,
+    after: uuid.UUID | None = None,
+    limit: int | None = None,
+    columns: Collection[str] | None = None,
+) -> tuple[Select, dict[str, Any]]:
+    """Select the vehicles matching the filters, paged by id if a limit is given.
+
+    Returns the statement for the given filter fields and the parameters to
+    execute it with. The body filter is a jsonb containment on postgres, which
+    the gin index on body serves, and `json_extract` comparisons elsewhere.
+    Only the given columns are selected if any, all of them otherwise.
+    """
+    parameters = {k: v for k, v in filter_on.items() if k != BODY}
+    body_paths: tuple[tuple[str, ...], ...] = ()
+    if (body := filter_on.get(BODY)) and dialect_name == "postgresql":
+        body_paths, parameters[BODY] = ((),), body
+    elif body:
+        body_paths, values = zip(*_flatten(body))
+        parameters |= {_body_parameter(i): value for i, value in enumerate(values)}
+    if after is not None:
+        parameters[AFTER] = after
+    if limit is not None:
+        parameters[LIMIT] = limit
+    shape = _SelectShape(
+        dialect_name,
+        tuple(sorted(k for k in filter_on if k != BODY)),
+        body_paths,
+        after is not None,
+        limit is not None,
+        _projection(columns),
+    )
+    return cached_statement(shape, lambda: _build_select(shape)), parameters
+
+
+def _projection(columns: Collection[str] | None) -> tuple[str, ...] | None:
+    if columns is None:
+        return None
+    return tuple(column.name for column in vehicles.c if column.name in columns)
+
+
+def _select_columns(projection: tuple[str, ...] | None) -> Select:
+    if projection is None:
+        return select(vehicles)
+    return select(*(vehicles.c[column] for column in projection))
+
+
+def _build_select(shape: _SelectShape) -> Select:
+    select_query = _select_columns(shape.projection).where(
+        *(vehicles.c[column] == bindparam(column) for column in shape.columns)
+    )
+    if shape.dialect_name == "postgresql" and shape.body_paths:
+        select_query = select_query.where(
+            type_coerce(vehicles.c.body, JSONB).contains(bindparam(BODY, type_=JSONB))
+        )
+    else:
+        select_query = select_query.where(
+            *(
+                func.json_extract(vehicles.c.body, _json_path(path))
+                == bindparam(_body_parameter(i))
+                for i, path in enumerate(shape.body_paths)
+            )
+        )
+    if shape.after:
+        select_query = select_query.where(vehicles.c.id > bindparam(AFTER))
+    if shape.limit:
+        select_query = select_query.order_by(vehicles.c.id).limit(bindparam(LIMIT))
+    return select_query
+
+
+def _body_parameter(index: int) -> str:
+    return f"{BODY}_{index}"
+
+
+def _flatten(
+    body: dict[str, Any], prefix: tuple[str, ...] = ()
+) -> Iterator[tuple[tuple[str, ...], Any]]:
+    for key, value in body.items():
+        if isinstance(value, dict):
+            yield from _flatten(value, (*prefix, key))
+        else:
+            yield (*prefix, key), value
+
+
+def _json_path(path: tuple[str, ...]) -> str:
+    return "$" + "".join(f".{json.dumps(key)}" for key in path)
+
+
+def search_vehicles(conn: Connection, query: str, limit: int) -> Sequence[RowMapping]:
+    return fetch_all(conn, *select_vehicles_by_name(conn.dialect.name, query, limit))
+
+
+def select_vehicles_by_name(
+    dialect_name: str, query: str, limit: int
+) -> tuple[Select, dict[str, Any]]:
+    """Select the vehicles whose name matches the query, best matches first.
+
+    On postgres names starting with the query and names similar to it are found
+    through the trigram index on name, prefix matches rank first and the rest by
+    similarity. Other dialects only match the prefix through the b-tree index.
+    """
+    parameters = {QUERY: query, LIMIT: limit}
+    if dialect_name == "postgresql":
+        parameters[PREFIX] = _like_prefix(query)
+    elif (upper_bound := _prefix_upper_bound(query)) is not None:
+        parameters[UPPER_BOUND] = upper_bound
+    bounded = UPPER_BOUND in parameters
+    statement = cached_statement(
+        (SEARCH, dialect_name, bounded), lambda: _build_search(dialect_name, bounded)
+    )
+    return statement, parameters
 
 
-def delete_vehicle(conn: Connection, id: uuid.UUID) -> None:
-    delete_query = delete(vehicles).filter_by(id=id)
-    execute(conn, delete_query)
+def _build_search(dialect_name: str, bounded: bool) -> Select:
+    name = vehicles.c.name
+    query = bindparam(QUERY, type_=String)
+    if dialect_name == "postgresql":
+        prefix = name.ilike(bindparam(PREFIX), escape=LIKE_ESCAPE)
+        search_query = (
+            select(vehicles)
+            .where(prefix | name.op("%")(query))
+            .order_by(
+                prefix.desc(), func.similarity(name, query).desc(), name, vehicles.c.id
+            )
+        )
+    else:
+        search_query = (
+            select(vehicles)
+            .where(name >= query)
+            .order_by(func.length(name), name, vehicles.c.id)
+        )
+        if bounded:
+            search_query = search_query.where(name < bindparam(UPPER_BOUND))
+    return search_query.limit(bindparam(LIMIT))
 
 
-def get_vehicles(conn: Connection, filter_on: dict[str, Any]) -> Sequence[RowMapping]:
-    select_query = select(vehicles).filter_by(**filter_on)
-    return fetch_all(conn, select_query)
+def _like_prefix(query: str) -> str:
+    for special in (LIKE_ESCAPE, "%", "_"):
+        query = query.replace(special, LIKE_ESCAPE + special)
+    return query + "%"
 
 
-def update_vehicle(conn: Connection, id: uuid.UUID, update_with: UpdateVehicle) -> None:
-    update_query = (
-        update(vehicles)
-        .filter_by(id=id)
-        .values(**update_with.model_dump(exclude_none=True))
+def _prefix_upper_bound(query: str) -> str | None:
+    """The least string after every string starting with the query, None if there is none.
+
+    The last character below the greatest code point is incremented and the
+    characters after it are dropped. The surrogates are skipped, they can't be
+    encoded and no encoded string sorts between them.
+    """
+    for index in reversed(range(len(query))):
+        if (code_point := ord(query[index]) + 1) > sys.maxunicode:
+            continue
+        if SURROGATES.start <= code_point < SURROGATES.stop:
+            code_point = SURROGATES.stop
+        return query[:index] + chr(code_point)
+    return None
+
+
+def count_vehicles(conn: Connection, filter_on: dict[str, Any]) -> int:
+    select_query, parameters = select_vehicles(conn.dialect.name, filter_on)
+    count_query = cached_statement(
+        (COUNT, select_query), lambda: _build_count(select_query)
+    )
+    return conn.execute(count_query, parameters).scalar_one()
+
+
+def _build_count(select_query: Select) -> Select:
+    return select(func.count()).select_from(select_query.subquery())
+
+
+def estimate_vehicles(conn: Connection, filter_on: dict[str, Any]) -> int:
+    """Estimate the number of vehicles matching the filters without counting them.
+
+    On postgres this is the row estimate of the planner, taken from the table
+    statistics kept by `ANALYZE` and scaled to the current size of the table,
+    so it costs the same on any number of vehicles. Other dialects count.
+    """
+    if conn.dialect.name != "postgresql":
+        return count_vehicles(conn, filter_on)
+    return estimate_rows(conn, *select_vehicles(conn.dialect.name, filter_on))
+
+
+def get_vehicle_stats(
+    conn: Connection, body_attribute: str | None = None
+) -> Sequence[RowMapping]:
+    return fetch_all(conn, *select_vehicle_stats(conn.dialect.name, body_attribute))
+
+
+def select_vehicle_stats(
+    dialect_name: str, body_attribute: str | None
+) -> tuple[Select, dict[str, Any]]:
+    """Count the vehicles by manufacturing year, drivability and a body attribute if given.
+
+    On postgres the counts by year and drivability are read from `vehicle_stats`,
+    which triggers on the vehicles keep up to date. Counting by a body attribute,
+    or on other dialects, groups the vehicles instead.
+    """
+    parameters = {}
+    if body_attribute is not None and dialect_name == "postgresql":
+        parameters[BODY_ATTRIBUTE] = body_attribute
+    elif body_attribute is not None:
+        parameters[BODY_ATTRIBUTE] = _json_path((body_attribute,))
+    by_body = body_attribute is not None
+    statement = cached_statement(
+        (STATS, dialect_name, by_body), lambda: _build_stats(dialect_name, by_body)
+    )
+    return statement, parameters
+
+
+def _build_stats(dialect_name: str, by_body: bool) -> Select:
+    if dialect_name == "postgresql" and not by_body:
+        groups = (vehicle_stats.c.manufacturing_year, vehicle_stats.c.is_drivable)
+        count = cast(func.sum(vehicle_stats.c.count), BigInteger)
+        return (
+            select(*groups, count.label(COUNT))
+            .group_by(*groups)
+            .having(count > 0)
+            .order_by(*groups)
+        )
+    columns = [vehicles.c.manufacturing_year, vehicles.c.is_drivable]
+    if by_body and dialect_name == "postgresql":
+        columns.append(
+            func.jsonb_extract_path_text(
+                vehicles.c.body, bindparam(BODY_ATTRIBUTE, type_=String)
+            ).label(BODY_VALUE)
+        )
+    elif by_body:
+        columns.append(
+            cast(
+                func.json_extract(vehicles.c.body, bindparam(BODY_ATTRIBUTE)), String
+            ).label(BODY_VALUE)
+        )
+    grouped = select(*columns).subquery()
+    return (
+        select(*grouped.c, func.count().label(COUNT))
+        .group_by(*grouped.c)
+        .order_by(*grouped.c)
+    )
+
+
+def rebuild_vehicle_stats(conn: Connection) -> None:
+    """Count `vehicle_stats` on postgres again from the vehicles.
+
+    For when the triggers keeping it up to date were bypassed, e.g. by loading
+    vehicles with `session_replication_role = replica`. Writes to the vehicles
+    wait until the transaction ends, so none is counted twice or missed.
+    """
+    execute(conn, text("LOCK TABLE vehicles IN SHARE MODE"))
+    execute(conn, delete(vehicle_stats))
+    groups = (vehicles.c.manufacturing_year, vehicles.c.is_drivable)
+    execute(
+        conn,
+        insert(vehicle_stats).from_select(
+            [*(column.name for column in groups), COUNT],
+            select(*groups, func.count()).group_by(*groups),
+        ),
+    )
+
+
+def get_vehicle(
+    conn: Connection,
+    id: uuid.UUID,
+    columns: Collection[str] | None = None,
+    *,
+    fresh: bool = False,
+) -> RowMapping | None:
+    """Get a vehicle by id, read through the vehicle cache.
+
+    Only vehicles read from the primary are cached, a replica may still hold
+    a version the primary already replaced. `fresh` skips the cache, for the
+    clients that must read their own writes.
+    With columns, a vehicle missing from the cache is read with only those
+    columns and not cached, the cache holds whole vehicles only.
+    """
+    if not fresh and (vehicle := vehicle_cache.get(id)) is not None:
+        return vehicle
+    if columns is not None:
+        projection = _projection(columns)
+        select_query = cached_statement(
+            (VEHICLE_ID, projection),
+            lambda: _select_columns(projection).where(
+                vehicles.c.id == bindparam(VEHICLE_ID)
+            ),
+        )
+        return fetch_one(conn, select_query, {VEHICLE_ID: id})
+    generation = _write_generation
+    vehicle = fetch_one(conn, SELECT_VEHICLE, {VEHICLE_ID: id})
+    if vehicle is not None and not is_replica(conn):
+        _cache_vehicle(id, vehicle, generation)
+    return vehicle
+
+
+def get_vehicles(
+    conn: Connection,
+    filter_on: dict[str, Any],
+    *,
+    after: uuid.UUID | None = None,
+    limit: int | None = None,
+    columns: Collection[str] | None = None,
+) -> Sequence[RowMapping]:
+    select_query, parameters = select_vehicles(
+        conn.dialect.name, filter_on, after=after, limit=limit, columns=columns
+    )
+    return fetch_all(conn, select_query, parameters)
+
+
+def stream_vehicles(
+    conn: Connection, filter_on: dict[str, Any], partition_size: int
+) -> Iterator[Sequence[RowMapping]]:
+    select_query, parameters = select_vehicles(conn.dialect.name, filter_on)
+    result = conn.execute(
+        select_query, parameters, execution_options={"yield_per": partition_size}
+    )
+    yield from result.mappings().partitions()
+
+
+async def stream_vehicles_async(
+    conn: AsyncConnection, filter_on: dict[str, Any], partition_size: int
+) -> AsyncIterator[Sequence[RowMapping]]:
+    select_query, parameters = select_vehicles(conn.dialect.name, filter_on)
+    result = await conn.stream(
+        select_query, parameters, execution_options={"yield_per": partition_size}
+    )
+    async for partition in result.mappings().partitions():
+        yield partition
+
+
+def update_vehicle(
+    conn: Connection,
+    id: uuid.UUID,
+    update_with: UpdateVehicle,
+    versions: Collection[int] | None = None,
+) -> RowMapping | None:
+    values = update_with.model_dump(exclude_none=True)
+    columns = tuple(sorted(values))
+    update_query = cached_statement(
+        (UPDATE, columns, versions is not None),
+        lambda: _build_update(columns, versions is not None),
+    )
+    invalidate_vehicle(conn, id)
+    return fetch_one(conn, update_query, values | _vehicle_parameters(id, versions))
+
+
+def _build_update(columns: tuple[str, ...], versioned: bool) -> Update:
+    return (
+        _where_vehicle(update(vehicles), versioned)
+        .values(
+            {column: bindparam(column) for column in columns}
+            | {vehicles.c.version: vehicles.c.version + 1}
+        )
+        .returning(vehicles.c.id, vehicles.c.version)
+    )
+
+
+def create_import_staging(conn: Connection) -> None:
+    vehicles_import.create(conn)
+
+
+def stage_vehicles(conn: Connection, to_create: Sequence[CreateVehicle]) -> None:
+    """Load the vehicles into the staging table, through `COPY` on postgres.
+
+    Every csv field is quoted, `COPY` reads an unquoted empty field as NULL
+    and an empty name would be rejected by the NOT NULL constraint.
+    """
+    rows = [item.model_dump() for item in to_create]
+    if conn.dialect.name != "postgresql":
+        execute(conn, insert(vehicles_import), rows)
+        return
+    columns = list(CreateVehicle.model_fields)
+    buffer = io.StringIO()
+    csv.writer(buffer, quoting=csv.QUOTE_ALL).writerows(
+        [json.dumps(row[c]) if c == "body" else row[c] for c in columns] for row in rows
+    )
+    copy_from_csv(conn, vehicles_import, columns, buffer.getvalue().encode())
+
+
+def merge_staged_vehicles(conn: Connection) -> int:
+    """Move the staged vehicles into the vehicles table, skipping existing ids.
+
+    The always true where clause keeps sqlite from parsing `ON CONFLICT` as a join.
+    """
+    dialect_insert = (
+        postgresql.insert if conn.dialect.name == "postgresql" else sqlite.insert
+    )
+    columns = [column.name for column in vehicles_import.columns]
+    merge_query = (
+        dialect_insert(vehicles)
+        .from_select(columns, select(vehicles_import).where(true()))
+        .on_conflict_do_nothing(index_elements=[vehicles.c.id])
     )
-    execute(conn, update_query)
+    merged = execute(conn, merge_query).rowcount
+    vehicles_import.drop(conn)
+    return merged
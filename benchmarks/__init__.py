@@ -0,0 +1 @@
+"""Load tests of the vehicles API, run with `python -m benchmarks`."""
@@ -0,0 +1,192 @@
+"""
+Benchmark the vehicles API.
+
+Runs in process against the app and the database of `DATABASE_URL` by default,
+`--sqlite` swaps the database for a temporary SQLite file and `--url` targets a
+running server instead, e.g. `--url http://localhost:8000/api/v1`.
+
+    python -m benchmarks run --output report.json
+    python -m benchmarks run --sqlite --baseline baseline.json
+    python -m benchmarks compare baseline.json report.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import dataclasses
+import random
+import sys
+import tempfile
+from collections.abc import AsyncIterator, Generator, Iterator, Sequence
+from pathlib import Path
+
+import httpx
+from sqlalchemy import Connection, create_engine
+
+from benchmarks.load import run_route
+from benchmarks.report import (
+    Regression,
+    RouteReport,
+    compare,
+    read_report,
+    write_report,
+)
+from benchmarks.scenarios import SCENARIOS, Fixture
+from benchmarks.seed import seed
+
+IN_PROCESS_URL = "http://benchmark"
+TIMEOUT = 60.0
+ROW = "{:<24} {:>8} {:>7} {:>10} {:>10} {:>10} {:>10}"
+
+
+def parse_args(argv: Sequence[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Seed the database and benchmark the routes.")
+    target = run.add_mutually_exclusive_group()
+    target.add_argument("--url", help="Base URL of a running server, with API prefix.")
+    target.add_argument(
+        "--sqlite", action="store_true", help="Run in process on a SQLite file."
+    )
+    run.add_argument("--routes", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    run.add_argument("--seed", type=int, default=10_000, help="Vehicles to seed.")
+    run.add_argument("--requests", type=int, default=500, help="Requests per route.")
+    run.add_argument("--concurrency", type=int, default=16)
+    run.add_argument("--warmup", type=int, default=20, help="Requests per route.")
+    run.add_argument("--random-seed", type=int, default=0)
+    run.add_argument("--output", type=Path, default=Path("benchmark.json"))
+    run.add_argument("--baseline", type=Path, help="Report to compare against.")
+    run.add_argument("--tolerance", type=float, default=0.2)
+
+    compare = commands.add_parser("compare", help="Compare a report with a baseline.")
+    compare.add_argument("baseline", type=Path)
+    compare.add_argument("current", type=Path)
+    compare.add_argument("--tolerance", type=float, default=0.2)
+    return parser.parse_args(argv)
+
+
+async def benchmark(
+    client: httpx.AsyncClient,
+    routes: Sequence[str],
+    *,
+    seed_count: int,
+    requests: int,
+    concurrency: int,
+    warmup: int,
+    random_seed: int,
+) -> list[RouteReport]:
+    """Seed the vehicles, then load one route after the other."""
+    rng = random.Random(random_seed)
+    fixture = Fixture(await seed(client, seed_count, rng), rng)
+    return [
+        await run_route(
+            client,
+            route,
+            SCENARIOS[route],
+            fixture,
+            requests=requests,
+            concurrency=concurrency,
+            warmup=warmup,
+        )
+        for route in routes
+    ]
+
+
+@contextlib.asynccontextmanager
+async def open_client(
+    url: str | None, sqlite: bool
+) -> AsyncIterator[httpx.AsyncClient]:
+    if url is not None:
+        async with httpx.AsyncClient(base_url=url, timeout=TIMEOUT) as client:
+            yield client
+        return
+    from app.main import app
+
+    with sqlite_database(app) if sqlite else contextlib.nullcontext():
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app),
+            base_url=IN_PROCESS_URL,
+            timeout=TIMEOUT,
+        ) as client:
+            yield client
+
+
+@contextlib.contextmanager
+def sqlite_database(app) -> Iterator[None]:
+    """Serve the app from a temporary SQLite file instead of `DATABASE_URL`."""
+    from app import database
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(
+            f"sqlite:///{directory}/benchmark.db",
+            connect_args={"check_same_thread": False, "timeout": TIMEOUT},
+        )
+        database.metadata.create_all(engine)
+
+        def get_connection() -> Generator[Connection, None]:
+            with engine.begin() as conn:
+                yield conn
+
+        providers = (database.connection_provider, database.read_connection_provider)
+        overrides = dict(app.dependency_overrides)
+        app.dependency_overrides |= {provider: get_connection for provider in providers}
+        app.dependency_overrides[database.engine_provider] = lambda: engine
+        try:
+            yield
+        finally:
+            app.dependency_overrides.clear()
+            app.dependency_overrides.update(overrides)
+            engine.dispose()
+
+
+def print_reports(reports: Sequence[RouteReport]) -> None:
+    print(
+        ROW.format("route", "requests", "errors", "rps", "p50 ms", "p95 ms", "p99 ms")
+    )
+    for report in reports:
+        print(ROW.format(*dataclasses.astuple(report)))
+
+
+def print_regressions(regressions: Sequence[Regression]) -> None:
+    for regression in regressions:
+        print(
+            f"REGRESSION {regression.route} {regression.metric}: "
+            f"{regression.baseline} -> {regression.current} ({regression.change:+.0%})"
+        )
+
+
+async def main(argv: Sequence[str]) -> int:
+    args = parse_args(argv)
+    if args.command == "compare":
+        regressions = compare(
+            read_report(args.baseline), read_report(args.current), args.tolerance
+        )
+        print_regressions(regressions)
+        return 1 if regressions else 0
+
+    async with open_client(args.url, args.sqlite) as client:
+        reports = await benchmark(
+            client,
+            args.routes,
+            seed_count=args.seed,
+            requests=args.requests,
+            concurrency=args.concurrency,
+            warmup=args.warmup,
+            random_seed=args.random_seed,
+        )
+    settings = {
+        key: str(value) if isinstance(value, Path) else value
+        for key, value in vars(args).items()
+    }
+    write_report(args.output, reports, settings)
+    print_reports(reports)
+    if args.baseline is None:
+        return 0
+    regressions = compare(read_report(args.baseline), reports, args.tolerance)
+    print_regressions(regressions)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(sys.argv[1:])))
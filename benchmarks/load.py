@@ -0,0 +1,46 @@
+"""Closed loop load generator sending the scenarios of a route from concurrent workers."""
+
+import asyncio
+import time
+
+import httpx
+
+from benchmarks.report import RouteReport, summarize
+from benchmarks.scenarios import Fixture, Scenario
+
+
+async def run_route(
+    client: httpx.AsyncClient,
+    route: str,
+    scenario: Scenario,
+    fixture: Fixture,
+    *,
+    requests: int,
+    concurrency: int,
+    warmup: int,
+) -> RouteReport:
+    """
+    Send `requests` requests of the scenario from `concurrency` workers.
+
+    Each worker sends its next request as soon as the previous one was answered.
+    Only the measured request is timed, the requests per second are taken over
+    the wall time of the run and so include the unmeasured setup of a scenario.
+    """
+    for _ in range(warmup):
+        await client.send(await scenario(client, fixture))
+    pending = iter(range(requests))
+    latencies: list[float] = []
+    errors = 0
+
+    async def worker() -> None:
+        nonlocal errors
+        for _ in pending:
+            request = await scenario(client, fixture)
+            start_time = time.perf_counter()
+            response = await client.send(request)
+            latencies.append(time.perf_counter() - start_time)
+            errors += response.is_error
+
+    start_time = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(route, latencies, errors, time.perf_counter() - start_time)
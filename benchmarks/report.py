@@ -0,0 +1,97 @@
+"""Latency statistics of a benchmark run and their comparison with a baseline."""
+
+import dataclasses
+import json
+import math
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any
+
+SECONDS_TO_MILLISECONDS = 1000
+
+
+@dataclasses.dataclass(frozen=True)
+class RouteReport:
+    """Throughput and latency percentiles of the requests sent to a route."""
+
+    route: str
+    requests: int
+    errors: int
+    rps: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+
+
+@dataclasses.dataclass(frozen=True)
+class Regression:
+    """A metric of a route that got worse than the tolerance allows."""
+
+    route: str
+    metric: str
+    baseline: float
+    current: float
+
+    @property
+    def change(self) -> float:
+        return self.current / self.baseline - 1 if self.baseline else math.inf
+
+
+def percentile(latencies: Sequence[float], q: float) -> float:
+    """The nearest rank percentile `q` in [0, 100] of the latencies."""
+    ordered = sorted(latencies)
+    return ordered[max(math.ceil(q / 100 * len(ordered)) - 1, 0)]
+
+
+def summarize(
+    route: str, latencies: Sequence[float], errors: int, elapsed: float
+) -> RouteReport:
+    """Summarize the latencies in seconds of the requests sent during `elapsed` seconds."""
+    return RouteReport(
+        route=route,
+        requests=len(latencies),
+        errors=errors,
+        rps=round(len(latencies) / elapsed, 2),
+        p50_ms=round(percentile(latencies, 50) * SECONDS_TO_MILLISECONDS, 3),
+        p95_ms=round(percentile(latencies, 95) * SECONDS_TO_MILLISECONDS, 3),
+        p99_ms=round(percentile(latencies, 99) * SECONDS_TO_MILLISECONDS, 3),
+    )
+
+
+def compare(
+    baseline: Sequence[RouteReport],
+    current: Sequence[RouteReport],
+    tolerance: float,
+) -> list[Regression]:
+    """
+    Find the routes that got slower than the baseline by more than `tolerance`.
+
+    A regression is a drop of the requests per second or a rise of the 95th or 99th
+    percentile latency, routes missing from either report are not compared.
+    """
+    previous = {report.route: report for report in baseline}
+    regressions = []
+    for report in current:
+        if (before := previous.get(report.route)) is None:
+            continue
+        if report.rps < before.rps * (1 - tolerance):
+            regressions.append(Regression(report.route, "rps", before.rps, report.rps))
+        for metric in ("p95_ms", "p99_ms"):
+            old, new = getattr(before, metric), getattr(report, metric)
+            if new > old * (1 + tolerance):
+                regressions.append(Regression(report.route, metric, old, new))
+    return regressions
+
+
+def write_report(
+    path: Path, reports: Sequence[RouteReport], settings: dict[str, Any]
+) -> None:
+    document = {
+        "settings": settings,
+        "routes": [dataclasses.asdict(report) for report in reports],
+    }
+    path.write_text(json.dumps(document, indent=2) + "\n")
+
+
+def read_report(path: Path) -> list[RouteReport]:
+    return [RouteReport(**route) for route in json.loads(path.read_text())["routes"]]
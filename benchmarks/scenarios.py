@@ -0,0 +1,138 @@
+"""
+The requests sent to every route of the vehicles API.
+
+A scenario builds the request it wants measured, setup it needs on the way,
+like creating the vehicle a delete removes, is sent before and not measured.
+"""
+
+import dataclasses
+import json
+import random
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+import httpx
+
+from benchmarks.seed import make_vehicle
+
+BATCH_SIZE = 100
+NDJSON = "application/x-ndjson"
+
+
+@dataclasses.dataclass
+class Fixture:
+    """The seeded vehicles and the random source the scenarios draw from."""
+
+    vehicles: list[dict[str, Any]]
+    rng: random.Random
+
+    def vehicle(self) -> dict[str, Any]:
+        return self.rng.choice(self.vehicles)
+
+
+Scenario = Callable[[httpx.AsyncClient, Fixture], Awaitable[httpx.Request]]
+
+
+async def list_vehicles(client: httpx.AsyncClient, fixture: Fixture) -> httpx.Request:
+    return client.build_request("GET", "/vehicles/", params={"limit": BATCH_SIZE})
+
+
+async def filter_vehicles(client: httpx.AsyncClient, fixture: Fixture) -> httpx.Request:
+    vehicle = fixture.vehicle()
+    params = {
+        "manufacturing_year": vehicle["manufacturing_year"],
+        "is_drivable": vehicle["is_drivable"],
+        "body.color": vehicle["body"]["color"],
+        "limit": BATCH_SIZE,
+    }
+    return client.build_request("GET", "/vehicles/", params=params)
+
+
+async def count_vehicles(client: httpx.AsyncClient, fixture: Fixture) -> httpx.Request:
+    params = {
+        "manufacturing_year": fixture.vehicle()["manufacturing_year"],
+        "count": "estimated",
+    }
+    return client.build_request("HEAD", "/vehicles/", params=params)
+
+
+async def list_vehicles_with_count(
+    client: httpx.AsyncClient, fixture: Fixture
+) -> httpx.Request:
+    params = {"limit": BATCH_SIZE, "count": "estimated"}
+    return client.build_request("GET", "/vehicles/", params=params)
+
+
+async def list_vehicle_names(
+    client: httpx.AsyncClient, fixture: Fixture
+) -> httpx.Request:
+    params = {"fields": "name", "limit": BATCH_SIZE}
+    return client.build_request("GET", "/vehicles/", params=params)
+
+
+async def get_vehicle(client: httpx.AsyncClient, fixture: Fixture) -> httpx.Request:
+    return client.build_request("GET", f"/vehicles/{fixture.vehicle()['id']}")
+
+
+async def search_vehicles(client: httpx.AsyncClient, fixture: Fixture) -> httpx.Request:
+    query = fixture.vehicle()["name"][: fixture.rng.randrange(3, 8)]
+    return client.build_request("GET", "/vehicles/search", params={"q": query})
+
+
+async def vehicle_stats(client: httpx.AsyncClient, fixture: Fixture) -> httpx.Request:
+    return client.build_request("GET", "/vehicles/stats")
+
+
+async def export_vehicles(client: httpx.AsyncClient, fixture: Fixture) -> httpx.Request:
+    params = {"manufacturing_year": fixture.vehicle()["manufacturing_year"]}
+    return client.build_request("GET", "/vehicles/export", params=params)
+
+
+async def insert_vehicle(client: httpx.AsyncClient, fixture: Fixture) -> httpx.Request:
+    return client.build_request("POST", "/vehicles/", json=make_vehicle(fixture.rng))
+
+
+async def insert_vehicles(client: httpx.AsyncClient, fixture: Fixture) -> httpx.Request:
+    vehicles = [make_vehicle(fixture.rng) for _ in range(BATCH_SIZE)]
+    return client.build_request("POST", "/vehicles/bulk", json=vehicles)
+
+
+async def import_vehicles(client: httpx.AsyncClient, fixture: Fixture) -> httpx.Request:
+    lines = (json.dumps(make_vehicle(fixture.rng)) for _ in range(BATCH_SIZE))
+    return client.build_request(
+        "POST",
+        "/vehicles/import",
+        content="\n".join(lines).encode(),
+        headers={"content-type": NDJSON},
+    )
+
+
+async def update_vehicle(client: httpx.AsyncClient, fixture: Fixture) -> httpx.Request:
+    vehicle = make_vehicle(fixture.rng)
+    return client.build_request(
+        "PUT", f"/vehicles/{fixture.vehicle()['id']}", json=vehicle
+    )
+
+
+async def delete_vehicle(client: httpx.AsyncClient, fixture: Fixture) -> httpx.Request:
+    response = await client.post("/vehicles/", json=make_vehicle(fixture.rng))
+    response.raise_for_status()
+    return client.build_request("DELETE", f"/vehicles/{response.json()['data']['id']}")
+
+
+SCENARIOS: dict[str, Scenario] = {
+    "GET /vehicles/": list_vehicles,
+    "GET /vehicles/?filter": filter_vehicles,
+    "GET /vehicles/?fields": list_vehicle_names,
+    "GET /vehicles/?count": list_vehicles_with_count,
+    "HEAD /vehicles/": count_vehicles,
+    "GET /vehicles/{id}": get_vehicle,
+    "GET /vehicles/search": search_vehicles,
+    "GET /vehicles/stats": vehicle_stats,
+    "GET /vehicles/export": export_vehicles,
+    "POST /vehicles/": insert_vehicle,
+    "POST /vehicles/bulk": insert_vehicles,
+    "POST /vehicles/import": import_vehicles,
+    "PUT /vehicles/{id}": update_vehicle,
+    "DELETE /vehicles/{id}": delete_vehicle,
+}
@@ -0,0 +1,40 @@
+"""Seeding of the vehicles the benchmark runs against."""
+
+import random
+from typing import Any
+
+import httpx
+
+NAMES = ("Audi Q7", "Hyundai I30", "VW Golf", "BMW X5", "Fiat Panda", "Volvo V70")
+COLORS = ("black", "red", "white", "silver", "blue")
+VEHICLE_TYPES = ("suv", "limousine", "hatchback", "estate")
+SEED_BATCH_SIZE = 1000
+
+
+def make_vehicle(rng: random.Random) -> dict[str, Any]:
+    return {
+        "name": f"{rng.choice(NAMES)} {rng.randrange(1000)}",
+        "manufacturing_year": rng.randrange(1990, 2025),
+        "is_drivable": rng.random() < 0.8,
+        "body": {
+            "color": rng.choice(COLORS),
+            "kilometer": rng.randrange(300_000),
+            "price": rng.randrange(1000, 100_000),
+            "vehicle_type": rng.choice(VEHICLE_TYPES),
+        },
+    }
+
+
+async def seed(
+    client: httpx.AsyncClient, count: int, rng: random.Random
+) -> list[dict[str, Any]]:
+    """Create `count` vehicles through the bulk endpoint and return them as created."""
+    created: list[dict[str, Any]] = []
+    while len(created) < count:
+        batch = [
+            make_vehicle(rng) for _ in range(min(SEED_BATCH_SIZE, count - len(created)))
+        ]
+        response = await client.post("/vehicles/bulk", json=batch)
+        response.raise_for_status()
+        created.extend(response.json()["data"])
+    return created
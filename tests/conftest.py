@@ -6,14 +6,20 @@ from sqlalchemy import Connection, Engine, StaticPool, create_engine
 
 from app.database import get_connection, metadata
 from app.main import app
-from app.vehicles.services import insert_vehicle
+from app.vehicles.services import insert_vehicles, vehicle_cache
 from tests.data import I30, Q7
 
 
+@pytest.fixture(autouse=True)
+def clear_vehicle_cache() -> Iterator[None]:
+    vehicle_cache.clear()
+    yield
+    vehicle_cache.clear()
+
+
 @pytest.fixture()
 def example_data(connection: Connection) -> None:
-    insert_vehicle(connection, Q7)
-    insert_vehicle(connection, I30)
+    insert_vehicles(connection, [Q7, I30], batch_size=2)
 
 
 @pytest.fixture()
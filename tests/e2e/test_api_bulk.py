@@ -0,0 +1,30 @@
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from tests.data import PARAMS, UPDATE
+
+
+@pytest.mark.filterwarnings("ignore:Pydantic")
+def test_insert_many_when_given_vehicles_should_create_all_of_them(
+    client: TestClient,
+) -> None:
+    create = client.post("/api/v1/vehicles/bulk", json=[PARAMS, UPDATE])
+
+    assert create.status_code == status.HTTP_201_CREATED
+    assert [v["name"] for v in create.json()["data"]] == [
+        PARAMS["name"],
+        UPDATE["name"],
+    ]
+
+    all_vehicle = client.get("/api/v1/vehicles")
+
+    assert len(all_vehicle.json()["data"]) == 2
+
+
+def test_insert_many_when_given_empty_list_should_return_unprocessable_entity(
+    client: TestClient,
+) -> None:
+    create = client.post("/api/v1/vehicles/bulk", json=[])
+
+    assert create.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
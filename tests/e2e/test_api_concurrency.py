@@ -0,0 +1,47 @@
+import uuid
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from tests.data import PARAMS, UPDATE
+
+
+@pytest.mark.filterwarnings("ignore:Pydantic")
+def test_update_when_given_if_match_should_only_update_current_version(
+    client: TestClient,
+) -> None:
+    create = client.post("/api/v1/vehicles", json=PARAMS)
+    url = f"/api/v1/vehicles/{create.json()['data']['id']}"
+    etag = client.get(url).headers["etag"]
+
+    assert etag == create.headers["etag"]
+
+    updated = client.put(url, json=UPDATE, headers={"If-Match": etag})
+
+    assert updated.status_code == status.HTTP_204_NO_CONTENT
+    assert updated.headers["etag"] != etag
+
+    stale = client.put(url, json=UPDATE, headers={"If-Match": etag})
+
+    assert stale.status_code == status.HTTP_412_PRECONDITION_FAILED
+
+    stale_delete = client.delete(url, headers={"If-Match": etag})
+
+    assert stale_delete.status_code == status.HTTP_412_PRECONDITION_FAILED
+
+    delete = client.delete(url, headers={"If-Match": updated.headers["etag"]})
+
+    assert delete.status_code == status.HTTP_204_NO_CONTENT
+
+
+@pytest.mark.parametrize("method", ["put", "delete"])
+def test_write_when_given_unknown_id_should_return_not_found(
+    client: TestClient, method: str
+) -> None:
+    url = f"/api/v1/vehicles/{uuid.uuid4()}"
+    kwargs = {"json": UPDATE} if method == "put" else {}
+
+    response = client.request(method, url, headers={"If-Match": "*"}, **kwargs)
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -0,0 +1,51 @@
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from tests.data import PARAMS, UPDATE
+
+
+@pytest.mark.filterwarnings("ignore:Pydantic")
+def test_get_when_given_current_validators_should_return_not_modified(
+    client: TestClient,
+) -> None:
+    create = client.post("/api/v1/vehicles", json=PARAMS)
+    url = f"/api/v1/vehicles/{create.json()['data']['id']}"
+    first = client.get(url)
+
+    by_etag = client.get(url, headers={"If-None-Match": first.headers["etag"]})
+    by_date = client.get(
+        url, headers={"If-Modified-Since": first.headers["last-modified"]}
+    )
+
+    assert by_etag.status_code == by_date.status_code == status.HTTP_304_NOT_MODIFIED
+    assert by_etag.content == b""
+    assert by_etag.headers["etag"] == first.headers["etag"]
+
+    client.put(url, json=UPDATE)
+    changed = client.get(url, headers={"If-None-Match": first.headers["etag"]})
+
+    assert changed.status_code == status.HTTP_200_OK
+    assert changed.json()["data"]["name"] == UPDATE["name"]
+
+
+@pytest.mark.usefixtures("example_data")
+@pytest.mark.filterwarnings("ignore:Pydantic")
+def test_get_all_when_given_current_etag_should_return_not_modified(
+    client: TestClient,
+) -> None:
+    first = client.get("/api/v1/vehicles")
+
+    unchanged = client.get(
+        "/api/v1/vehicles", headers={"If-None-Match": first.headers["etag"]}
+    )
+
+    assert unchanged.status_code == status.HTTP_304_NOT_MODIFIED
+
+    client.post("/api/v1/vehicles", json=PARAMS)
+    changed = client.get(
+        "/api/v1/vehicles", headers={"If-None-Match": first.headers["etag"]}
+    )
+
+    assert changed.status_code == status.HTTP_200_OK
+    assert len(changed.json()["data"]) == 3
@@ -0,0 +1,32 @@
+import uuid
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from app import database
+from app.cache import LRUCache
+from app.replicas import CONSISTENCY_KEY
+from app.vehicles.services import vehicle_cache
+from tests.data import PARAMS
+
+
+@pytest.mark.filterwarnings("ignore:Pydantic")
+def test_get_when_client_wrote_recently_should_not_return_stale_cached_vehicle(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(database, "recent_writes", LRUCache(maxsize=10, ttl=5))
+    headers = {CONSISTENCY_KEY: "client"}
+    created = client.post("/api/v1/vehicles", json=PARAMS).json()["data"]
+    client.put(
+        f"/api/v1/vehicles/{created['id']}",
+        json={"name": "updated"},
+        headers=headers,
+    )
+    # cached from a replica that had not replayed the update yet
+    vehicle_cache.set(uuid.UUID(created["id"]), created)
+
+    response = client.get(f"/api/v1/vehicles/{created['id']}", headers=headers)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["data"]["name"] == "updated"
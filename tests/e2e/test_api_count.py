@@ -0,0 +1,65 @@
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from tests.data import PARAMS
+
+
+@pytest.mark.usefixtures("example_data")
+@pytest.mark.parametrize("count", ["exact", "estimated"])
+def test_get_all_when_count_given_should_send_total_of_all_pages(
+    client: TestClient, count: str
+) -> None:
+    client.post("/api/v1/vehicles", json=PARAMS)
+
+    response = client.get("/api/v1/vehicles", params={"limit": 1, "count": count})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.json()["data"]) == 1
+    assert response.headers["X-Total-Count"] == "3"
+
+
+@pytest.mark.usefixtures("example_data")
+def test_get_all_when_no_count_given_should_not_send_total(client: TestClient) -> None:
+    response = client.get("/api/v1/vehicles")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert "X-Total-Count" not in response.headers
+
+
+@pytest.mark.usefixtures("example_data")
+def test_get_all_when_count_given_should_keep_etag(client: TestClient) -> None:
+    etag = client.get("/api/v1/vehicles").headers["ETag"]
+
+    response = client.get(
+        "/api/v1/vehicles", params={"count": "exact"}, headers={"If-None-Match": etag}
+    )
+
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.headers["X-Total-Count"] == "2"
+
+
+@pytest.mark.usefixtures("example_data")
+def test_head_should_send_total_of_filtered_vehicles_without_body(
+    client: TestClient,
+) -> None:
+    client.post("/api/v1/vehicles", json=PARAMS)
+
+    response = client.head("/api/v1/vehicles/", params={"manufacturing_year": 2020})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["X-Total-Count"] == "2"
+    assert response.content == b""
+
+
+def test_head_when_count_none_should_not_send_total(client: TestClient) -> None:
+    response = client.head("/api/v1/vehicles/", params={"count": "none"})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert "X-Total-Count" not in response.headers
+
+
+def test_get_all_when_count_invalid_should_reject(client: TestClient) -> None:
+    response = client.get("/api/v1/vehicles", params={"count": "some"})
+
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
@@ -0,0 +1,42 @@
+import json
+from collections.abc import Iterator
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+from sqlalchemy import Engine
+
+from app.database import get_engine
+from app.main import app
+
+
+@pytest.fixture()
+def export_client(client: TestClient, db_engine: Engine) -> Iterator[TestClient]:
+    app.dependency_overrides[get_engine] = lambda: db_engine
+    yield client
+    app.dependency_overrides.pop(get_engine)
+
+
+@pytest.mark.usefixtures("example_data")
+@pytest.mark.filterwarnings("ignore:Pydantic")
+def test_export_all_when_given_filter_should_stream_matching_vehicles_as_ndjson(
+    export_client: TestClient,
+) -> None:
+    response = export_client.get("/api/v1/vehicles/export", params={"name": "Q7"})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"] == "application/x-ndjson"
+    [vehicle] = [json.loads(line) for line in response.text.splitlines()]
+    assert vehicle["name"] == "Q7"
+
+
+@pytest.mark.usefixtures("example_data")
+@pytest.mark.filterwarnings("ignore:Pydantic")
+def test_export_all_when_given_csv_format_should_stream_csv_with_header(
+    export_client: TestClient,
+) -> None:
+    response = export_client.get("/api/v1/vehicles/export", params={"format": "csv"})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/csv")
+    assert len(response.text.splitlines()) == 3
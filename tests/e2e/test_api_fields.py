@@ -0,0 +1,58 @@
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from tests.data import PARAMS
+
+
+@pytest.mark.usefixtures("example_data")
+def test_get_all_when_fields_given_should_return_only_those_and_required_fields(
+    client: TestClient,
+) -> None:
+    response = client.get(
+        "/api/v1/vehicles", params={"fields": "name,manufacturing_year", "limit": 1}
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    [vehicle] = response.json()["data"]
+    assert set(vehicle) == {"id", "version", "name", "manufacturing_year"}
+    assert response.json()["next_cursor"]
+
+
+@pytest.mark.usefixtures("example_data")
+def test_get_all_when_fields_given_should_keep_etag(client: TestClient) -> None:
+    etag = client.get("/api/v1/vehicles").headers["ETag"]
+
+    response = client.get(
+        "/api/v1/vehicles", params={"fields": "name"}, headers={"If-None-Match": etag}
+    )
+
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+
+@pytest.mark.filterwarnings("ignore:Pydantic")
+def test_get_when_fields_given_should_return_only_those_and_required_fields(
+    client: TestClient,
+) -> None:
+    created = client.post("/api/v1/vehicles", json=PARAMS)
+    id = created.json()["data"]["id"]
+
+    response = client.get(f"/api/v1/vehicles/{id}", params={"fields": "body"})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["data"] == {
+        "id": id,
+        "version": 1,
+        "body": PARAMS["body"],
+    }
+    assert response.headers["ETag"] == created.headers["ETag"]
+    assert "Last-Modified" in response.headers
+
+
+@pytest.mark.parametrize("fields", ["name,colour", "", "name,,version"])
+def test_get_all_when_fields_invalid_should_return_bad_request(
+    client: TestClient, fields: str
+) -> None:
+    response = client.get("/api/v1/vehicles", params={"fields": fields})
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,71 @@
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from tests.data import PARAMS
+
+
+@pytest.mark.usefixtures("example_data")
+@pytest.mark.filterwarnings("ignore:Pydantic")
+def test_get_all_when_filtered_on_body_attribute_should_return_matching_vehicles(
+    client: TestClient,
+) -> None:
+    response = client.get("/api/v1/vehicles", params={"body.color": "black"})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [v["name"] for v in response.json()["data"]] == ["I30"]
+
+
+@pytest.mark.usefixtures("example_data")
+@pytest.mark.filterwarnings("ignore:Pydantic")
+def test_get_all_when_body_filter_matches_nothing_should_return_empty_list(
+    client: TestClient,
+) -> None:
+    response = client.get(
+        "/api/v1/vehicles", params={"body.color": "black", "name": "Q7"}
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["data"] == []
+
+
+@pytest.mark.filterwarnings("ignore:Pydantic")
+def test_get_all_when_body_filter_value_is_quoted_should_match_string(
+    client: TestClient,
+) -> None:
+    client.post("/api/v1/vehicles", json=PARAMS | {"body": {"plate": "123"}})
+
+    quoted = client.get("/api/v1/vehicles", params={"body.plate": '"123"'})
+    unquoted = client.get("/api/v1/vehicles", params={"body.plate": "123"})
+
+    assert [v["body"] for v in quoted.json()["data"]] == [{"plate": "123"}]
+    assert unquoted.json()["data"] == []
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        [("body.color", "black"), ("body.color.hue", "1")],
+        [("body.color.hue", "1"), ("body.color", "black")],
+        [("body.", "1")],
+        [("body.engine..fuel", "diesel")],
+        [("body.color", "{}")],
+        [("body.color", '["black"]')],
+        [("body.color", "black"), ("body.color", "red")],
+    ],
+    ids=[
+        "parent-first",
+        "child-first",
+        "empty",
+        "empty-parent",
+        "object",
+        "array",
+        "duplicate",
+    ],
+)
+def test_get_all_when_given_invalid_body_filter_should_return_unprocessable(
+    client: TestClient, params: list[tuple[str, str]]
+) -> None:
+    response = client.get("/api/v1/vehicles", params=params)
+
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
@@ -0,0 +1,52 @@
+import json
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from tests.data import PARAMS, Q7, UPDATE
+
+
+@pytest.mark.usefixtures("example_data")
+@pytest.mark.filterwarnings("ignore:Pydantic")
+def test_import_all_when_given_ndjson_upload_should_import_valid_rows_and_report_others(
+    client: TestClient,
+) -> None:
+    lines = [
+        json.dumps(PARAMS),
+        "not json",
+        json.dumps(UPDATE),
+        Q7.model_dump_json(),
+    ]
+
+    response = client.post(
+        "/api/v1/vehicles/import",
+        content="\n".join(lines).encode(),
+        headers={"content-type": "application/x-ndjson"},
+    )
+
+    assert response.status_code == status.HTTP_201_CREATED
+    report = response.json()["data"]
+    assert (report["imported"], report["skipped"], report["rejected"]) == (2, 1, 1)
+    assert report["errors"][0]["line"] == 2
+    assert len(client.get("/api/v1/vehicles").json()["data"]) == 4
+
+
+@pytest.mark.filterwarnings("ignore:Pydantic")
+def test_import_all_when_given_csv_upload_should_import_rows(
+    client: TestClient,
+) -> None:
+    document = 'name,manufacturing_year,is_drivable,body\nQ7,2020,true,"{}"\n'
+
+    response = client.post(
+        "/api/v1/vehicles/import",
+        params={"format": "csv"},
+        content=document.encode(),
+        headers={"content-type": "text/csv"},
+    )
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.json()["data"]["imported"] == 1
+    [vehicle] = client.get("/api/v1/vehicles").json()["data"]
+    assert vehicle["name"] == "Q7"
+    assert vehicle["is_drivable"] is True
@@ -0,0 +1,17 @@
+from fastapi import status
+from fastapi.testclient import TestClient
+
+
+def test_get_metrics_when_called_after_request_should_expose_route_latency(
+    client: TestClient,
+) -> None:
+    client.get("/api/v1/vehicles/search", params={"q": "Q"})
+
+    response = client.get("/api/v1/metrics")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/plain")
+    assert (
+        'http_request_duration_seconds_count{method="GET",'
+        'route="/vehicles/search",status="200"}' in response.text
+    )
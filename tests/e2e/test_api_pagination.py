@@ -0,0 +1,29 @@
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+
+
+@pytest.mark.usefixtures("example_data")
+@pytest.mark.filterwarnings("ignore:Pydantic")
+def test_get_all_when_paging_with_next_cursor_should_return_every_vehicle_once(
+    client: TestClient,
+) -> None:
+    first = client.get("/api/v1/vehicles", params={"limit": 1})
+
+    assert first.status_code == status.HTTP_200_OK
+    assert (cursor := first.json()["next_cursor"])
+
+    second = client.get("/api/v1/vehicles", params={"limit": 1, "cursor": cursor})
+
+    assert second.status_code == status.HTTP_200_OK
+    assert second.json()["next_cursor"] is None
+    names = {v["name"] for v in first.json()["data"] + second.json()["data"]}
+    assert names == {"Q7", "I30"}
+
+
+def test_get_all_when_given_malformed_cursor_should_return_bad_request(
+    client: TestClient,
+) -> None:
+    response = client.get("/api/v1/vehicles", params={"cursor": "abc"})
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
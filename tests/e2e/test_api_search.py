@@ -0,0 +1,33 @@
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+
+
+@pytest.mark.usefixtures("example_data")
+@pytest.mark.filterwarnings("ignore:Pydantic")
+def test_search_when_given_name_prefix_should_return_matching_vehicles(
+    client: TestClient,
+) -> None:
+    response = client.get("/api/v1/vehicles/search", params={"q": "I3"})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [v["name"] for v in response.json()["data"]] == ["I30"]
+
+
+def test_search_when_given_empty_query_should_return_unprocessable_entity(
+    client: TestClient,
+) -> None:
+    response = client.get("/api/v1/vehicles/search", params={"q": ""})
+
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.usefixtures("example_data")
+@pytest.mark.parametrize("q", ["I\U0010ffff", "I\ud7ff"])
+def test_search_when_query_ends_in_edge_code_point_should_not_fail(
+    client: TestClient, q: str
+) -> None:
+    response = client.get("/api/v1/vehicles/search", params={"q": q})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["data"] == []
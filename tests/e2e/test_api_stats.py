@@ -0,0 +1,44 @@
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from tests.data import PARAMS
+
+
+@pytest.mark.usefixtures("example_data")
+@pytest.mark.filterwarnings("ignore:Pydantic")
+def test_stats_when_vehicles_exist_should_count_by_year_and_drivability(
+    client: TestClient,
+) -> None:
+    client.post("/api/v1/vehicles", json=PARAMS)
+
+    response = client.get("/api/v1/vehicles/stats")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [
+        (s["manufacturing_year"], s["is_drivable"], s["count"])
+        for s in response.json()["data"]
+    ] == [(2017, True, 1), (2020, False, 1), (2020, True, 1)]
+
+
+@pytest.mark.usefixtures("example_data")
+@pytest.mark.filterwarnings("ignore:Pydantic")
+def test_stats_when_given_body_attribute_should_count_by_its_values_as_well(
+    client: TestClient,
+) -> None:
+    client.post("/api/v1/vehicles", json=PARAMS | {"is_drivable": True})
+
+    response = client.get("/api/v1/vehicles/stats", params={"body": "color"})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [
+        (s["manufacturing_year"], s["body_value"], s["count"])
+        for s in response.json()["data"]
+    ] == [(2017, "black", 1), (2020, "red", 1), (2020, "test_color", 1)]
+
+
+def test_stats_when_no_vehicles_should_return_empty_list(client: TestClient) -> None:
+    response = client.get("/api/v1/vehicles/stats")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["data"] == []
@@ -0,0 +1,68 @@
+import os
+import random
+from collections.abc import Iterator
+
+import pytest
+from sqlalchemy import Connection, create_engine, text
+
+from app.database import metadata
+from app.vehicles.schemas import CreateVehicle
+from app.vehicles.services import insert_vehicles
+
+TEST_POSTGRES_URL = os.environ.get("TEST_POSTGRES_URL")
+TEST_SCHEMA = "integration_tests"
+SEED = 42
+SEED_BATCH_SIZE = 1000
+COLORS = ("black", "red", "blue", "white")
+
+
+@pytest.fixture()
+def pg_connection() -> Iterator[Connection]:
+    """
+    Connection to the postgres database given by `TEST_POSTGRES_URL`.
+
+    The tables are created in a schema of their own inside a transaction that is
+    rolled back, so the database is left as it was found.
+    """
+    if TEST_POSTGRES_URL is None:
+        pytest.skip("TEST_POSTGRES_URL is not set.")
+    engine = create_engine(TEST_POSTGRES_URL)
+    with engine.connect() as conn, conn.begin() as transaction:
+        conn.execute(text(f"CREATE SCHEMA {TEST_SCHEMA}"))
+        conn.execute(text(f"SET LOCAL search_path TO {TEST_SCHEMA}"))
+        metadata.create_all(bind=conn)
+        yield conn
+        transaction.rollback()
+    engine.dispose()
+
+
+@pytest.fixture()
+def seed_size() -> int:
+    """Number of vehicles in `seeded_connection`, override it in a module to change it."""
+    return 1000
+
+
+@pytest.fixture()
+def seeded_connection(pg_connection: Connection, seed_size: int) -> Connection:
+    """
+    `pg_connection` with `seed_size` random vehicles.
+
+    The vehicles are the same on every run and analyzed, so the planner
+    statistics are known to the test.
+    """
+    rng = random.Random(SEED)
+    insert_vehicles(
+        pg_connection,
+        [
+            CreateVehicle(
+                name=f"vehicle-{i}",
+                manufacturing_year=rng.randint(1950, 2025),
+                is_drivable=rng.choice([True, False]),
+                body={"color": rng.choice(COLORS)},
+            )
+            for i in range(seed_size)
+        ],
+        batch_size=SEED_BATCH_SIZE,
+    )
+    pg_connection.execute(text("ANALYZE vehicles"))
+    return pg_connection
@@ -0,0 +1,75 @@
+import itertools
+from collections.abc import Iterator
+from typing import Any
+
+import pytest
+from sqlalchemy import Connection, text
+
+from app.database import query_plan
+from app.vehicles.services import (
+    select_vehicles,
+    select_vehicles_by_name,
+)
+
+FILTERS = {
+    "name": "Q7",
+    "manufacturing_year": 2020,
+    "is_drivable": True,
+    "body": {"color": "black"},
+}
+FILTER_COMBINATIONS = [
+    dict(combination)
+    for size in range(1, len(FILTERS) + 1)
+    for combination in itertools.combinations(FILTERS.items(), size)
+]
+
+
+@pytest.fixture()
+def seed_size() -> int:
+    return 10_000
+
+
+def iter_nodes(plan: dict[str, Any]) -> Iterator[str]:
+    yield plan["Node Type"]
+    for child in plan.get("Plans", []):
+        yield from iter_nodes(child)
+
+
+@pytest.mark.filterwarnings("ignore:Pydantic")
+@pytest.mark.parametrize("filter_on", FILTER_COMBINATIONS, ids=lambda f: "+".join(f))
+def test_select_vehicles_when_filtered_should_not_plan_sequential_scan(
+    seeded_connection: Connection, filter_on: dict[str, Any]
+) -> None:
+    """
+    Given: A seeded postgres database with sequential scans disabled
+    When: Explaining the vehicle select for a combination of filters
+    Then: The plan should be served by an index, sequential scans are only
+        chosen when disabled if no index can answer the filter.
+    """
+    seeded_connection.execute(text("SET LOCAL enable_seqscan = off"))
+
+    plan = query_plan(
+        seeded_connection, *select_vehicles(seeded_connection.dialect.name, filter_on)
+    )
+
+    assert "Seq Scan" not in set(iter_nodes(plan)), plan
+
+
+@pytest.mark.filterwarnings("ignore:Pydantic")
+@pytest.mark.parametrize("query", ["veh", "vehicle-42", "vehilce"])
+def test_search_vehicles_when_searched_should_not_plan_sequential_scan(
+    seeded_connection: Connection, query: str
+) -> None:
+    """
+    Given: A seeded postgres database with sequential scans disabled
+    When: Explaining the vehicle search for a prefix, a full name and a typo
+    Then: The plan should be served by the trigram index.
+    """
+    seeded_connection.execute(text("SET LOCAL enable_seqscan = off"))
+
+    plan = query_plan(
+        seeded_connection,
+        *select_vehicles_by_name(seeded_connection.dialect.name, query, limit=10),
+    )
+
+    assert "Seq Scan" not in set(iter_nodes(plan)), plan
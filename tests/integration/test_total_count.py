@@ -0,0 +1,59 @@
+from typing import Any
+
+import pytest
+from sqlalchemy import Connection
+
+from app.vehicles.schemas import CreateVehicle
+from app.vehicles.services import count_vehicles, estimate_vehicles, insert_vehicles
+
+SEED_SIZE = 5000
+TOLERANCE = 0.2
+
+
+@pytest.fixture()
+def seed_size() -> int:
+    return SEED_SIZE
+
+
+@pytest.mark.filterwarnings("ignore:Pydantic")
+@pytest.mark.parametrize(
+    "filter_on",
+    [{}, {"manufacturing_year": 2017}, {"is_drivable": True}],
+    ids=["all", "year", "drivable"],
+)
+def test_estimate_vehicles_when_analyzed_should_be_close_to_exact_count(
+    seeded_connection: Connection, filter_on: dict[str, Any]
+) -> None:
+    """
+    Given: A seeded and analyzed postgres database
+    When: Estimating the number of vehicles matching a filter
+    Then: The planner estimate should be within the tolerance of counting them
+    """
+    exact = count_vehicles(seeded_connection, filter_on)
+
+    estimate = estimate_vehicles(seeded_connection, filter_on)
+
+    assert estimate == pytest.approx(exact, rel=TOLERANCE)
+
+
+@pytest.mark.filterwarnings("ignore:Pydantic")
+def test_estimate_vehicles_when_table_grew_since_analyze_should_follow_its_size(
+    seeded_connection: Connection,
+) -> None:
+    """
+    Given: A seeded database that doubled in size since it was analyzed
+    When: Estimating the number of all vehicles
+    Then: The estimate should be scaled to the pages the table has now
+    """
+    insert_vehicles(
+        seeded_connection,
+        [
+            CreateVehicle(name=f"new vehicle {i}", manufacturing_year=2020)
+            for i in range(SEED_SIZE)
+        ],
+        batch_size=1000,
+    )
+
+    estimate = estimate_vehicles(seeded_connection, {})
+
+    assert estimate == pytest.approx(2 * SEED_SIZE, rel=TOLERANCE)
@@ -0,0 +1,34 @@
+import pytest
+from sqlalchemy import Connection
+
+from app.vehicles.schemas import CreateVehicle
+from app.vehicles.services import (
+    create_import_staging,
+    get_vehicles,
+    merge_staged_vehicles,
+    stage_vehicles,
+)
+
+
+@pytest.mark.filterwarnings("ignore:Pydantic")
+def test_stage_vehicles_when_name_empty_should_copy_empty_name_not_null(
+    pg_connection: Connection,
+) -> None:
+    """
+    Given: Vehicles to import, one of them with an empty name
+    When: They are staged through COPY and merged into the vehicles
+    Then: The empty name should be kept instead of being read as NULL
+    """
+    to_create = [
+        CreateVehicle(name="", is_drivable=True, body={"note": 'a "quoted", text'}),
+        CreateVehicle(name="Q7"),
+    ]
+    create_import_staging(pg_connection)
+
+    stage_vehicles(pg_connection, to_create)
+
+    assert merge_staged_vehicles(pg_connection) == 2
+    vehicles = get_vehicles(pg_connection, {}, columns={"name", "is_drivable", "body"})
+    assert sorted(vehicles, key=lambda vehicle: vehicle["name"]) == [
+        item.model_dump(include={"name", "is_drivable", "body"}) for item in to_create
+    ]
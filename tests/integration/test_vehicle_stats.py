@@ -0,0 +1,123 @@
+import pytest
+from sqlalchemy import Connection, text
+
+from app.vehicles.schemas import CreateVehicle, UpdateVehicle
+from app.vehicles.services import (
+    delete_vehicle,
+    get_vehicle_stats,
+    insert_vehicle,
+    rebuild_vehicle_stats,
+    select_vehicle_stats,
+    update_vehicle,
+)
+
+COUNT_VEHICLES = text(
+    "SELECT manufacturing_year, is_drivable, count(*) AS count FROM vehicles "
+    "GROUP BY 1, 2 ORDER BY 1, 2"
+)
+
+
+@pytest.fixture()
+def seed_size() -> int:
+    return 500
+
+
+def counts(conn: Connection) -> list[tuple[int, bool, int]]:
+    return [
+        (row["manufacturing_year"], row["is_drivable"], row["count"])
+        for row in get_vehicle_stats(conn)
+    ]
+
+
+def test_vehicle_stats_when_vehicles_inserted_should_match_grouped_vehicles(
+    seeded_connection: Connection,
+) -> None:
+    """
+    Given: Vehicles inserted in multi-row statements
+    When: The stats are read
+    Then: They should equal counting the vehicles with a GROUP BY
+    """
+    assert counts(seeded_connection) == [
+        tuple(row) for row in seeded_connection.execute(COUNT_VEHICLES)
+    ]
+
+
+def test_vehicle_stats_when_vehicles_updated_and_deleted_should_follow_changes(
+    seeded_connection: Connection,
+) -> None:
+    """
+    Given: Seeded vehicles
+    When: Vehicles move to another year, get renamed, and are deleted
+    Then: The stats should still equal counting the vehicles with a GROUP BY
+    """
+    ids = seeded_connection.execute(text("SELECT id FROM vehicles")).scalars().all()
+    for id in ids[:50]:
+        update_vehicle(seeded_connection, id, UpdateVehicle(manufacturing_year=2021))
+    for id in ids[50:100]:
+        update_vehicle(seeded_connection, id, UpdateVehicle(name="renamed"))
+    for id in ids[100:150]:
+        delete_vehicle(seeded_connection, id)
+    seeded_connection.execute(
+        text("UPDATE vehicles SET is_drivable = NOT is_drivable WHERE name = 'renamed'")
+    )
+
+    assert counts(seeded_connection) == [
+        tuple(row) for row in seeded_connection.execute(COUNT_VEHICLES)
+    ]
+    assert sum(count for *_, count in counts(seeded_connection)) == 450
+
+
+def test_vehicle_stats_when_reading_counts_should_not_scan_vehicles(
+    seeded_connection: Connection,
+) -> None:
+    """
+    Given: Seeded vehicles
+    When: The plan of reading the stats is explained
+    Then: Only the summary table should be read
+    """
+    statement, _ = select_vehicle_stats("postgresql", None)
+    sql = statement.compile(seeded_connection, compile_kwargs={"literal_binds": True})
+    plan = seeded_connection.execute(text(f"EXPLAIN {sql}")).scalars()
+
+    assert "vehicle_stats" in (plan := "\n".join(plan))
+    assert " vehicles" not in plan
+
+
+def test_vehicle_stats_when_vehicles_truncated_should_count_only_new_vehicles(
+    seeded_connection: Connection,
+) -> None:
+    """
+    Given: Seeded vehicles
+    When: The vehicles are truncated and some are inserted again
+    Then: The stats should count only the vehicles inserted after the truncate
+    """
+    seeded_connection.execute(text("TRUNCATE vehicles"))
+
+    assert counts(seeded_connection) == []
+
+    insert_vehicle(seeded_connection, CreateVehicle(name="Q7", manufacturing_year=2020))
+
+    assert counts(seeded_connection) == [
+        tuple(row) for row in seeded_connection.execute(COUNT_VEHICLES)
+    ]
+
+
+def test_rebuild_vehicle_stats_when_triggers_bypassed_should_match_grouped_vehicles(
+    seeded_connection: Connection,
+) -> None:
+    """
+    Given: Seeded vehicles, changed while the triggers were not fired
+    When: The stats are rebuilt
+    Then: They should equal counting the vehicles with a GROUP BY again
+    """
+    seeded_connection.execute(text("ALTER TABLE vehicles DISABLE TRIGGER USER"))
+    seeded_connection.execute(
+        text("DELETE FROM vehicles WHERE manufacturing_year < 2000")
+    )
+    seeded_connection.execute(text("ALTER TABLE vehicles ENABLE TRIGGER USER"))
+    grouped = [tuple(row) for row in seeded_connection.execute(COUNT_VEHICLES)]
+    assert counts(seeded_connection) != grouped
+
+    rebuild_vehicle_stats(seeded_connection)
+
+    assert counts(seeded_connection) == grouped
@@ -53,3 +53,13 @@ class Stub:
         if func_name != self.raise_on or not self.raises:
             return
         raise self.raises
+
+
+class FakeClock:
+    """Monotonic clock standing still until `now` is set."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
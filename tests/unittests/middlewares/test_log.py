@@ -1,10 +1,24 @@
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 from fastapi import Request
 from loguru import logger
+from starlette.responses import PlainTextResponse
 
-from app.middlewares.log import create_log_message, get_log_strategy
+from app.middlewares.log import (
+    LoggingMiddleware,
+    create_log_message,
+    get_log_strategy,
+    log_response,
+)
+
+HTTP_SCOPE = {
+    "type": "http",
+    "method": "GET",
+    "path": "/api/v1/vehicles",
+    "headers": [],
+    "client": ("testclient", 50000),
+}
 
 
 def get_request_object(
@@ -75,3 +89,100 @@ def test_get_log_strategy_when_given_status_code_should_return_correct_logger_an
 
     assert log_function == logger_fn
     assert status_message == expected_message
+
+
+@pytest.mark.asyncio()
+async def test_logging_middleware_when_response_starts_should_log_request_and_status():
+    """
+    Given: The logging middleware wrapping an application answering 404
+    When: The middleware is called with a request
+    Then: The request and the status of its response should be logged
+    """
+    messages: list[str] = []
+    sink = logger.add(messages.append, format="{message}")
+    middleware = LoggingMiddleware(PlainTextResponse("missing", status_code=404))
+
+    try:
+        await middleware(HTTP_SCOPE, AsyncMock(), AsyncMock())
+    finally:
+        logger.remove(sink)
+
+    assert [message.strip() for message in messages] == [
+        "[Address(host='testclient', port=50000)]::[GET]::[/api/v1/vehicles]",
+        "[Address(host='testclient', port=50000)]::[GET]::[/api/v1/vehicles]::CLIENT_ERROR",
+    ]
+
+
+@pytest.mark.asyncio()
+@pytest.mark.parametrize(
+    "status_code, expected_lines",
+    [(200, 0), (404, 2)],
+    ids=[
+        "test_logging_middleware_when_success_is_not_sampled_should_not_log",
+        "test_logging_middleware_when_error_is_not_sampled_should_still_log",
+    ],
+)
+async def test_logging_middleware_when_request_is_not_sampled_should_only_log_errors(
+    status_code, expected_lines
+):
+    """
+    Given: The logging middleware with a sample rate of zero
+    When: The middleware is called with a request
+    Then: The request should only be logged if it was answered with an error
+    """
+    messages: list[str] = []
+    sink = logger.add(messages.append, format="{message}")
+    middleware = LoggingMiddleware(
+        PlainTextResponse("", status_code=status_code), sample_rate=0.0
+    )
+
+    try:
+        await middleware(HTTP_SCOPE, AsyncMock(), AsyncMock())
+    finally:
+        logger.remove(sink)
+
+    assert len(messages) == expected_lines
+
+
+@pytest.mark.asyncio()
+async def test_logging_middleware_when_app_raises_should_log_request_and_server_error():
+    """
+    Given: The logging middleware with a sample rate of zero wrapping a failing app
+    When: The middleware is called with a request
+    Then: The request and a server error should be logged before the error is raised
+    """
+    messages: list[str] = []
+    sink = logger.add(messages.append, format="{message}")
+    middleware = LoggingMiddleware(
+        AsyncMock(side_effect=RuntimeError("boom")), sample_rate=0.0
+    )
+
+    try:
+        with pytest.raises(RuntimeError, match="boom"):
+            await middleware(HTTP_SCOPE, AsyncMock(), AsyncMock())
+    finally:
+        logger.remove(sink)
+
+    assert [message.strip() for message in messages] == [
+        "[Address(host='testclient', port=50000)]::[GET]::[/api/v1/vehicles]",
+        "[Address(host='testclient', port=50000)]::[GET]::[/api/v1/vehicles]::SERVER_ERROR",
+    ]
+
+
+def test_log_response_when_given_server_timing_should_append_it_to_message() -> None:
+    """
+    Given: A request answered with a Server-Timing header
+    When: log_response is called with the Server-Timing value
+    Then: The timing should be appended to the response log line
+    """
+    messages: list[str] = []
+    sink = logger.add(messages.append, format="{message}")
+
+    try:
+        log_response(get_request_object(), 200, "db;dur=1.000, ser;dur=0.500")
+    finally:
+        logger.remove(sink)
+
+    assert messages == [
+        "[TestClient]::[GET]::[/api/v1/vehicles]::SUCCESS::[db;dur=1.000, ser;dur=0.500]\n"
+    ]
@@ -0,0 +1,44 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+from prometheus_client import REGISTRY
+from starlette.responses import PlainTextResponse
+from starlette.types import Receive, Scope, Send
+
+from app.middlewares.metrics import UNMATCHED_ROUTE, MetricsMiddleware, route_path
+
+
+def get_request_count(route: str, status: str) -> float:
+    labels = {"method": "GET", "route": route, "status": status}
+    count = REGISTRY.get_sample_value("http_request_duration_seconds_count", labels)
+    return count or 0.0
+
+
+@pytest.mark.asyncio()
+async def test_metrics_middleware_when_route_matched_should_record_duration_by_route_and_status():
+    """
+    Given: The metrics middleware wrapping an application that matches a route
+    When: The middleware is called with a request
+    Then: The duration should be recorded for the route template and response status
+    """
+
+    async def app(scope: Scope, receive: Receive, send: Send) -> None:
+        scope["route"] = SimpleNamespace(path="/test/{id}")
+        await PlainTextResponse("", status_code=201)(scope, receive, send)
+
+    before = get_request_count("/test/{id}", "201")
+    scope = {"type": "http", "method": "GET", "path": "/test/1", "headers": []}
+
+    await MetricsMiddleware(app)(scope, AsyncMock(), AsyncMock())
+
+    assert get_request_count("/test/{id}", "201") == before + 1
+
+
+def test_route_path_when_no_route_matched_should_return_unmatched_route():
+    """
+    Given: A scope without a matched route
+    When: route_path is called with the scope
+    Then: The unmatched route label should be returned instead of the raw path
+    """
+    assert route_path({"type": "http", "path": "/anything"}) == UNMATCHED_ROUTE
@@ -1,31 +1,57 @@
 from unittest.mock import AsyncMock
 
 import pytest
-from fastapi import Response
+from starlette.datastructures import MutableHeaders
+from starlette.responses import PlainTextResponse
+from starlette.types import Message
 
 from app.middlewares.time import (
     HEADER_NAME,
+    ProcessTimeMiddleware,
     add_header_to_response,
     calculate_process_time,
-    measure_process_time,
 )
+from app.timing import SERVER_TIMING
+
+HTTP_SCOPE = {"type": "http", "method": "GET", "path": "/", "headers": []}
+
+
+async def receive() -> Message:
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+@pytest.mark.asyncio()
+async def test_process_time_middleware_when_response_starts_should_add_process_time_header():
+    """
+    Given: The process time middleware wrapping an application
+    When: The application starts its response
+    Then: The process time header should be added to the sent headers
+        and the body should be passed on unchanged
+    """
+    messages: list[Message] = []
+    middleware = ProcessTimeMiddleware(PlainTextResponse("ok"))
+
+    await middleware(HTTP_SCOPE, receive, AsyncMock(side_effect=messages.append))
+
+    start, body = messages
+    assert float(MutableHeaders(scope=start)[HEADER_NAME]) > 0
+    assert MutableHeaders(scope=start)[SERVER_TIMING].startswith("db;dur=0.000, ")
+    assert body["body"] == b"ok"
 
 
 @pytest.mark.asyncio()
-async def test_measure_process_time_when_called_with_async_function_should_return_result_and_time():
+async def test_process_time_middleware_when_scope_is_not_http_should_pass_through():
     """
-    Given: An asynchronous function mock that returns a result
-    When: measure_process_time is called with an asynchronous function mock
-    Then: The result should be returned and the process time should be calculated
+    Given: The process time middleware wrapping an application
+    When: It is called with a lifespan scope
+    Then: The application should be called with the original send
     """
-    mock_result = "test_result"
-    mock_function = AsyncMock(return_value=mock_result)
+    app, send = AsyncMock(), AsyncMock()
+    scope = {"type": "lifespan"}
 
-    result, process_time = await measure_process_time(mock_function)
+    await ProcessTimeMiddleware(app)(scope, receive, send)
 
-    assert result == mock_result
-    assert isinstance(process_time, float)
-    assert process_time > 0
+    app.assert_awaited_once_with(scope, receive, send)
 
 
 @pytest.mark.parametrize(
@@ -64,9 +90,9 @@ def test_calculate_process_time_when_given_start_and_end_times_should_return_cor
 def test_add_header_to_response_when_given_process_time_should_add_correct_header(
     process_time, expected_header_value
 ):
-    response = Response()
-    result = add_header_to_response(response, process_time)
+    headers = MutableHeaders()
+    result = add_header_to_response(headers, process_time)
 
-    assert result == response
-    assert HEADER_NAME in result.headers
-    assert result.headers[HEADER_NAME] == expected_header_value
+    assert result == headers
+    assert HEADER_NAME in result
+    assert result[HEADER_NAME] == expected_header_value
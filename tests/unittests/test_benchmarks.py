@@ -0,0 +1,92 @@
+import httpx
+import pytest
+
+from app.main import app
+from benchmarks.__main__ import IN_PROCESS_URL, benchmark, sqlite_database
+from benchmarks.report import Regression, RouteReport, compare, percentile, summarize
+from benchmarks.scenarios import SCENARIOS
+
+
+def route_report(rps: float, p95_ms: float, p99_ms: float) -> RouteReport:
+    return RouteReport(
+        route="GET /vehicles/",
+        requests=100,
+        errors=0,
+        rps=rps,
+        p50_ms=1.0,
+        p95_ms=p95_ms,
+        p99_ms=p99_ms,
+    )
+
+
+def test_summarize_when_given_latencies_should_report_nearest_rank_percentiles() -> (
+    None
+):
+    """
+    Given: The latencies of 100 requests sent in two seconds
+    When: They are summarized
+    Then: The requests per second and the nearest rank percentiles should be reported
+    """
+    latencies = [ms / 1000 for ms in range(100, 0, -1)]
+
+    report = summarize("GET /vehicles/", latencies, errors=3, elapsed=2)
+
+    assert percentile([0.5], 99) == 0.5
+    assert report == RouteReport(
+        route="GET /vehicles/",
+        requests=100,
+        errors=3,
+        rps=50,
+        p50_ms=50,
+        p95_ms=95,
+        p99_ms=99,
+    )
+
+
+def test_compare_when_route_got_slower_than_tolerance_should_report_regressions() -> (
+    None
+):
+    """
+    Given: A baseline and a report whose throughput and p99 got worse by 50%
+    When: They are compared with a tolerance of 20%
+    Then: The throughput and the p99 should be reported, the unchanged p95 not
+    """
+    baseline = [route_report(rps=100, p95_ms=10, p99_ms=20)]
+    current = [route_report(rps=50, p95_ms=11, p99_ms=30)]
+
+    regressions = compare(baseline, current, tolerance=0.2)
+
+    assert regressions == [
+        Regression("GET /vehicles/", "rps", 100, 50),
+        Regression("GET /vehicles/", "p99_ms", 20, 30),
+    ]
+    assert regressions[0].change == -0.5
+    assert compare(baseline, baseline, tolerance=0.2) == []
+
+
+@pytest.mark.asyncio()
+@pytest.mark.filterwarnings("ignore:Pydantic")
+async def test_benchmark_when_run_on_sqlite_should_drive_every_route_without_errors() -> (
+    None
+):
+    """
+    Given: The app served from a temporary SQLite database
+    When: The benchmark seeds it and sends a few requests to every route
+    Then: Every route should be reported with all requests answered successfully
+    """
+    with sqlite_database(app):
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url=IN_PROCESS_URL
+        ) as client:
+            reports = await benchmark(
+                client,
+                list(SCENARIOS),
+                seed_count=20,
+                requests=4,
+                concurrency=2,
+                warmup=0,
+                random_seed=0,
+            )
+
+    assert [report.route for report in reports] == list(SCENARIOS)
+    assert all(report.requests == 4 and not report.errors for report in reports)
@@ -0,0 +1,56 @@
+from app.cache import CacheStats, LRUCache, NullCache
+from tests.stubs import FakeClock
+
+
+def test_lru_cache_when_full_should_evict_least_recently_used_entry() -> None:
+    """
+    Given: A full cache whose oldest entry was read recently
+    When: Another entry is added
+    Then: The least recently used entry should be evicted and counted
+    """
+    cache = LRUCache[str, int](maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.stats() == CacheStats(
+        hits=3, misses=1, evictions=1, expirations=0, size=2, maxsize=2
+    )
+
+
+def test_lru_cache_when_entry_outlived_ttl_should_return_none() -> None:
+    """
+    Given: A cache entry older than the time to live
+    When: The entry is read
+    Then: None should be returned and the expiration counted
+    """
+    clock = FakeClock()
+    cache = LRUCache[str, int](maxsize=2, ttl=10, clock=clock)
+    cache.set("a", 1)
+
+    clock.now = 10
+
+    assert cache.get("a") is None
+    assert cache.stats().expirations == 1
+    assert cache.stats().size == 0
+
+
+def test_lru_cache_when_entry_deleted_should_return_none() -> None:
+    cache = LRUCache[str, int](maxsize=2, ttl=60)
+    cache.set("a", 1)
+
+    cache.delete("a")
+
+    assert cache.get("a") is None
+
+
+def test_null_cache_when_set_should_never_return_value() -> None:
+    cache = NullCache[str, int]()
+    cache.set("a", 1)
+
+    assert cache.get("a") is None
+    assert cache.stats().misses == 1
@@ -0,0 +1,249 @@
+from collections.abc import AsyncGenerator
+from typing import Any
+
+import pytest
+import pytest_asyncio
+from fastapi import Request
+from sqlalchemy import (
+    Connection,
+    Engine,
+    NullPool,
+    QueuePool,
+    StaticPool,
+    create_engine,
+    text,
+)
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+
+from app import database
+from app.cache import LRUCache
+from app.config import get_settings
+from app.database import (
+    PoolStatus,
+    get_read_connection,
+    metadata,
+    ping_when_idle,
+    pool_options,
+    pool_status,
+    remember_write,
+    run_service,
+)
+from app.replicas import CONSISTENCY_KEY, ReplicaSet
+from app.vehicles.services import get_vehicles, insert_vehicle
+from tests.data import Q7
+from tests.stubs import FakeClock
+
+
+@pytest_asyncio.fixture()
+async def async_connection() -> AsyncGenerator[AsyncConnection, None]:
+    async_engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    async with async_engine.begin() as conn:
+        await conn.run_sync(metadata.create_all)
+        yield conn
+    await async_engine.dispose()
+
+
+@pytest.mark.asyncio()
+@pytest.mark.filterwarnings("ignore:Pydantic")
+async def test_run_service_when_given_async_connection_should_run_service_on_event_loop(
+    async_connection: AsyncConnection,
+) -> None:
+    """
+    Given: An async database connection
+    When: Services are called through run_service
+    Then: The services should run against the async connection.
+    """
+    created = await run_service(async_connection, insert_vehicle, Q7)
+
+    [result] = await run_service(async_connection, get_vehicles, dict(id=Q7.id))
+
+    assert created is not None
+    assert result["name"] == created["name"] == Q7.name
+
+
+@pytest.mark.asyncio()
+@pytest.mark.filterwarnings("ignore:Pydantic")
+async def test_run_service_when_given_sync_connection_should_run_service_in_threadpool(
+    connection: Connection,
+) -> None:
+    """
+    Given: A blocking database connection
+    When: Services are called through run_service
+    Then: The services should run against the blocking connection.
+    """
+    await run_service(connection, insert_vehicle, Q7)
+
+    [result] = await run_service(connection, get_vehicles, dict(name=Q7.name))
+
+    assert str(result["id"]) == str(Q7.id)
+
+
+def test_ping_when_idle_when_connection_reused_quickly_should_not_ping(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """
+    Given: An engine pinging connections idle for 30 seconds
+    When: A connection is checked out again 10 seconds after it was returned
+    Then: The connection should not be pinged
+    """
+    engine, clock = create_engine("sqlite://", poolclass=QueuePool), FakeClock()
+    ping_when_idle(engine, "test", idle_seconds=30, clock=clock)
+    pings = []
+    monkeypatch.setattr(engine.dialect, "do_ping", pings.append)
+
+    with engine.connect():
+        pass
+    clock.now = 10
+    with engine.connect():
+        pass
+
+    assert pings == []
+
+
+def test_ping_when_idle_when_connection_sat_idle_should_ping(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """
+    Given: An engine pinging connections idle for 30 seconds
+    When: A connection is checked out again 60 seconds after it was returned
+    Then: The connection should be pinged once
+    """
+    engine, clock = create_engine("sqlite://", poolclass=QueuePool), FakeClock()
+    ping_when_idle(engine, "test", idle_seconds=30, clock=clock)
+    pings = []
+    monkeypatch.setattr(engine.dialect, "do_ping", pings.append)
+
+    with engine.connect():
+        pass
+    clock.now = 60
+    with engine.connect():
+        pass
+
+    assert len(pings) == 1
+
+
+def test_ping_when_idle_when_ping_fails_should_check_out_fresh_connection(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """
+    Given: An idle pooled connection whose ping fails
+    When: A connection is checked out
+    Then: The dead connection should be replaced and the new one should work
+    """
+    engine, clock = create_engine("sqlite://", poolclass=QueuePool), FakeClock()
+    ping_when_idle(engine, "test", idle_seconds=30, clock=clock)
+    with engine.connect() as conn:
+        dead = conn.connection.dbapi_connection
+
+    def fail_ping(dbapi_connection: Any) -> None:
+        raise engine.dialect.loaded_dbapi.OperationalError("server closed")
+
+    monkeypatch.setattr(engine.dialect, "do_ping", fail_ping)
+    clock.now = 60
+    with engine.connect() as conn:
+        assert conn.connection.dbapi_connection is not dead
+        assert conn.execute(text("SELECT 1")).scalar_one() == 1
+
+
+def test_pool_options_when_null_pool_should_skip_size_options() -> None:
+    """
+    Given: Settings asking for a null pool
+    When: The pool options are built and passed to create_engine
+    Then: Only the pool class should be set and the engine should be created
+    """
+    settings = get_settings().model_copy(update={"DATABASE_POOL_CLASS": "null"})
+
+    options = pool_options(settings)
+
+    assert options == {"poolclass": NullPool}
+    assert isinstance(create_engine("sqlite://", **options).pool, NullPool)
+
+
+def test_pool_status_when_connection_checked_out_should_report_pool_state() -> None:
+    """
+    Given: An engine with a queue pool and one with a null pool
+    When: A connection is checked out and the pool status is read
+    Then: The queue pool should report its counts and the null pool none
+    """
+    queued = create_engine("sqlite://", poolclass=QueuePool, pool_size=2)
+    unpooled = create_engine("sqlite://", poolclass=NullPool)
+
+    with queued.connect():
+        status = pool_status({"queued": queued, "unpooled": unpooled})
+
+    assert status == [
+        PoolStatus("queued", "QueuePool", 2, 0, 1, 0, 30),
+        PoolStatus("unpooled", "NullPool", None, None, None, None, None),
+    ]
+
+
+def consistency_request(key: str | None = None) -> Request:
+    headers = [] if key is None else [(CONSISTENCY_KEY.lower().encode(), key.encode())]
+    return Request({"type": "http", "headers": headers})
+
+
+@pytest.fixture()
+def primary(monkeypatch: pytest.MonkeyPatch) -> Engine:
+    primary = create_engine("sqlite://")
+    monkeypatch.setattr(database, "engine", primary)
+    monkeypatch.setattr(database, "recent_writes", LRUCache(maxsize=10, ttl=5))
+    return primary
+
+
+def test_get_read_connection_when_replica_healthy_should_connect_to_replica(
+    monkeypatch: pytest.MonkeyPatch, primary: Engine
+) -> None:
+    """
+    Given: One healthy read replica
+    When: A read connection is requested
+    Then: The connection should be opened on the replica
+    """
+    replica = create_engine("sqlite://")
+    monkeypatch.setattr(database, "replicas", ReplicaSet([replica], 30))
+
+    conn = next(get_read_connection(consistency_request()))
+
+    assert conn.engine is replica
+
+
+def test_get_read_connection_when_replica_unreachable_should_eject_and_use_primary(
+    monkeypatch: pytest.MonkeyPatch, primary: Engine
+) -> None:
+    """
+    Given: A read replica that can't be connected to
+    When: A read connection is requested
+    Then: The replica should be ejected and the connection opened on the primary
+    """
+    replicas = ReplicaSet([create_engine("sqlite:////nonexistent/replica.db")], 30)
+    monkeypatch.setattr(database, "replicas", replicas)
+
+    conn = next(get_read_connection(consistency_request()))
+
+    assert conn.engine is primary
+    assert replicas.choose() is None
+
+
+def test_get_read_connection_when_client_wrote_recently_should_use_primary(
+    monkeypatch: pytest.MonkeyPatch, primary: Engine
+) -> None:
+    """
+    Given: A healthy read replica and a client that just wrote under its consistency key
+    When: The client requests a read connection
+    Then: The connection should be opened on the primary
+    """
+    monkeypatch.setattr(
+        database, "replicas", ReplicaSet([create_engine("sqlite://")], 30)
+    )
+    remember = remember_write(consistency_request("client"))
+    next(remember)
+    next(remember, None)
+
+    conn = next(get_read_connection(consistency_request("client")))
+    other = next(get_read_connection(consistency_request("other")))
+
+    assert conn.engine is primary
+    assert other.engine is not primary
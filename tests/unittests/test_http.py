@@ -0,0 +1,64 @@
+import datetime
+
+import pytest
+
+from app.utils.http import (
+    format_http_date,
+    is_not_modified,
+    make_etag,
+    parse_etags,
+)
+
+ETAG = make_etag("id", 1)
+LAST_MODIFIED = datetime.datetime(2024, 1, 1, 12, 0, 0, 500)
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        ('"a", W/"b"', ["a", "b"]),
+        ("*", None),
+        ("", []),
+    ],
+    ids=[
+        "test_parse_etags_when_given_strong_and_weak_tags_should_return_opaque_tags",
+        "test_parse_etags_when_given_wildcard_should_return_none",
+        "test_parse_etags_when_given_empty_header_should_return_empty_list",
+    ],
+)
+def test_parse_etags_when_given_header_should_return_expected_tags(
+    header, expected
+) -> None:
+    assert parse_etags(header) == expected
+
+
+@pytest.mark.parametrize(
+    "if_none_match, if_modified_since, expected",
+    [
+        (f'"x", W/{ETAG}', None, True),
+        ('"x"', None, False),
+        ("*", None, True),
+        ('"x"', format_http_date(LAST_MODIFIED), False),
+        (None, format_http_date(LAST_MODIFIED), True),
+        (None, "Mon, 01 Jan 2024 11:59:59 GMT", False),
+        (None, "not a date", False),
+        (None, None, False),
+    ],
+    ids=[
+        "test_is_not_modified_when_given_matching_etag_should_return_true",
+        "test_is_not_modified_when_given_other_etag_should_return_false",
+        "test_is_not_modified_when_given_wildcard_should_return_true",
+        "test_is_not_modified_when_given_other_etag_and_date_should_ignore_date",
+        "test_is_not_modified_when_not_modified_since_date_should_return_true",
+        "test_is_not_modified_when_modified_since_date_should_return_false",
+        "test_is_not_modified_when_given_malformed_date_should_return_false",
+        "test_is_not_modified_when_given_no_condition_should_return_false",
+    ],
+)
+def test_is_not_modified_when_given_conditions_should_evaluate_them(
+    if_none_match, if_modified_since, expected
+) -> None:
+    assert (
+        is_not_modified(ETAG, if_none_match, LAST_MODIFIED, if_modified_since)
+        is expected
+    )
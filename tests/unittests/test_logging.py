@@ -0,0 +1,83 @@
+import threading
+
+from loguru import logger
+
+from app import logging
+from app.config import get_settings
+from app.logging import QueueSink
+
+
+def test_queue_sink_when_stopped_should_have_written_every_message_in_order() -> None:
+    """
+    Given: A queue sink
+    When: Messages are written and the sink is stopped
+    Then: Every message should have been emitted in order and flushed
+    """
+    emitted: list[str] = []
+    flushed = threading.Event()
+    sink = QueueSink(emitted.append, flushed.set, maxsize=100, batch_size=10)
+
+    for i in range(25):
+        sink.write(str(i))
+    sink.stop()
+
+    assert emitted == [str(i) for i in range(25)]
+    assert flushed.is_set()
+    assert sink.stats().written == 25
+
+
+def test_queue_sink_when_queue_is_full_should_drop_and_count_messages() -> None:
+    """
+    Given: A queue sink whose writer is blocked
+    When: More messages are written than the queue holds
+    Then: The overflowing messages should be dropped and counted
+    """
+    emitted: list[str] = []
+    started, release = threading.Event(), threading.Event()
+
+    def emit(message: str) -> None:
+        started.set()
+        release.wait()
+        emitted.append(message)
+
+    sink = QueueSink(emit, lambda: None, maxsize=2, batch_size=1)
+    sink.write("blocking")
+    started.wait()
+
+    for message in ("a", "b", "c", "d"):
+        sink.write(message)
+    stats = sink.stats()
+    release.set()
+    sink.stop()
+
+    assert (stats.dropped, stats.queued) == (2, 2)
+    assert emitted == ["blocking", "a", "b"]
+
+
+def test_configure_logging_when_called_again_should_stop_previous_queue(
+    monkeypatch,
+) -> None:
+    """
+    Given: Logging configured with a log queue
+    When: Logging is configured again and then stopped
+    Then: Each queue should have written its messages and stopped its thread
+    """
+    settings = get_settings().model_copy(update={"LOG_ASYNC": True})
+    monkeypatch.setattr(logging, "get_settings", lambda: settings)
+
+    try:
+        logging.configure_logging()
+        first = logging.log_queue
+        logger.info("first")
+        logging.configure_logging()
+        second = logging.log_queue
+        logger.info("second")
+        logging.stop_logging()
+    finally:
+        monkeypatch.undo()
+        logging.configure_logging()
+
+    assert first is not None and second is not None
+    assert (first.stats().written, second.stats().written) == (1, 1)
+    assert not first._thread.is_alive() and not second._thread.is_alive()
+    assert logging.log_queue is None
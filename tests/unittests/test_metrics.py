@@ -0,0 +1,24 @@
+from sqlalchemy import QueuePool, create_engine
+
+from app.metrics.instruments import PoolCollector
+
+
+def test_pool_collector_when_connection_checked_out_should_report_pool_state() -> None:
+    """
+    Given: An engine with a queue pool of one connection
+    When: Two connections are checked out and the pool collector is collected
+    Then: The size, the checked out and the overflow connections should be reported
+    """
+    engine = create_engine("sqlite://", poolclass=QueuePool, pool_size=1)
+    collector = PoolCollector({"test": engine})
+
+    with engine.connect(), engine.connect():
+        metrics = {
+            metric.name: metric.samples[0].value for metric in collector.collect()
+        }
+
+    assert metrics == {
+        "db_pool_size": 1,
+        "db_pool_checked_out": 2,
+        "db_pool_overflow": 1,
+    }
@@ -0,0 +1,53 @@
+import uuid
+
+import pytest
+from loguru import logger
+from sqlalchemy import Connection
+
+from app import query_log
+from app.query_log import redact
+from app.vehicles.services import get_vehicles
+
+
+@pytest.mark.parametrize(
+    "parameters, executemany, expected",
+    [
+        ({"name": "Q7", "id": uuid.UUID(int=1)}, False, {"name": "str", "id": "UUID"}),
+        (("Q7", 2020), False, ["str", "int"]),
+        ([{"name": "Q7"}, {"name": "I30"}], True, "<2 parameter sets>"),
+    ],
+    ids=[
+        "test_redact_when_given_named_parameters_should_keep_names_and_types",
+        "test_redact_when_given_positional_parameters_should_keep_types",
+        "test_redact_when_given_executemany_parameters_should_count_sets",
+    ],
+)
+def test_redact_when_given_parameters_should_not_contain_values(
+    parameters, executemany, expected
+):
+    assert redact(parameters, executemany) == expected
+
+
+@pytest.mark.filterwarnings("ignore:Pydantic")
+def test_log_slow_query_when_statement_exceeds_threshold_should_log_redacted_query(
+    connection: Connection, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """
+    Given: A slow query threshold of zero
+    When: Getting vehicles filtered by name
+    Then: The statement should be logged with its duration and the redacted parameters
+    """
+    monkeypatch.setattr(query_log.settings, "SLOW_QUERY_THRESHOLD_MS", 0.0)
+    records: list[dict] = []
+    sink = logger.add(lambda message: records.append(message.record), level="WARNING")
+
+    try:
+        get_vehicles(connection, dict(name="secret name"))
+    finally:
+        logger.remove(sink)
+
+    [record] = records
+    assert record["message"].startswith("Slow query: ")
+    assert "secret name" not in record["message"]
+    assert record["extra"]["rowcount"] == -1
+    assert record["extra"]["duration_ms"] >= 0
@@ -0,0 +1,49 @@
+from app.replicas import ReplicaSet
+from tests.stubs import FakeClock
+
+
+def test_replica_set_when_choosing_should_rotate_through_replicas() -> None:
+    """
+    Given: A replica set of three replicas
+    When: A replica is chosen four times
+    Then: The replicas should be returned in turn, starting over after the last
+    """
+    replicas = ReplicaSet(["a", "b", "c"], eject_seconds=30)
+
+    chosen = [replicas.choose() for _ in range(4)]
+
+    assert chosen == ["a", "b", "c", "a"]
+
+
+def test_replica_set_when_replica_ejected_should_skip_it_until_eject_time_passed() -> (
+    None
+):
+    """
+    Given: A replica set with one of two replicas ejected
+    When: Replicas are chosen before and after the eject time passed
+    Then: The ejected replica should be skipped only before
+    """
+    clock = FakeClock()
+    replicas = ReplicaSet(["a", "b"], eject_seconds=30, clock=clock)
+    replicas.eject("a")
+
+    before = [replicas.choose() for _ in range(2)]
+    clock.now = 30
+    after = [replicas.choose() for _ in range(2)]
+
+    assert before == ["b", "b"]
+    assert sorted(after) == ["a", "b"]
+
+
+def test_replica_set_when_all_replicas_ejected_should_choose_none() -> None:
+    """
+    Given: A replica set whose replicas are all ejected
+    When: A replica is chosen
+    Then: None should be returned
+    """
+    replicas = ReplicaSet(["a", "b"], eject_seconds=30)
+    replicas.eject("a")
+    replicas.eject("b")
+
+    assert replicas.choose() is None
+    assert ReplicaSet([], eject_seconds=30).choose() is None
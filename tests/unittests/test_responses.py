@@ -0,0 +1,34 @@
+import datetime
+import json
+import uuid
+
+from app.responses import PydanticJSONResponse
+
+
+def test_pydantic_json_response_when_given_bytes_should_send_them_unchanged() -> None:
+    """
+    Given: Content that is already encoded
+    When: A PydanticJSONResponse is created with the content
+    Then: The body should be the content as is
+    """
+    response = PydanticJSONResponse(b'{"data":[]}')
+
+    assert response.body == b'{"data":[]}'
+    assert response.headers["content-type"] == "application/json"
+
+
+def test_pydantic_json_response_when_given_python_objects_should_encode_them() -> None:
+    """
+    Given: Content with types json.dumps cannot encode
+    When: A PydanticJSONResponse is created with the content
+    Then: The body should be the content encoded as json
+    """
+    id_ = uuid.uuid4()
+    created_at = datetime.datetime(2024, 1, 1, 12, 0)
+
+    response = PydanticJSONResponse({"id": id_, "created_at": created_at})
+
+    assert json.loads(response.body) == {
+        "id": str(id_),
+        "created_at": "2024-01-01T12:00:00",
+    }
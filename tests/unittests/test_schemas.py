@@ -0,0 +1,74 @@
+import datetime
+import json
+
+import pytest
+from sqlalchemy import Connection, RowMapping
+
+from app.schemas import CustomModel, Datetime
+from app.vehicles.schemas import VehicleFromDatabase
+from app.vehicles.services import get_vehicle, insert_vehicle
+from tests.data import Q7
+
+CREATED_AT = datetime.datetime(2024, 5, 1, 12, 30, 15, 123456)
+
+
+@pytest.fixture()
+def row(connection: Connection) -> RowMapping:
+    insert_vehicle(connection, Q7)
+    row = get_vehicle(connection, Q7.id)
+    assert row is not None
+    return row
+
+
+def test_vehicle_from_database_when_given_datetimes_should_truncate_microseconds() -> (
+    None
+):
+    """
+    Given: A vehicle whose creation date has microseconds, given as datetime and as string
+    When: The vehicle is validated
+    Then: The microseconds should be dropped in both cases
+    """
+    data = {"id": Q7.id, "name": Q7.name, "body": {}, "created_at": CREATED_AT}
+
+    from_python = VehicleFromDatabase.model_validate(data)
+    from_json = VehicleFromDatabase.model_validate_json(json.dumps(data, default=str))
+
+    assert (
+        from_python.created_at
+        == from_json.created_at
+        == CREATED_AT.replace(microsecond=0)
+    )
+    assert from_python.updated_at is None
+
+
+def test_vehicle_from_database_when_given_row_mapping_should_validate(
+    row: RowMapping,
+) -> None:
+    """
+    Given: A vehicle row as returned by the services
+    When: The row is validated without the former dict copy of the before validator
+    Then: The vehicle should be validated from the mapping
+    """
+    vehicle = VehicleFromDatabase.model_validate(row)
+
+    assert (vehicle.id, vehicle.name, vehicle.body) == (Q7.id, Q7.name, Q7.body)
+    assert vehicle.created_at is not None and vehicle.created_at.microsecond == 0
+
+
+def test_datetime_when_validated_in_any_model_should_truncate_only_its_own_value() -> (
+    None
+):
+    """
+    Given: A model with a `Datetime` field and a plain datetime field
+    When: The model is validated
+    Then: Only the `Datetime` field should lose its microseconds
+    """
+
+    class Model(CustomModel):
+        truncated: Datetime
+        kept: datetime.datetime
+
+    model = Model(truncated=CREATED_AT, kept=CREATED_AT)
+
+    assert model.truncated == CREATED_AT.replace(microsecond=0)
+    assert model.kept == CREATED_AT
@@ -0,0 +1,40 @@
+from app.timing import RequestTimings, add_timing, request_timings
+
+
+def test_server_timing_when_given_total_should_split_into_db_ser_and_app() -> None:
+    """
+    Given: Timings of a request with database and serialization time
+    When: Formatting them as Server-Timing header for the total time
+    Then: The rest of the total should be reported as app time in milliseconds
+    """
+    timings = RequestTimings(db=0.004, ser=0.001)
+
+    assert timings.server_timing(0.01) == "db;dur=4.000, ser;dur=1.000, app;dur=5.000"
+
+
+def test_add_timing_when_request_is_timed_should_accumulate_stage() -> None:
+    """
+    Given: A request being timed
+    When: Adding database time twice
+    Then: Both should be accumulated on the timings of the request
+    """
+    timings = RequestTimings()
+    token = request_timings.set(timings)
+    try:
+        add_timing("db", 0.5)
+        add_timing("db", 0.25)
+    finally:
+        request_timings.reset(token)
+
+    assert timings == RequestTimings(db=0.75, ser=0.0)
+
+
+def test_add_timing_when_no_request_is_timed_should_do_nothing() -> None:
+    """
+    Given: No request being timed
+    When: Adding database time
+    Then: Nothing should happen
+    """
+    add_timing("db", 0.5)
+
+    assert request_timings.get() is None
@@ -1,5 +1,8 @@
 import datetime
 
+import pytest
+import uuid_utils as uuid
+
 from app.utils import utils
 
 
@@ -13,3 +16,30 @@ def test_utc_now_when_called_should_return_utc_time_aware_datetime_object() -> N
 
     assert isinstance(now, datetime.datetime)
     assert now.tzinfo == datetime.timezone.utc
+
+
+def test_decode_cursor_when_given_encoded_cursor_should_return_original_uuid() -> None:
+    """
+    Given: A cursor encoded from an uuid
+    When: decode_cursor() is called with the cursor
+    Then: decode_cursor() should return the original uuid
+    """
+    value = uuid.uuid7()
+
+    assert utils.decode_cursor(utils.encode_cursor(value)) == value
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    ["", "abc", "AAAA"],
+    ids=[
+        "test_decode_cursor_when_given_empty_string_should_raise_value_error",
+        "test_decode_cursor_when_given_invalid_base64_should_raise_value_error",
+        "test_decode_cursor_when_given_short_payload_should_raise_value_error",
+    ],
+)
+def test_decode_cursor_when_given_malformed_cursor_should_raise_value_error(
+    cursor: str,
+) -> None:
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        utils.decode_cursor(cursor)
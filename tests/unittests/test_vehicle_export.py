@@ -0,0 +1,63 @@
+import csv
+import io
+import json
+
+import pytest
+from sqlalchemy import Connection
+
+from app.vehicles.export import CSV_COLUMNS, ExportFormat, render_header, render_rows
+from app.vehicles.services import get_vehicles, stream_vehicles
+
+
+@pytest.mark.usefixtures("example_data")
+@pytest.mark.filterwarnings("ignore:Pydantic")
+def test_stream_vehicles_when_called_should_yield_partitions_of_matching_vehicles(
+    connection: Connection,
+) -> None:
+    """
+    Given: A database with vehicles
+    When: Streaming the vehicles with a partition size of one
+    Then: Every matching vehicle should be yielded in its own partition.
+    """
+    partitions = list(stream_vehicles(connection, {}, partition_size=1))
+
+    assert [len(rows) for rows in partitions] == [1, 1]
+    assert list(stream_vehicles(connection, dict(name="I30"), 10))[0][0].name == "I30"
+
+
+@pytest.mark.usefixtures("example_data")
+@pytest.mark.filterwarnings("ignore:Pydantic")
+def test_render_rows_when_given_ndjson_format_should_render_one_json_object_per_line(
+    connection: Connection,
+) -> None:
+    """
+    Given: Vehicles from the database
+    When: render_rows is called with the ndjson format
+    Then: Every vehicle should be rendered as a json object on its own line.
+    """
+    rows = get_vehicles(connection, {})
+
+    lines = render_rows(ExportFormat.NDJSON, rows).splitlines()
+
+    assert [json.loads(line)["name"] for line in lines] == ["Q7", "I30"]
+    assert render_header(ExportFormat.NDJSON) == ""
+
+
+@pytest.mark.usefixtures("example_data")
+@pytest.mark.filterwarnings("ignore:Pydantic")
+def test_render_rows_when_given_csv_format_should_render_csv_rows_below_header(
+    connection: Connection,
+) -> None:
+    """
+    Given: Vehicles from the database
+    When: render_header and render_rows are called with the csv format
+    Then: A csv document with a header and the body as json should be rendered.
+    """
+    rows = get_vehicles(connection, {})
+
+    document = render_header(ExportFormat.CSV) + render_rows(ExportFormat.CSV, rows)
+    [header, *records] = list(csv.reader(io.StringIO(document)))
+
+    assert header == CSV_COLUMNS
+    assert [record[CSV_COLUMNS.index("name")] for record in records] == ["Q7", "I30"]
+    assert json.loads(records[0][CSV_COLUMNS.index("body")]) == rows[0]["body"]
@@ -0,0 +1,87 @@
+import pytest
+
+from app.vehicles.export import ExportFormat, render_header, render_rows
+from app.vehicles.ingest import iter_batches, iter_records
+from app.vehicles.schemas import CreateVehicle, ImportReport
+
+
+async def as_stream(*chunks: bytes):
+    for chunk in chunks:
+        yield chunk
+
+
+@pytest.mark.asyncio()
+async def test_iter_records_when_given_chunks_splitting_lines_should_yield_whole_records():
+    """
+    Given: A stream whose chunks split lines and a multi byte character
+    When: iter_records is called with the stream
+    Then: Every non empty line should be yielded once with its line number
+    """
+    stream = as_stream(b'{"name": "A"}\n{"na', b'me": "\xc3', b'\xa4"}\n\n')
+
+    records = [record async for record in iter_records(stream, ExportFormat.NDJSON)]
+
+    assert records == [(1, '{"name": "A"}'), (2, '{"name": "ä"}')]
+
+
+@pytest.mark.asyncio()
+async def test_iter_records_when_given_csv_with_quoted_newline_should_join_lines():
+    """
+    Given: A csv stream with a line break inside a quoted field
+    When: iter_records is called with the stream
+    Then: The quoted field should be kept within a single record
+    """
+    stream = as_stream(b'name,body\r\n"multi\nline",{}\r\nsingle,{}\r\n')
+
+    records = [record async for record in iter_records(stream, ExportFormat.CSV)]
+
+    assert records == [(1, "name,body"), (2, '"multi\nline",{}'), (4, "single,{}")]
+
+
+@pytest.mark.asyncio()
+@pytest.mark.filterwarnings("ignore:Pydantic")
+async def test_iter_batches_when_given_invalid_rows_should_report_them_and_keep_valid_rows():
+    """
+    Given: A csv stream with a valid and an invalid row
+    When: iter_batches is called with the stream
+    Then: The valid row should be batched and the invalid row should be reported
+    """
+    stream = as_stream(
+        b'name,manufacturing_year,body\nQ7,2020,"{""color"": ""red""}"\nI30,soon,\n'
+    )
+    report = ImportReport()
+
+    batches = [
+        batch async for batch in iter_batches(stream, ExportFormat.CSV, 10, report, 10)
+    ]
+
+    [[vehicle]] = batches
+    assert vehicle.body == {"color": "red"}
+    assert report.rejected == 1
+    assert report.errors[0].line == 3
+
+
+@pytest.mark.asyncio()
+@pytest.mark.filterwarnings("ignore:Pydantic")
+async def test_iter_batches_when_given_csv_export_should_keep_empty_name():
+    """
+    Given: A csv export of a vehicle with an empty name that was never updated
+    When: iter_batches is called with the export
+    Then: The name should stay empty and the empty update time be left out
+    """
+    vehicle = CreateVehicle(name="", body={"color": "red"}).model_dump()
+    export = render_header(ExportFormat.CSV) + render_rows(
+        ExportFormat.CSV, [vehicle | {"updated_at": None}]
+    )
+    report = ImportReport()
+
+    batches = [
+        batch
+        async for batch in iter_batches(
+            as_stream(export.encode()), ExportFormat.CSV, 10, report, 10
+        )
+    ]
+
+    [[imported]] = batches
+    assert imported.model_dump() == vehicle
+    assert report.rejected == 0
@@ -1,15 +1,25 @@
 import json
+import uuid
 
 import pytest
-from sqlalchemy import Connection, text
+from sqlalchemy import Connection, create_engine, text
 
-from app.database import execute
+from app import database
+from app.database import compiled_cache_stats, execute
+from app.replicas import ReplicaSet
+from app.vehicles import services
 from app.vehicles.schemas import CreateVehicle, UpdateVehicle, VehicleFromDatabase
 from app.vehicles.services import (
     delete_vehicle,
+    get_vehicle,
     get_vehicles,
     insert_vehicle,
+    insert_vehicles,
+    invalidate_vehicle,
+    search_vehicles,
+    statement_cache,
     update_vehicle,
+    vehicle_cache,
 )
 
 
@@ -101,3 +111,284 @@ def test_update_vehicle_when_called_with_uuid_should_update_data_in_vehicles_tab
     assert json.loads(updated.body) == i30["body"]
     assert updated.created_at == i30["created_at"].isoformat(" ")
     assert updated.updated_at is not None
+
+
+@pytest.mark.usefixtures("example_data")
+@pytest.mark.filterwarnings("ignore:Pydantic")
+def test_get_vehicles_when_called_with_after_and_limit_should_return_page_ordered_by_id(
+    connection: Connection,
+) -> None:
+    """
+    Given: A database with vehicles
+    When: Getting vehicles with a limit and the id of the previous page
+    Then: The next page should be returned ordered by id.
+    """
+    [first] = get_vehicles(connection, {}, limit=1)
+    [second] = get_vehicles(connection, {}, after=first["id"], limit=1)
+
+    assert first["id"] < second["id"]
+    assert get_vehicles(connection, {}, after=second["id"], limit=1) == []
+
+
+@pytest.mark.filterwarnings("ignore:Pydantic")
+def test_insert_vehicles_when_called_with_many_vehicles_should_insert_all_in_given_order(
+    connection: Connection,
+) -> None:
+    """
+    Given: A empty database session
+    When: Creating more vehicles than the batch size using the service insert_vehicles
+    Then: All vehicles should be added and returned in the order they were given.
+    """
+    to_create = [CreateVehicle(name=f"vehicle_{i}") for i in range(5)]
+
+    result = insert_vehicles(connection, to_create, batch_size=2)
+
+    assert [row["id"] for row in result] == [vehicle.id for vehicle in to_create]
+    assert len(get_vehicles(connection, {})) == len(to_create)
+
+
+@pytest.mark.usefixtures("example_data")
+@pytest.mark.filterwarnings("ignore:Pydantic")
+def test_update_vehicle_when_called_with_stale_version_should_not_update_vehicle(
+    connection: Connection,
+) -> None:
+    """
+    Given: A database with a vehicle
+    When: update vehicle service is called with a version the vehicle no longer has
+    Then: Nothing should be updated and None should be returned.
+    """
+    [i30] = get_vehicles(connection, dict(name="I30"))
+    update_with = UpdateVehicle(name="updated_name")
+
+    updated = update_vehicle(connection, i30["id"], update_with, versions=[1])
+    stale = update_vehicle(connection, i30["id"], update_with, versions=[1])
+
+    assert updated is not None and updated["version"] == 2
+    assert stale is None
+
+
+@pytest.mark.usefixtures("example_data")
+@pytest.mark.filterwarnings("ignore:Pydantic")
+def test_delete_vehicle_when_called_with_unknown_uuid_should_return_false(
+    connection: Connection,
+) -> None:
+    """
+    Given: A database with vehicles
+    When: Delete vehicle service is called with an uuid no vehicle has
+    Then: False should be returned.
+    """
+    assert delete_vehicle(connection, uuid.uuid4()) is False
+
+
+@pytest.mark.usefixtures("example_data")
+@pytest.mark.filterwarnings("ignore:Pydantic")
+def test_get_vehicle_when_vehicle_updated_should_not_return_cached_vehicle(
+    connection: Connection,
+) -> None:
+    """
+    Given: A vehicle read through the vehicle cache
+    When: The vehicle is updated and read again
+    Then: The second read should return the updated vehicle.
+    """
+    [i30] = get_vehicles(connection, dict(name="I30"))
+    cached = get_vehicle(connection, i30["id"])
+    hits = vehicle_cache.stats().hits
+
+    assert get_vehicle(connection, i30["id"]) is cached
+    assert vehicle_cache.stats().hits == hits + 1
+
+    update_vehicle(connection, i30["id"], UpdateVehicle(name="updated_name"))
+
+    assert get_vehicle(connection, i30["id"])["name"] == "updated_name"
+
+
+@pytest.mark.usefixtures("example_data")
+@pytest.mark.filterwarnings("ignore:Pydantic")
+def test_get_vehicle_when_written_by_open_transaction_should_not_cache_vehicle(
+    connection: Connection,
+) -> None:
+    """
+    Given: A vehicle updated by a transaction that is still open
+    When: The vehicle is read
+    Then: The updated vehicle should be returned without caching it.
+    """
+    [i30] = get_vehicles(connection, dict(name="I30"))
+    update_vehicle(connection, i30["id"], UpdateVehicle(name="updated_name"))
+
+    assert get_vehicle(connection, i30["id"])["name"] == "updated_name"
+    assert vehicle_cache.get(i30["id"]) is None
+
+
+@pytest.mark.usefixtures("example_data")
+@pytest.mark.filterwarnings("ignore:Pydantic")
+def test_get_vehicle_when_write_ends_during_read_should_not_cache_vehicle(
+    connection: Connection, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """
+    Given: A transaction writing the vehicle that ends while it is read
+    When: The vehicle is read
+    Then: The vehicle should be returned without caching it, it may predate the commit.
+    """
+    [i30] = get_vehicles(connection, dict(name="I30"))
+    writer, fetch_one = create_engine("sqlite://"), services.fetch_one
+
+    def fetch_one_during_write(*args, **kwargs):
+        row = fetch_one(*args, **kwargs)
+        with writer.connect() as other:
+            invalidate_vehicle(other, i30["id"])
+        return row
+
+    monkeypatch.setattr(services, "fetch_one", fetch_one_during_write)
+
+    assert get_vehicle(connection, i30["id"])["name"] == "I30"
+    assert vehicle_cache.get(i30["id"]) is None
+
+
+@pytest.mark.usefixtures("example_data")
+@pytest.mark.filterwarnings("ignore:Pydantic")
+def test_get_vehicles_when_called_with_body_filter_should_return_matching_vehicles(
+    connection: Connection,
+) -> None:
+    """
+    Given: A database with vehicles of different colors
+    When: Getting the vehicles filtered on a body attribute
+    Then: Only the vehicles with that body attribute should be returned.
+    """
+    result = get_vehicles(connection, {"body": {"color": "black"}})
+
+    assert [vehicle["name"] for vehicle in result] == ["I30"]
+
+
+@pytest.mark.filterwarnings("ignore:Pydantic")
+def test_search_vehicles_when_called_with_prefix_should_rank_shorter_names_first(
+    connection: Connection,
+) -> None:
+    """
+    Given: A database with vehicles sharing a name prefix
+    When: Searching the vehicles by that prefix with a limit
+    Then: The closest matches should be returned, shortest name first.
+    """
+    for name in ("Golf GTI", "Golf", "Polo", "Golf Variant"):
+        insert_vehicle(
+            connection,
+            CreateVehicle(name=name, manufacturing_year=2020, is_drivable=True),
+        )
+
+    result = search_vehicles(connection, "Golf", limit=2)
+
+    assert [vehicle["name"] for vehicle in result] == ["Golf", "Golf GTI"]
+
+
+@pytest.mark.filterwarnings("ignore:Pydantic")
+@pytest.mark.parametrize(
+    ("query", "names", "expected"),
+    [
+        ("a\U0010ffff", ["a\U0010ffff", "a\U0010ffffz", "b"], 2),
+        ("a\ud7ff", ["a\ud7ff", "a\ud7ffz", "a\ue000"], 2),
+        ("\U0010ffff", ["\U0010ffff", "\U0010ffff\U0010ffff", "a"], 2),
+    ],
+    ids=["greatest-code-point", "before-surrogates", "no-upper-bound"],
+)
+def test_search_vehicles_when_prefix_ends_in_edge_code_point_should_match_prefix(
+    connection: Connection, query: str, names: list[str], expected: int
+) -> None:
+    """
+    Given: Vehicles named with a prefix ending right before a gap in the code points
+    When: Searching the vehicles by that prefix
+    Then: Exactly the vehicles whose name starts with the prefix should be returned.
+    """
+    for name in names:
+        insert_vehicle(connection, CreateVehicle(name=name))
+
+    result = search_vehicles(connection, query, limit=10)
+
+    assert [vehicle["name"] for vehicle in result] == names[:expected]
+
+
+@pytest.mark.usefixtures("example_data")
+@pytest.mark.filterwarnings("ignore:Pydantic")
+def test_get_vehicles_when_called_with_same_filter_fields_should_reuse_compiled_statement(
+    connection: Connection,
+) -> None:
+    """
+    Given: A database with vehicles
+    When: Getting vehicles twice with different values for the same filter fields
+    Then: The second call should reuse the statement and its compiled form.
+    """
+    get_vehicles(connection, dict(name="Q7", is_drivable=True))
+    statements, compiled = statement_cache.stats(), compiled_cache_stats()
+
+    [i30] = get_vehicles(connection, dict(is_drivable=True, name="I30"))
+
+    assert i30["name"] == "I30"
+    assert statement_cache.stats().hits == statements.hits + 1
+    assert compiled_cache_stats().hits == compiled.hits + 1
+
+
+@pytest.mark.usefixtures("example_data")
+@pytest.mark.filterwarnings("ignore:Pydantic")
+def test_get_vehicles_when_called_with_columns_should_select_only_those_columns(
+    connection: Connection,
+) -> None:
+    """
+    Given: A database with vehicles
+    When: Getting vehicles with some of the columns
+    Then: Only those columns should be selected, in the order of the table.
+    """
+    vehicles = get_vehicles(connection, dict(name="Q7"), columns={"name", "id"})
+
+    assert [list(vehicle) for vehicle in vehicles] == [["id", "name"]]
+
+
+@pytest.mark.usefixtures("example_data")
+@pytest.mark.filterwarnings("ignore:Pydantic")
+def test_get_vehicle_when_called_with_columns_should_not_cache_partial_vehicle(
+    connection: Connection,
+) -> None:
+    """
+    Given: A vehicle that is not cached
+    When: Getting the vehicle with some of the columns, then with all of them
+    Then: The first read should return those columns only and leave the cache empty.
+    """
+    [i30] = get_vehicles(connection, dict(name="I30"))
+
+    assert dict(get_vehicle(connection, i30["id"], {"id", "version"})) == {
+        "id": i30["id"],
+        "version": 1,
+    }
+    assert vehicle_cache.get(i30["id"]) is None
+    assert get_vehicle(connection, i30["id"])["name"] == "I30"
+
+
+@pytest.mark.usefixtures("example_data")
+@pytest.mark.filterwarnings("ignore:Pydantic")
+def test_get_vehicle_when_read_from_replica_should_not_cache_vehicle(
+    connection: Connection, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """
+    Given: A connection to a read replica
+    When: A vehicle is read on it
+    Then: The vehicle should be returned without caching it, the replica may lag.
+    """
+    monkeypatch.setattr(database, "replicas", ReplicaSet([connection.engine], 30))
+    [i30] = get_vehicles(connection, dict(name="I30"))
+
+    assert get_vehicle(connection, i30["id"])["name"] == "I30"
+    assert vehicle_cache.get(i30["id"]) is None
+
+
+@pytest.mark.usefixtures("example_data")
+@pytest.mark.filterwarnings("ignore:Pydantic")
+def test_get_vehicle_when_fresh_should_skip_and_refill_cache(
+    connection: Connection,
+) -> None:
+    """
+    Given: A stale vehicle in the vehicle cache
+    When: The vehicle is read fresh from the primary
+    Then: The current vehicle should be returned and replace the stale one.
+    """
+    [i30] = get_vehicles(connection, dict(name="I30"))
+    vehicle_cache.set(i30["id"], {**i30, "name": "stale"})
+
+    assert get_vehicle(connection, i30["id"], fresh=True)["name"] == "I30"
+    assert vehicle_cache.get(i30["id"])["name"] == "I30"